@@ -42,6 +42,24 @@ class Settings(BaseSettings):
     AI_CACHE_TTL_SECONDS: int = 3600
     AI_RATE_LIMIT_PER_USER_PER_HOUR: int = 50
     
+    # Gamification
+    ACHIEVEMENT_INDEX_TTL_SECONDS: int = 300
+    
+    # Quizzes
+    QUIZ_PASS_PERCENTAGE: int = 70  # Default pass mark for quizzes that do not set one
+    
+    # Time Tracking
+    HEARTBEAT_INTERVAL_SECONDS: int = 30  # Most time credited for a single heartbeat
+    HEARTBEAT_FLUSH_SECONDS: int = 60  # How often buffered time is written to the database
+    COMPLETION_CLOCK_SKEW_SECONDS: int = 300  # How far ahead of server time an offline completed_at may be
+    
+    # Caching
+    CURRICULUM_CACHE_CHECK_SECONDS: int = 5  # How often workers check the curriculum version
+    CHALLENGE_CACHE_CHECK_SECONDS: int = 5  # How often workers check the challenge catalog version
+    SEARCH_REFRESH_SECONDS: int = 30  # How often the search index looks for changed rows
+    LEADERBOARD_LOCAL_REFRESH_SECONDS: int = 30  # How often the local leaderboard is reseeded while Redis is down
+    RANK_REFRESH_SECONDS: int = 60  # How often Leaderboard.rank is recomputed after scores change
+    
     # File Storage
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE_MB: int = 10
@@ -0,0 +1,85 @@
+"""
+Shared Redis Client and Cache Versions
+Version counters let every worker notice when cached data has changed
+"""
+import logging
+import time
+from typing import Optional, Dict
+
+import redis
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying Redis after a connection failure
+REDIS_RETRY_SECONDS = 30
+
+_client: Optional[redis.Redis] = None
+_failed_at: float = 0.0
+
+# Per-process versions, used on their own when Redis is unavailable
+_local_versions: Dict[str, int] = {}
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Get the shared Redis client, or None while Redis is unreachable
+    Callers must treat Redis as optional and fall back to local state.
+    """
+    global _client
+
+    if _failed_at and time.monotonic() - _failed_at < REDIS_RETRY_SECONDS:
+        return None
+
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+            decode_responses=True
+        )
+    return _client
+
+
+def mark_redis_failed(error: Exception) -> None:
+    """Back off from Redis for REDIS_RETRY_SECONDS after an error"""
+    global _failed_at
+    if not _failed_at or time.monotonic() - _failed_at >= REDIS_RETRY_SECONDS:
+        logger.warning(f"Redis unavailable, using local state: {error}")
+    _failed_at = time.monotonic()
+
+
+def get_local_version(name: str) -> int:
+    """This process's own counter for a named cache (no Redis round trip)"""
+    return _local_versions.get(name, 0)
+
+
+def get_version(name: str) -> str:
+    """
+    Current version token for a named cache
+
+    Combines the cluster-wide Redis counter with this process's own counter,
+    so local changes are seen immediately and other workers' changes are
+    seen through Redis.
+    """
+    shared = "-"
+    client = get_redis()
+    if client is not None:
+        try:
+            shared = client.get(f"version:{name}") or "0"
+        except redis.RedisError as e:
+            mark_redis_failed(e)
+    return f"{shared}.{get_local_version(name)}"
+
+
+def bump_version(name: str) -> None:
+    """Invalidate a named cache in this process and, through Redis, in every worker"""
+    _local_versions[name] = _local_versions.get(name, 0) + 1
+
+    client = get_redis()
+    if client is not None:
+        try:
+            client.incr(f"version:{name}")
+        except redis.RedisError as e:
+            mark_redis_failed(e)
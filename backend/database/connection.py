@@ -3,6 +3,7 @@ Database Connection and Session Management
 SQLAlchemy configuration for PostgreSQL
 """
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
@@ -45,3 +46,13 @@ def init_db() -> None:
     logger.info("Initializing database...")
     Base.metadata.create_all(bind=engine)
     logger.info("Database initialized successfully")
+
+
+def dialect_insert(db: Session, model):
+    """
+    INSERT construct supporting ON CONFLICT for the session's database
+    Usage: dialect_insert(db, Model).values(...).on_conflict_do_update(...)
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
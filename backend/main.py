@@ -8,12 +8,15 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import time
 
 from config import settings
 from database.connection import engine, Base
-from routes import auth_routes, user_routes, curriculum_routes, lab_routes, challenge_routes, progress_routes, publishing_routes, capstone_routes, admin_routes, ai_routes
+from services.heartbeat_service import HeartbeatService
+from services.rank_service import RankService
+from routes import auth_routes, user_routes, curriculum_routes, lab_routes, challenge_routes, progress_routes, publishing_routes, capstone_routes, admin_routes, ai_routes, search_routes, quiz_routes, contest_routes
 
 # Configure logging
 logging.basicConfig(
@@ -38,9 +41,20 @@ async def lifespan(app: FastAPI):
         logger.info("Creating database tables...")
         Base.metadata.create_all(bind=engine)
     
+    # Periodically write buffered time-on-task heartbeats
+    heartbeat_flusher = asyncio.create_task(HeartbeatService.run_flush_loop())
+    # Periodically write leaderboard ranks after scores change
+    rank_materializer = asyncio.create_task(RankService.run_loop())
+    
     yield
     
     # Shutdown
+    for task in (heartbeat_flusher, rank_materializer):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
     logger.info(f"Shutting down {settings.APP_NAME}")
 
 
@@ -123,6 +137,9 @@ app.include_router(publishing_routes.router, prefix="/api/publish", tags=["Publi
 app.include_router(capstone_routes.router, prefix="/api/capstone", tags=["Capstone Projects"])
 app.include_router(admin_routes.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(ai_routes.router, prefix="/api/ai", tags=["AI Tutor"])
+app.include_router(search_routes.router, prefix="/api/search", tags=["Search"])
+app.include_router(quiz_routes.router, prefix="/api/quizzes", tags=["Quizzes"])
+app.include_router(contest_routes.router, prefix="/api/contests", tags=["Contests"])
 
 # Health check endpoint
 @app.get("/health", tags=["System"])
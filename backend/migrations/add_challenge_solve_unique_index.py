@@ -0,0 +1,64 @@
+"""
+Add a partial unique index on correct challenge submissions
+Each user can solve a challenge once; the index makes concurrent solves
+record a single submission instead of double-scoring.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Demote duplicate solves, then create the unique index"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            # Keep the earliest correct submission per user and challenge
+            result = conn.execute(text("""
+                UPDATE challenge_submissions
+                SET is_correct = FALSE
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY user_id, challenge_id ORDER BY submitted_at, id
+                        ) AS n
+                        FROM challenge_submissions
+                        WHERE is_correct
+                    ) solves
+                    WHERE n > 1
+                );
+            """))
+            if result.rowcount:
+                print(f"  Demoted {result.rowcount} duplicate solves; their points may still be on the leaderboard")
+            conn.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_challenge_submissions_solve
+                ON challenge_submissions (user_id, challenge_id)
+                WHERE is_correct;
+            """))
+            conn.commit()
+            print("✓ Successfully created uq_challenge_submissions_solve")
+        except Exception as e:
+            print(f"✗ Error creating index: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the unique index"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP INDEX IF EXISTS uq_challenge_submissions_solve;"))
+            conn.commit()
+            print("✓ Successfully dropped uq_challenge_submissions_solve")
+        except Exception as e:
+            print(f"✗ Error dropping index: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add unique index on correct challenge submissions")
+    upgrade()
@@ -0,0 +1,62 @@
+"""
+Add challenges.solver_count
+Distinct solvers per challenge, maintained on first correct submission so
+the challenge list does not count submissions per row.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Add and backfill the solver count, and index submissions by user"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE challenges
+                ADD COLUMN IF NOT EXISTS solver_count INTEGER NOT NULL DEFAULT 0;
+            """))
+            conn.execute(text("""
+                UPDATE challenges c
+                SET solver_count = s.solvers
+                FROM (
+                    SELECT challenge_id, COUNT(DISTINCT user_id) AS solvers
+                    FROM challenge_submissions
+                    WHERE is_correct
+                    GROUP BY challenge_id
+                ) s
+                WHERE s.challenge_id = c.id;
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_challenge_submissions_user_challenge
+                ON challenge_submissions (user_id, challenge_id);
+            """))
+            conn.commit()
+            print("✓ Successfully added challenges.solver_count")
+        except Exception as e:
+            print(f"✗ Error adding column: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the solver count and submission index"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP INDEX IF EXISTS ix_challenge_submissions_user_challenge;"))
+            conn.execute(text("ALTER TABLE challenges DROP COLUMN IF EXISTS solver_count;"))
+            conn.commit()
+            print("✓ Successfully dropped challenges.solver_count")
+        except Exception as e:
+            print(f"✗ Error dropping column: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add challenges.solver_count")
+    upgrade()
@@ -0,0 +1,99 @@
+"""
+Add contest tables
+Time-boxed contests over a subset of challenges, with decaying challenge
+values, first bloods and an incrementally maintained scoreboard.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the contest tables"""
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS contests (
+                    id SERIAL PRIMARY KEY,
+                    title VARCHAR(300) NOT NULL,
+                    description TEXT,
+                    starts_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                    ends_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                    first_blood_bonus INTEGER NOT NULL DEFAULT 0,
+                    is_published BOOLEAN NOT NULL DEFAULT FALSE,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                    updated_at TIMESTAMP WITH TIME ZONE
+                );
+            """))
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS contest_challenges (
+                    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+                    challenge_id INTEGER NOT NULL REFERENCES challenges(id),
+                    max_points INTEGER NOT NULL,
+                    min_points INTEGER NOT NULL,
+                    decay INTEGER NOT NULL,
+                    solver_count INTEGER NOT NULL DEFAULT 0,
+                    current_value INTEGER NOT NULL,
+                    first_blood_user_id INTEGER REFERENCES users(id),
+                    first_blood_at TIMESTAMP WITH TIME ZONE,
+                    "order" INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (contest_id, challenge_id)
+                );
+            """))
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS contest_solves (
+                    id SERIAL PRIMARY KEY,
+                    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+                    challenge_id INTEGER NOT NULL REFERENCES challenges(id),
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    is_first_blood BOOLEAN NOT NULL DEFAULT FALSE,
+                    solved_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                    CONSTRAINT uq_contest_solves_user UNIQUE (contest_id, challenge_id, user_id)
+                );
+            """))
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS contest_scores (
+                    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    points INTEGER NOT NULL DEFAULT 0,
+                    solves INTEGER NOT NULL DEFAULT 0,
+                    first_bloods INTEGER NOT NULL DEFAULT 0,
+                    last_solve_at TIMESTAMP WITH TIME ZONE,
+                    PRIMARY KEY (contest_id, user_id)
+                );
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_contest_scores_board
+                ON contest_scores (contest_id, points, last_solve_at);
+            """))
+            conn.commit()
+            print("✓ Successfully created contest tables")
+        except Exception as e:
+            print(f"✗ Error creating tables: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the contest tables"""
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS contest_scores;"))
+            conn.execute(text("DROP TABLE IF EXISTS contest_solves;"))
+            conn.execute(text("DROP TABLE IF EXISTS contest_challenges;"))
+            conn.execute(text("DROP TABLE IF EXISTS contests;"))
+            conn.commit()
+            print("✓ Successfully dropped contest tables")
+        except Exception as e:
+            print(f"✗ Error dropping tables: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add contest tables")
+    upgrade()
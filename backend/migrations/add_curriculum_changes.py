@@ -0,0 +1,54 @@
+"""
+Add curriculum_changes table
+Append-only log of curriculum row changes; its highest revision is the
+curriculum revision served to clients by GET /curriculum/changes.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the change log table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS curriculum_changes (
+                    revision SERIAL PRIMARY KEY,
+                    entity_type VARCHAR(20) NOT NULL,
+                    entity_id INTEGER NOT NULL,
+                    changed_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                );
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_curriculum_changes_entity
+                ON curriculum_changes (entity_type, entity_id);
+            """))
+            conn.commit()
+            print("✓ Successfully created curriculum_changes table")
+        except Exception as e:
+            print(f"✗ Error creating table: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the change log table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS curriculum_changes;"))
+            conn.commit()
+            print("✓ Successfully dropped curriculum_changes table")
+        except Exception as e:
+            print(f"✗ Error dropping table: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add curriculum_changes table")
+    upgrade()
@@ -0,0 +1,43 @@
+"""
+Add leaderboard.previous_rank
+The ranking job now writes leaderboard.rank; previous_rank keeps the rank a
+user moved from so profiles can show the change.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Add the previous rank column"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE leaderboard ADD COLUMN IF NOT EXISTS previous_rank INTEGER;"))
+            conn.commit()
+            print("✓ Successfully added leaderboard.previous_rank")
+        except Exception as e:
+            print(f"✗ Error adding column: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the previous rank column"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE leaderboard DROP COLUMN IF EXISTS previous_rank;"))
+            conn.commit()
+            print("✓ Successfully dropped leaderboard.previous_rank")
+        except Exception as e:
+            print(f"✗ Error dropping column: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add leaderboard.previous_rank")
+    upgrade()
@@ -0,0 +1,50 @@
+"""
+Add lesson_html table
+Sanitized HTML rendered from each lesson's markdown and content blocks,
+keyed by a hash of the source. Fill it with scripts/prerender_lessons.py.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the rendered HTML table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS lesson_html (
+                    lesson_id INTEGER PRIMARY KEY REFERENCES lessons(id) ON DELETE CASCADE,
+                    source_hash VARCHAR(64) NOT NULL,
+                    html TEXT NOT NULL,
+                    rendered_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                );
+            """))
+            conn.commit()
+            print("✓ Successfully created lesson_html table")
+        except Exception as e:
+            print(f"✗ Error creating table: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the rendered HTML table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS lesson_html;"))
+            conn.commit()
+            print("✓ Successfully dropped lesson_html table")
+        except Exception as e:
+            print(f"✗ Error dropping table: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add lesson_html table")
+    upgrade()
@@ -0,0 +1,51 @@
+"""
+Add module unlock index columns to user_lesson_bits
+Completed and unlocked modules per user, as bitsets over modules in
+prerequisite order. Existing rows are rebuilt on the user's next completion.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Add the unlock index columns"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE user_lesson_bits
+                ADD COLUMN IF NOT EXISTS modules_completed BYTEA NOT NULL DEFAULT '',
+                ADD COLUMN IF NOT EXISTS modules_unlocked BYTEA NOT NULL DEFAULT '';
+            """))
+            conn.commit()
+            print("✓ Successfully added unlock index columns")
+        except Exception as e:
+            print(f"✗ Error adding columns: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the unlock index columns"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE user_lesson_bits
+                DROP COLUMN IF EXISTS modules_completed,
+                DROP COLUMN IF EXISTS modules_unlocked;
+            """))
+            conn.commit()
+            print("✓ Successfully dropped unlock index columns")
+        except Exception as e:
+            print(f"✗ Error dropping columns: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add module unlock index")
+    upgrade()
@@ -0,0 +1,76 @@
+"""
+Deduplicate progress rows and add (user_id, X_id) unique indexes
+Required by the INSERT ... ON CONFLICT write path for lesson, module and tier
+progress. Keeps the most advanced row of each duplicate group; run
+scripts/rebuild_progress_summary.py afterwards to correct any inflated counts.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+# table -> (unique index name, subject column, ORDER BY picking the row to keep)
+PROGRESS_TABLES = {
+    "lesson_progress": (
+        "uq_lesson_progress_user_lesson", "lesson_id",
+        "is_completed DESC, time_spent_minutes DESC NULLS LAST, id"
+    ),
+    "module_progress": (
+        "uq_module_progress_user_module", "module_id",
+        "is_completed DESC, completion_percentage DESC NULLS LAST, id"
+    ),
+    "tier_progress": (
+        "uq_tier_progress_user_tier", "tier_id",
+        "is_unlocked DESC, is_completed DESC, completion_percentage DESC NULLS LAST, id"
+    ),
+}
+
+def upgrade():
+    """Remove duplicates and create unique indexes"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            for table, (index_name, subject, keep_order) in PROGRESS_TABLES.items():
+                result = conn.execute(text(f"""
+                    DELETE FROM {table} t
+                    USING (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY user_id, {subject} ORDER BY {keep_order}
+                        ) AS rn
+                        FROM {table}
+                    ) d
+                    WHERE t.id = d.id AND d.rn > 1;
+                """))
+                print(f"  • {table}: removed {result.rowcount} duplicate rows")
+                conn.execute(text(f"""
+                    CREATE UNIQUE INDEX IF NOT EXISTS {index_name}
+                    ON {table} (user_id, {subject});
+                """))
+            conn.commit()
+            print("✓ Successfully added unique indexes to progress tables")
+        except Exception as e:
+            print(f"✗ Error adding unique indexes: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the unique indexes"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            for index_name, _, _ in PROGRESS_TABLES.values():
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name};"))
+            conn.commit()
+            print("✓ Successfully dropped progress unique indexes")
+        except Exception as e:
+            print(f"✗ Error dropping indexes: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Deduplicate progress rows and add unique indexes")
+    upgrade()
@@ -0,0 +1,59 @@
+"""
+Add quiz_attempts table
+Graded attempts at quiz content blocks; passing every quiz in a lesson
+completes the lesson.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the quiz attempts table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS quiz_attempts (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    block_id INTEGER REFERENCES content_blocks(id) ON DELETE SET NULL,
+                    lesson_id INTEGER NOT NULL REFERENCES lessons(id),
+                    score INTEGER NOT NULL,
+                    max_score INTEGER NOT NULL,
+                    passed BOOLEAN NOT NULL,
+                    answers TEXT NOT NULL,
+                    submitted_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                );
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_block
+                ON quiz_attempts (user_id, block_id);
+            """))
+            conn.commit()
+            print("✓ Successfully created quiz_attempts table")
+        except Exception as e:
+            print(f"✗ Error creating table: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the quiz attempts table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS quiz_attempts;"))
+            conn.commit()
+            print("✓ Successfully dropped quiz_attempts table")
+        except Exception as e:
+            print(f"✗ Error dropping table: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add quiz_attempts table")
+    upgrade()
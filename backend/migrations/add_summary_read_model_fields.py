@@ -0,0 +1,60 @@
+"""
+Extend user_progress_summary into the full progress read model
+Adds points, time and current tier columns; run
+scripts/rebuild_progress_summary.py afterwards to backfill them
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Add read model columns"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE user_progress_summary
+                ADD COLUMN IF NOT EXISTS challenge_points INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS total_points INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS total_time_minutes INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS current_tier INTEGER NOT NULL DEFAULT 0;
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_user_progress_summary_total_points
+                ON user_progress_summary (total_points);
+            """))
+            conn.commit()
+            print("✓ Successfully added read model fields to user_progress_summary")
+        except Exception as e:
+            print(f"✗ Error adding columns: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Remove read model columns"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                DROP INDEX IF EXISTS ix_user_progress_summary_total_points;
+                ALTER TABLE user_progress_summary
+                DROP COLUMN IF EXISTS challenge_points,
+                DROP COLUMN IF EXISTS total_points,
+                DROP COLUMN IF EXISTS total_time_minutes,
+                DROP COLUMN IF EXISTS current_tier;
+            """))
+            conn.commit()
+            print("✓ Successfully removed read model fields from user_progress_summary")
+        except Exception as e:
+            print(f"✗ Error removing columns: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Extend user_progress_summary read model")
+    upgrade()
@@ -0,0 +1,58 @@
+"""
+Deduplicate user_achievements and add a (user_id, achievement_id) unique index
+Required by the INSERT ... ON CONFLICT award path, which keeps concurrent
+progress events from awarding the same achievement twice. Keeps the earliest
+award of each duplicate group.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Remove duplicate awards and create the unique index"""
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        try:
+            result = conn.execute(text("""
+                DELETE FROM user_achievements t
+                USING (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, achievement_id ORDER BY earned_at NULLS LAST, id
+                    ) AS rn
+                    FROM user_achievements
+                ) d
+                WHERE t.id = d.id AND d.rn > 1;
+            """))
+            print(f"  • user_achievements: removed {result.rowcount} duplicate rows")
+            conn.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_user_achievements_user_achievement
+                ON user_achievements (user_id, achievement_id);
+            """))
+            conn.commit()
+            print("✓ Successfully added unique index to user_achievements")
+        except Exception as e:
+            print(f"✗ Error adding unique index: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the unique index"""
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP INDEX IF EXISTS uq_user_achievements_user_achievement;"))
+            conn.commit()
+            print("✓ Successfully dropped user_achievements unique index")
+        except Exception as e:
+            print(f"✗ Error dropping index: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Deduplicate user_achievements and add unique index")
+    upgrade()
@@ -0,0 +1,57 @@
+"""
+Add user_daily_points table
+Points earned per user per day, rolled up into daily, weekly, monthly and
+season leaderboards. Backfill with scripts/backfill_score_buckets.py.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the daily points table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS user_daily_points (
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    day DATE NOT NULL,
+                    challenge_points INTEGER NOT NULL DEFAULT 0,
+                    lesson_points INTEGER NOT NULL DEFAULT 0,
+                    module_points INTEGER NOT NULL DEFAULT 0,
+                    total_points INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, day)
+                );
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_user_daily_points_day
+                ON user_daily_points (day);
+            """))
+            conn.commit()
+            print("✓ Successfully created user_daily_points table")
+        except Exception as e:
+            print(f"✗ Error creating table: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the daily points table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS user_daily_points;"))
+            conn.commit()
+            print("✓ Successfully dropped user_daily_points table")
+        except Exception as e:
+            print(f"✗ Error dropping table: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add user_daily_points table")
+    upgrade()
@@ -0,0 +1,51 @@
+"""
+Add user_lesson_bits table
+Per-user lesson completion bitsets used for percentage, unlock and
+next-lesson checks. Rows are rebuilt from lesson_progress on first use,
+so no backfill is needed.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the bitset table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS user_lesson_bits (
+                    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                    layout VARCHAR(40) NOT NULL DEFAULT '',
+                    bits BYTEA NOT NULL DEFAULT '',
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                );
+            """))
+            conn.commit()
+            print("✓ Successfully created user_lesson_bits table")
+        except Exception as e:
+            print(f"✗ Error creating table: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the bitset table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS user_lesson_bits;"))
+            conn.commit()
+            print("✓ Successfully dropped user_lesson_bits table")
+        except Exception as e:
+            print(f"✗ Error dropping table: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add user_lesson_bits table")
+    upgrade()
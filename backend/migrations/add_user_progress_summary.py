@@ -0,0 +1,51 @@
+"""
+Add user_progress_summary table
+Per-user counters maintained by the progress write paths and used by the
+achievement engine instead of recounting raw progress rows
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+def upgrade():
+    """Create the summary table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS user_progress_summary (
+                    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                    lessons_completed INTEGER NOT NULL DEFAULT 0,
+                    modules_completed INTEGER NOT NULL DEFAULT 0,
+                    challenges_solved INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                );
+            """))
+            conn.commit()
+            print("✓ Successfully created user_progress_summary table")
+        except Exception as e:
+            print(f"✗ Error creating table: {e}")
+            conn.rollback()
+
+def downgrade():
+    """Drop the summary table"""
+    engine = create_engine(DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS user_progress_summary;"))
+            conn.commit()
+            print("✓ Successfully dropped user_progress_summary table")
+        except Exception as e:
+            print(f"✗ Error dropping table: {e}")
+            conn.rollback()
+
+if __name__ == "__main__":
+    print("Running migration: Add user_progress_summary table")
+    upgrade()
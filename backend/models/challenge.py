@@ -2,10 +2,18 @@
 Challenge Models
 Database models for CTF challenges, submissions, and leaderboards
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import (
+    Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum, JSON, event
+)
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from database.connection import Base
+from database.cache import bump_version
 import enum
+import itertools
+
+# Cache version bumped whenever challenge definitions change
+CHALLENGE_VERSION = "challenges"
 
 
 class ChallengeDifficulty(str, enum.Enum):
@@ -64,6 +72,9 @@ class Challenge(Base):
     # Status
     is_published = Column(Boolean, default=False, nullable=False)
     
+    # Distinct users with a correct submission, incremented on first solve
+    solver_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -92,6 +103,15 @@ class ChallengeSubmission(Base):
     
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        Index("ix_challenge_submissions_user_challenge", "user_id", "challenge_id"),
+        # At most one correct submission per user and challenge
+        Index(
+            "uq_challenge_submissions_solve", "user_id", "challenge_id", unique=True,
+            postgresql_where=is_correct == True, sqlite_where=is_correct == True
+        ),
+    )
+    
     def __repr__(self):
         return f"<ChallengeSubmission(id={self.id}, correct={self.is_correct})>"
 
@@ -132,10 +152,43 @@ class Leaderboard(Base):
     insane_solved = Column(Integer, default=0)
     
     # Metadata
-    rank = Column(Integer)  # Overall rank
+    rank = Column(Integer)  # Overall competition rank (1, 2, 2, 4) by total points, written by the ranking job
+    previous_rank = Column(Integer)  # Rank before the ranking job's last change to it
     last_solve_at = Column(DateTime(timezone=True))
     
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     def __repr__(self):
         return f"<Leaderboard(user_id={self.user_id}, points={self.total_points}, rank={self.rank})>"
+
+
+# ===== CACHE INVALIDATION =====
+
+@event.listens_for(Session, "after_flush")
+def _track_challenge_changes(session, flush_context):
+    """
+    Note challenge definitions this flush touched
+    solver_count is only changed by bulk UPDATEs, which do not pass through here.
+    """
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Challenge) and (
+            obj in session.deleted or session.is_modified(obj, include_collections=False)
+        ):
+            session.info["challenges_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_challenge_version(session):
+    """Invalidate challenge catalogs in every worker once the change is committed"""
+    if session.in_nested_transaction():
+        return  # Savepoint released; wait for the outer commit
+    if session.info.pop("challenges_changed", False):
+        bump_version(CHALLENGE_VERSION)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_challenge_changes(session):
+    if session.in_nested_transaction():
+        return  # Savepoint rolled back; marks still apply to the outer transaction
+    session.info.pop("challenges_changed", None)
@@ -0,0 +1,98 @@
+"""
+Contest Models
+Time-boxed CTF events with dynamically scored challenges and first-blood tracking
+"""
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from database.connection import Base
+
+
+class Contest(Base):
+    """A time-boxed event over a subset of challenges"""
+    __tablename__ = "contests"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    title = Column(String(300), nullable=False)
+    description = Column(Text)
+
+    # Submissions are accepted between these times
+    starts_at = Column(DateTime(timezone=True), nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Scoring
+    first_blood_bonus = Column(Integer, default=0, nullable=False)  # Extra points for each challenge's first solver
+
+    # Status
+    is_published = Column(Boolean, default=False, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Contest(id={self.id}, title='{self.title}')>"
+
+
+class ContestChallenge(Base):
+    """A challenge in a contest with its dynamic scoring state"""
+    __tablename__ = "contest_challenges"
+
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    challenge_id = Column(Integer, ForeignKey("challenges.id"), primary_key=True)
+
+    # Value decays from max_points to min_points as solves accumulate (reached at decay + 1 solvers)
+    max_points = Column(Integer, nullable=False)
+    min_points = Column(Integer, nullable=False)
+    decay = Column(Integer, nullable=False)
+
+    # Maintained on each solve
+    solver_count = Column(Integer, default=0, nullable=False)
+    current_value = Column(Integer, nullable=False)  # What every solver currently earns for it
+    first_blood_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    first_blood_at = Column(DateTime(timezone=True))
+
+    order = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<ContestChallenge(contest={self.contest_id}, challenge={self.challenge_id}, value={self.current_value})>"
+
+
+class ContestSolve(Base):
+    """A user's solve of a contest challenge"""
+    __tablename__ = "contest_solves"
+
+    id = Column(Integer, primary_key=True, index=True)
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), nullable=False)
+    challenge_id = Column(Integer, ForeignKey("challenges.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    is_first_blood = Column(Boolean, default=False, nullable=False)
+    solved_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # One solve per user and challenge; also the index for "solvers of this challenge"
+        UniqueConstraint("contest_id", "challenge_id", "user_id", name="uq_contest_solves_user"),
+    )
+
+    def __repr__(self):
+        return f"<ContestSolve(contest={self.contest_id}, challenge={self.challenge_id}, user={self.user_id})>"
+
+
+class ContestScore(Base):
+    """A participant's running score in a contest, updated incrementally on each solve"""
+    __tablename__ = "contest_scores"
+
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    points = Column(Integer, default=0, nullable=False)  # Sum of current challenge values plus bonuses
+    solves = Column(Integer, default=0, nullable=False)
+    first_bloods = Column(Integer, default=0, nullable=False)
+    last_solve_at = Column(DateTime(timezone=True))  # Tie-breaker: earlier is better
+
+    __table_args__ = (
+        Index("ix_contest_scores_board", "contest_id", "points", "last_solve_at"),
+    )
+
+    def __repr__(self):
+        return f"<ContestScore(contest={self.contest_id}, user={self.user_id}, points={self.points})>"
@@ -2,11 +2,18 @@
 Curriculum Models
 Database models for tiers, modules, lessons, and content
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum, event, insert, text
+)
+from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 from database.connection import Base
+from database.cache import bump_version
 import enum
+import itertools
+
+# Cache version bumped whenever curriculum rows change
+CURRICULUM_VERSION = "curriculum"
 
 
 class ContentType(str, enum.Enum):
@@ -131,3 +138,87 @@ class ContentBlock(Base):
     def __repr__(self):
         return f"<ContentBlock(id={self.id}, type='{self.type}')>"
 
+
+class LessonHtml(Base):
+    """Pre-rendered, sanitized HTML for a lesson, keyed by a hash of its source"""
+    __tablename__ = "lesson_html"
+    
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True)
+    source_hash = Column(String(64), nullable=False)  # sha256 of markdown + blocks + renderer version
+    html = Column(Text, nullable=False)
+    
+    rendered_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<LessonHtml(lesson_id={self.lesson_id}, hash='{self.source_hash[:12]}')>"
+
+
+class CurriculumChange(Base):
+    """
+    Append-only log of curriculum row changes
+    The highest revision is the curriculum revision; clients sync with
+    GET /curriculum/changes?since=<revision>.
+    """
+    __tablename__ = "curriculum_changes"
+    
+    revision = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)  # tier, module, lesson, content_block
+    entity_id = Column(Integer, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_curriculum_changes_entity", "entity_type", "entity_id"),
+    )
+    
+    def __repr__(self):
+        return f"<CurriculumChange(revision={self.revision}, {self.entity_type}={self.entity_id})>"
+
+
+# Entity type names used in the change log, per model
+CURRICULUM_ENTITIES = {Tier: "tier", Module: "module", Lesson: "lesson", ContentBlock: "content_block"}
+
+
+# ===== CHANGE LOG AND CACHE INVALIDATION =====
+
+def record_curriculum_changes(session: Session, entity_type: str, ids) -> None:
+    """
+    Log changed (inserted, updated or deleted) curriculum rows in this transaction
+    Bulk INSERT/UPDATE/DELETE statements must call this; the flush hook cannot see them.
+    """
+    rows = [{"entity_type": entity_type, "entity_id": entity_id} for entity_id in ids]
+    if rows:
+        connection = session.connection()
+        if connection.dialect.name == "postgresql":
+            # Serialize curriculum writers so revisions become visible in order
+            # and a client never skips a revision committed after a later one
+            connection.execute(text("LOCK TABLE curriculum_changes IN EXCLUSIVE MODE"))
+        connection.execute(insert(CurriculumChange.__table__), rows)
+        session.info["curriculum_changed"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_curriculum_changes(session, flush_context):
+    """Log curriculum rows this flush touched"""
+    changed = {}
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        entity_type = CURRICULUM_ENTITIES.get(type(obj))
+        if entity_type and (obj in session.deleted or session.is_modified(obj, include_collections=False)):
+            changed.setdefault(entity_type, set()).add(obj.id)
+    for entity_type, ids in changed.items():
+        record_curriculum_changes(session, entity_type, sorted(ids))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_curriculum_version(session):
+    """Invalidate curriculum caches in every worker once the change is committed"""
+    if session.in_nested_transaction():
+        return  # Savepoint released; wait for the outer commit
+    if session.info.pop("curriculum_changed", False):
+        bump_version(CURRICULUM_VERSION)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_curriculum_changes(session):
+    if session.in_nested_transaction():
+        return  # Savepoint rolled back; marks still apply to the outer transaction
+    session.info.pop("curriculum_changed", None)
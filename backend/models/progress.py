@@ -2,15 +2,28 @@
 Progress Tracking Models
 Track student progress through lessons, modules, and tiers
 """
-from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, Float, Boolean, Date, DateTime, ForeignKey, String, Text, Index, LargeBinary, event
+)
+from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 from database.connection import Base
+from database.cache import bump_version
+from typing import Iterable
+import itertools
+
+
+def progress_version_name(user_id: int) -> str:
+    """Cache version bumped whenever a user's progress or achievements change"""
+    return f"progress:{user_id}"
 
 
 class LessonProgress(Base):
     """Track individual lesson completion per student"""
     __tablename__ = "lesson_progress"
+    __table_args__ = (
+        Index("uq_lesson_progress_user_lesson", "user_id", "lesson_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -35,6 +48,9 @@ class LessonProgress(Base):
 class ModuleProgress(Base):
     """Track module-level progress aggregation"""
     __tablename__ = "module_progress"
+    __table_args__ = (
+        Index("uq_module_progress_user_module", "user_id", "module_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -59,6 +75,9 @@ class ModuleProgress(Base):
 class TierProgress(Base):
     """Track tier-level advancement with unlock system"""
     __tablename__ = "tier_progress"
+    __table_args__ = (
+        Index("uq_tier_progress_user_tier", "user_id", "tier_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -101,6 +120,9 @@ class Achievement(Base):
 class UserAchievement(Base):
     """Achievements earned by users"""
     __tablename__ = "user_achievements"
+    __table_args__ = (
+        Index("uq_user_achievements_user_achievement", "user_id", "achievement_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -113,3 +135,121 @@ class UserAchievement(Base):
 
     def __repr__(self):
         return f"<UserAchievement(user={self.user_id}, achievement={self.achievement_id})>"
+
+
+class UserProgressSummary(Base):
+    """Denormalized per-user progress read model, maintained on write"""
+    __tablename__ = "user_progress_summary"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    lessons_completed = Column(Integer, default=0, nullable=False)
+    modules_completed = Column(Integer, default=0, nullable=False)
+    challenges_solved = Column(Integer, default=0, nullable=False)
+    challenge_points = Column(Integer, default=0, nullable=False)
+    total_points = Column(Integer, default=0, nullable=False, index=True)  # challenge + lesson + module points
+    total_time_minutes = Column(Integer, default=0, nullable=False)
+    current_tier = Column(Integer, default=0, nullable=False)  # Highest unlocked tier_number
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserProgressSummary(user={self.user_id}, lessons={self.lessons_completed}, points={self.total_points})>"
+
+
+class UserDailyPoints(Base):
+    """Points a user earned on one day, the buckets behind time-windowed leaderboards"""
+    __tablename__ = "user_daily_points"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    challenge_points = Column(Integer, default=0, nullable=False)
+    lesson_points = Column(Integer, default=0, nullable=False)
+    module_points = Column(Integer, default=0, nullable=False)
+    total_points = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_daily_points_day", "day"),
+    )
+
+    def __repr__(self):
+        return f"<UserDailyPoints(user={self.user_id}, day={self.day}, points={self.total_points})>"
+
+
+class UserLessonBits(Base):
+    """Per-user lesson completion bitset, one bit per lesson in curriculum order"""
+    __tablename__ = "user_lesson_bits"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    layout = Column(String(40), nullable=False, default="")  # Curriculum layout the bit positions refer to
+    bits = Column(LargeBinary, nullable=False, default=b"")  # Little-endian, bit i = i-th lesson
+
+    # Unlock index over modules in dependency order, maintained with the lesson bits
+    modules_completed = Column(LargeBinary, nullable=False, default=b"")
+    modules_unlocked = Column(LargeBinary, nullable=False, default=b"")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserLessonBits(user={self.user_id}, layout='{self.layout}')>"
+
+
+class QuizAttempt(Base):
+    """A graded attempt at a quiz content block"""
+    __tablename__ = "quiz_attempts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # History is kept (block_id cleared) when a content reload replaces the block
+    block_id = Column(Integer, ForeignKey("content_blocks.id", ondelete="SET NULL"), nullable=True)
+    lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False)
+
+    score = Column(Integer, nullable=False)
+    max_score = Column(Integer, nullable=False)
+    passed = Column(Boolean, nullable=False)
+    answers = Column(Text, nullable=False)  # JSON list, one entry per question
+
+    submitted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_quiz_attempts_user_block", "user_id", "block_id"),
+    )
+
+    def __repr__(self):
+        return f"<QuizAttempt(user={self.user_id}, block={self.block_id}, score={self.score}/{self.max_score})>"
+
+
+# ===== CACHE INVALIDATION =====
+
+def mark_progress_changed(session: Session, user_ids: Iterable[int]) -> None:
+    """
+    Record users whose progress changed in this transaction
+    Needed for Core INSERT/UPDATE statements, which the flush hook cannot see.
+    """
+    session.info.setdefault("progress_changed", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_progress_changes(session, flush_context):
+    """Remember which users' progress rows this transaction touched"""
+    changed = {
+        obj.user_id for obj in itertools.chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, (LessonProgress, ModuleProgress, TierProgress, UserAchievement, UserProgressSummary))
+    }
+    if changed:
+        mark_progress_changed(session, changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_progress_versions(session):
+    """Invalidate per-user progress caches (ETags) once the change is committed"""
+    if session.in_nested_transaction():
+        return  # Savepoint released; wait for the outer commit
+    for user_id in session.info.pop("progress_changed", ()):
+        bump_version(progress_version_name(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_progress_changes(session):
+    if session.in_nested_transaction():
+        return  # Savepoint rolled back; marks still apply to the outer transaction
+    session.info.pop("progress_changed", None)
@@ -13,6 +13,7 @@ from auth.jwt_handler import create_access_token, create_refresh_token, decode_t
 from auth.audit_logger import log_action, log_login_attempt
 from auth.rbac import get_current_user
 from config import settings
+from services.leaderboard_service import LeaderboardService
 from schemas import (
     UserCreate,
     UserResponse,
@@ -76,6 +77,9 @@ async def register(
     )
     
     db.add(new_user)
+    db.flush()
+    # Ranked at zero points from the start, once the account is committed
+    LeaderboardService.stage_scores(db, {new_user.id: 0})
     db.commit()
     db.refresh(new_user)
     
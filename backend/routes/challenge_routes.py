@@ -4,25 +4,19 @@ Endpoints for CTF challenges, submissions, and leaderboard
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 from database.connection import get_db
 from models.user import User
-from models.challenge import Challenge, ChallengeSubmission, ChallengeDifficulty, Leaderboard
+from models.challenge import Challenge, ChallengeSubmission, ChallengeHint, Leaderboard
+from models.progress import UserProgressSummary
 from auth.rbac import get_current_user, require_admin
-
-# Import check_achievements (need to avoid circular import if progress_routes imports challenge_routes)
-# Better to move check_achievements to a service or utils, but for now importing inside function could work, 
-# or just import the router module if needed. 
-# Actually, let's keep it simple. We can't easily import from routes. 
-# Plan: Re-implement small check logic here or move check_achievements to a shared valid location.
-# For simplicity in this session, I will replicate the check logic call or try import. 
-# Given python imports, 'from routes.progress_routes import check_achievements' might fail if progress_routes imports this file.
-# Let's see... progress_routes does NOT import challenge_routes. It imports models.challenge. SO IT IS SAFE.
-
-from routes.progress_routes import check_achievements
+from services.challenge_catalog import ChallengeCatalog
+from services.challenge_scoring import ChallengeScoring
+from services.leaderboard_service import LeaderboardService
+from services.progress_service import LESSON_POINTS, MODULE_POINTS
+from services.score_buckets import ScoreBuckets, ScorePeriod
 
 router = APIRouter()
 
@@ -34,41 +28,13 @@ async def get_challenges(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all published challenges with optional filtering"""
-    query = db.query(Challenge).filter(Challenge.is_published == True)
-    
-    if category:
-        query = query.filter(Challenge.category == category)
-    if difficulty:
-        query = query.filter(Challenge.difficulty == difficulty)
-    
-    challenges = query.all()
-    
-    # Return with solve status for current user
-    result = []
-    for challenge in challenges:
-        solved = db.query(ChallengeSubmission).filter(
-            ChallengeSubmission.challenge_id == challenge.id,
-            ChallengeSubmission.user_id == current_user.id,
-            ChallengeSubmission.is_correct == True
-        ).first()
-        
-        result.append({
-            "id": challenge.id,
-            "title": challenge.title,
-            "description": challenge.description,
-            "category": challenge.category,
-            "difficulty": challenge.difficulty,
-            "base_points": challenge.base_points,
-            "tags": challenge.tags,
-            "solved": bool(solved),
-            "solvers_count": db.query(ChallengeSubmission).filter(
-                ChallengeSubmission.challenge_id == challenge.id,
-                ChallengeSubmission.is_correct == True
-            ).count()
-        })
-    
-    return result
+    """
+    Get all published challenges with optional filtering
+
+    The listing comes from a per-filter catalog cached until a challenge is
+    edited; solver counts and the user's solves cost one query each.
+    """
+    return ChallengeCatalog.list_for_user(current_user.id, db, category, difficulty)
 
 
 @router.get("/{challenge_id}", response_model=dict)
@@ -112,105 +78,17 @@ async def submit_flag(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Submit a flag for a challenge"""
+    """
+    Submit a flag for a challenge
+
+    Scoring is race-free: parallel solves by the same user record one
+    solve, and counters are incremented atomically.
+    """
     challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
-    # Check if already solved
-    existing_solve = db.query(ChallengeSubmission).filter(
-        ChallengeSubmission.challenge_id == challenge_id,
-        ChallengeSubmission.user_id == current_user.id,
-        ChallengeSubmission.is_correct == True
-    ).first()
-    
-    if existing_solve:
-        return {"correct": True, "message": "Already solved", "points": 0}
-    
-    # Validate flag
-    is_correct = (flag.strip() == challenge.flag.strip())
-    
-    # Calculate points (base points minus hint penalties)
-    hints_used = db.query(ChallengeSubmission).filter(
-        ChallengeSubmission.challenge_id == challenge_id,
-        ChallengeSubmission.user_id == current_user.id
-    ).count()  # Simplified: count previous attempts as hints
-    
-    points = challenge.base_points
-    if is_correct:
-        penalty = (hints_used * challenge.hint_penalty) / 100
-        points = int(points * (1 - penalty))
-    else:
-        points = 0
-    
-    # Create submission
-    submission = ChallengeSubmission(
-        challenge_id=challenge_id,
-        user_id=current_user.id,
-        submitted_flag=flag,
-        is_correct=is_correct,
-        points_earned=points,
-        hints_used=hints_used
-    )
-    db.add(submission)
-    
-    # Update leaderboard if correct
-    if is_correct:
-        leaderboard = db.query(Leaderboard).filter(
-            Leaderboard.user_id == current_user.id
-        ).first()
-        
-        if not leaderboard:
-            leaderboard = Leaderboard(
-                user_id=current_user.id,
-                total_points=0,
-                challenges_solved=0,
-                easy_solved=0,
-                medium_solved=0,
-                hard_solved=0,
-                insane_solved=0
-            )
-            db.add(leaderboard)
-        
-        # Defensive check for existing nulls
-        if leaderboard.total_points is None:
-            leaderboard.total_points = 0
-        if leaderboard.challenges_solved is None:
-            leaderboard.challenges_solved = 0
-        if leaderboard.easy_solved is None:
-            leaderboard.easy_solved = 0
-        if leaderboard.medium_solved is None:
-            leaderboard.medium_solved = 0
-        if leaderboard.hard_solved is None:
-            leaderboard.hard_solved = 0
-        if leaderboard.insane_solved is None:
-            leaderboard.insane_solved = 0
-            
-        leaderboard.total_points += points
-        leaderboard.challenges_solved += 1
-        leaderboard.last_solve_at = datetime.utcnow()
-        
-        # Update difficulty counters
-        if challenge.difficulty == ChallengeDifficulty.EASY:
-            leaderboard.easy_solved += 1
-        elif challenge.difficulty == ChallengeDifficulty.MEDIUM:
-            leaderboard.medium_solved += 1
-        elif challenge.difficulty == ChallengeDifficulty.HARD:
-            leaderboard.hard_solved += 1
-        elif challenge.difficulty == ChallengeDifficulty.INSANE:
-            leaderboard.insane_solved += 1
-    
-    db.commit()
-    
-    # Check for achievements
-    if is_correct:
-        await check_achievements(current_user.id, db)
-    
-    return {
-        "correct": is_correct,
-        "message": f"Correct! You earned {points} points." if is_correct else "Incorrect flag. Try again!",
-        "points_earned": points
-    }
+    return ChallengeScoring.submit(current_user.id, challenge, flag, db)
 
 
 @router.get("/{challenge_id}/hints", response_model=List[dict])
@@ -235,86 +113,114 @@ async def get_hints(
     ]
 
 
-@router.get("/leaderboard/global", response_model=List[dict])
-async def get_leaderboard(
-    limit: int = 1000,  # Increased to show all users
-    db: Session = Depends(get_db)
-):
-    """Get global leaderboard - now shows ALL users with points from all sources"""
-    from sqlalchemy import func
-    from models.progress import LessonProgress, ModuleProgress
-    
-    # Calculate points for each user from all sources:
-    # - Challenges: from Leaderboard table
-    # - Lessons: 10 points per completed lesson
-    # - Modules: 50 points per completed module
-    
-    # Subquery for lesson points (10 points per completed lesson)
-    lesson_points_subq = db.query(
-        LessonProgress.user_id,
-        func.count(LessonProgress.id).label('lessons_completed'),
-        (func.count(LessonProgress.id) * 10).label('lesson_points')
-    ).filter(
-        LessonProgress.is_completed == True
-    ).group_by(LessonProgress.user_id).subquery()
-    
-    # Subquery for module points (50 points per completed module)
-    module_points_subq = db.query(
-        ModuleProgress.user_id,
-        func.count(ModuleProgress.id).label('modules_completed'),
-        (func.count(ModuleProgress.id) * 50).label('module_points')
-    ).filter(
-        ModuleProgress.is_completed == True
-    ).group_by(ModuleProgress.user_id).subquery()
-    
-    # Main query with all users
-    entries = db.query(
-        User,
-        func.coalesce(Leaderboard.total_points, 0).label('challenge_points'),
-        func.coalesce(Leaderboard.challenges_solved, 0).label('challenges_solved'),
-        func.coalesce(lesson_points_subq.c.lesson_points, 0).label('lesson_points'),
-        func.coalesce(lesson_points_subq.c.lessons_completed, 0).label('lessons_completed'),
-        func.coalesce(module_points_subq.c.module_points, 0).label('module_points'),
-        func.coalesce(module_points_subq.c.modules_completed, 0).label('modules_completed'),
-        (
-            func.coalesce(Leaderboard.total_points, 0) + 
-            func.coalesce(lesson_points_subq.c.lesson_points, 0) + 
-            func.coalesce(module_points_subq.c.module_points, 0)
-        ).label('total_points'),
-        Leaderboard.last_solve_at
-    ).outerjoin(
-        Leaderboard, User.id == Leaderboard.user_id
-    ).outerjoin(
-        lesson_points_subq, User.id == lesson_points_subq.c.user_id
-    ).outerjoin(
-        module_points_subq, User.id == module_points_subq.c.user_id
-    ).order_by(
-        (
-            func.coalesce(Leaderboard.total_points, 0) + 
-            func.coalesce(lesson_points_subq.c.lesson_points, 0) + 
-            func.coalesce(module_points_subq.c.module_points, 0)
-        ).desc()
-    ).limit(limit).all()
+def _leaderboard_rows(entries, db: Session) -> List[dict]:
+    """Leaderboard rows for (rank, user_id, total_points) entries, with one query for the details"""
+    user_ids = [user_id for _, user_id, _ in entries]
+    details = {
+        row.id: row for row in db.query(
+            User.id,
+            User.username,
+            UserProgressSummary.lessons_completed,
+            UserProgressSummary.modules_completed,
+            Leaderboard.total_points.label('challenge_points'),
+            Leaderboard.challenges_solved,
+            Leaderboard.last_solve_at
+        ).outerjoin(
+            UserProgressSummary, User.id == UserProgressSummary.user_id
+        ).outerjoin(
+            Leaderboard, User.id == Leaderboard.user_id
+        ).filter(User.id.in_(user_ids))
+    } if user_ids else {}
     
     result = []
-    for rank, (user, challenge_points, challenges_solved, lesson_points, lessons_completed, 
-               module_points, modules_completed, total_points, last_solve_at) in enumerate(entries, start=1):
+    for rank, user_id, total_points in entries:
+        row = details.get(user_id)
+        if row is None:
+            continue  # Deleted since it was ranked
+        lessons_completed = row.lessons_completed or 0
+        modules_completed = row.modules_completed or 0
         result.append({
             "rank": rank,
-            "username": user.username,
-            "total_points": int(total_points),
-            "challenge_points": int(challenge_points),
-            "challenges_solved": int(challenges_solved),
-            "lesson_points": int(lesson_points),
-            "lessons_completed": int(lessons_completed),
-            "module_points": int(module_points),
-            "modules_completed": int(modules_completed),
-            "last_solve_at": last_solve_at.isoformat() if last_solve_at else None
+            "username": row.username,
+            "total_points": total_points,
+            "challenge_points": row.challenge_points or 0,
+            "challenges_solved": row.challenges_solved or 0,
+            "lesson_points": lessons_completed * LESSON_POINTS,
+            "lessons_completed": lessons_completed,
+            "module_points": modules_completed * MODULE_POINTS,
+            "modules_completed": modules_completed,
+            "last_solve_at": row.last_solve_at.isoformat() if row.last_solve_at else None
         })
-    
     return result
 
 
+@router.get("/leaderboard/global", response_model=List[dict])
+async def get_leaderboard(
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of the global leaderboard (points from challenges, lessons and modules)
+
+    Ranks come from the leaderboard sorted set, so a page costs O(log n + limit)
+    plus one query for the listed users' details. Tied users share a rank.
+    """
+    return _leaderboard_rows(LeaderboardService.page(db, offset, limit), db)
+
+
+@router.get("/leaderboard/me", response_model=dict)
+async def get_my_leaderboard_position(
+    radius: int = Query(5, ge=0, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current user's rank and the users ranked just above and below them
+
+    Users join the leaderboard when they register, so rank is None only
+    for accounts created some other way (seed scripts) since the last rebuild.
+    """
+    rank, entries = LeaderboardService.around(current_user.id, db, radius)
+    
+    return {
+        "rank": rank,
+        "total_players": LeaderboardService.size(db),
+        "entries": _leaderboard_rows(entries, db)
+    }
+
+
+@router.get("/leaderboard/{period}", response_model=dict)
+async def get_period_leaderboard(
+    period: ScorePeriod,
+    on: Optional[date] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the leaderboard for points earned in a day, week, month or season
+
+    Daily, weekly and monthly windows contain `on` (default today); a
+    season needs explicit start and end dates. Served from per-user daily
+    score buckets, never from raw submission history.
+    """
+    if period == ScorePeriod.SEASON:
+        if start is None or end is None or start > end:
+            raise HTTPException(status_code=400, detail="A season needs start and end dates, start first")
+    else:
+        start, end = ScoreBuckets.window(period, on or datetime.now().date())
+    
+    return {
+        "period": period.value,
+        "start": start,
+        "end": end,
+        "entries": ScoreBuckets.leaderboard(db, start, end, offset, limit)
+    }
+
+
 # Admin endpoints
 @router.post("/", dependencies=[Depends(require_admin)])
 async def create_challenge(
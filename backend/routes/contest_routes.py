@@ -0,0 +1,203 @@
+"""
+Contest Routes
+Endpoints for time-boxed CTF contests with dynamic scoring
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from database.connection import get_db
+from models.user import User, UserRole
+from models.challenge import Challenge
+from models.contest import Contest, ContestChallenge, ContestSolve, ContestScore
+from auth.rbac import get_current_user, require_admin
+from schemas import ContestCreate
+from services.contest_scoring import ContestScoring, as_utc, challenge_value
+
+router = APIRouter()
+
+
+def _get_contest(contest_id: int, db: Session, current_user: User) -> Contest:
+    contest = db.query(Contest).filter(Contest.id == contest_id).first()
+    if not contest or (not contest.is_published and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail="Contest not found")
+    return contest
+
+
+def _contest_info(contest: Contest) -> dict:
+    return {
+        "id": contest.id,
+        "title": contest.title,
+        "description": contest.description,
+        "starts_at": as_utc(contest.starts_at).isoformat(),
+        "ends_at": as_utc(contest.ends_at).isoformat(),
+        "first_blood_bonus": contest.first_blood_bonus,
+        "status": ContestScoring.status(contest)
+    }
+
+
+@router.get("/", response_model=List[dict])
+async def get_contests(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List published contests, most recent first"""
+    contests = db.query(Contest).filter(Contest.is_published == True).order_by(Contest.starts_at.desc()).all()
+    return [_contest_info(contest) for contest in contests]
+
+
+@router.post("/", response_model=dict)
+async def create_contest(
+    data: ContestCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin())
+):
+    """Create a contest over a subset of challenges (admin only)"""
+    if data.ends_at <= data.starts_at:
+        raise HTTPException(status_code=400, detail="Contest must end after it starts")
+
+    challenge_ids = [config.challenge_id for config in data.challenges]
+    if len(set(challenge_ids)) != len(challenge_ids):
+        raise HTTPException(status_code=400, detail="Challenges can only be added once")
+    base_points = dict(
+        db.query(Challenge.id, Challenge.base_points).filter(Challenge.id.in_(challenge_ids)).all()
+    )
+    missing = set(challenge_ids) - base_points.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Challenges not found: {sorted(missing)}")
+
+    contest = Contest(
+        title=data.title,
+        description=data.description,
+        starts_at=data.starts_at,
+        ends_at=data.ends_at,
+        first_blood_bonus=data.first_blood_bonus,
+        is_published=data.is_published
+    )
+    db.add(contest)
+    db.flush()
+
+    for config in data.challenges:
+        max_points = config.max_points or base_points[config.challenge_id] or 1
+        min_points = config.min_points if config.min_points is not None else max_points // 5
+        if min_points > max_points:
+            raise HTTPException(status_code=400, detail="min_points cannot exceed max_points")
+        db.add(ContestChallenge(
+            contest_id=contest.id,
+            challenge_id=config.challenge_id,
+            max_points=max_points,
+            min_points=min_points,
+            decay=config.decay,
+            current_value=challenge_value(max_points, min_points, config.decay, 0),
+            order=config.order
+        ))
+    db.commit()
+    db.refresh(contest)
+
+    return {**_contest_info(contest), "challenges": len(data.challenges)}
+
+
+@router.get("/{contest_id}", response_model=dict)
+async def get_contest(
+    contest_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a contest with its challenges' current values
+
+    Challenges are hidden until the contest starts.
+    """
+    contest = _get_contest(contest_id, db, current_user)
+    info = _contest_info(contest)
+    if info["status"] == "upcoming" and current_user.role != UserRole.ADMIN:
+        return {**info, "challenges": [], "my_score": None}
+
+    rows = db.query(
+        ContestChallenge, Challenge.title, Challenge.category, Challenge.difficulty, User.username
+    ).join(
+        Challenge, Challenge.id == ContestChallenge.challenge_id
+    ).outerjoin(
+        User, User.id == ContestChallenge.first_blood_user_id
+    ).filter(
+        ContestChallenge.contest_id == contest.id
+    ).order_by(ContestChallenge.order, ContestChallenge.challenge_id).all()
+
+    solved_ids = {
+        challenge_id for (challenge_id,) in db.query(ContestSolve.challenge_id).filter(
+            ContestSolve.contest_id == contest.id,
+            ContestSolve.user_id == current_user.id
+        )
+    }
+    my_score = db.query(ContestScore).filter(
+        ContestScore.contest_id == contest.id,
+        ContestScore.user_id == current_user.id
+    ).first()
+
+    return {
+        **info,
+        "challenges": [
+            {
+                "id": contest_challenge.challenge_id,
+                "title": title,
+                "category": category,
+                "difficulty": difficulty,
+                "value": contest_challenge.current_value,
+                "max_points": contest_challenge.max_points,
+                "min_points": contest_challenge.min_points,
+                "solver_count": contest_challenge.solver_count,
+                "first_blood": first_blood_username,
+                "solved": contest_challenge.challenge_id in solved_ids
+            }
+            for contest_challenge, title, category, difficulty, first_blood_username in rows
+        ],
+        "my_score": {
+            "points": my_score.points,
+            "solves": my_score.solves,
+            "first_bloods": my_score.first_bloods
+        } if my_score else None
+    }
+
+
+@router.post("/{contest_id}/challenges/{challenge_id}/submit", response_model=dict)
+async def submit_contest_flag(
+    contest_id: int,
+    challenge_id: int,
+    flag: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Submit a flag for a contest challenge
+
+    A solve lowers the challenge's value for everyone who solved it, so the
+    response reports what it is worth now. Only that challenge's solvers
+    are re-scored.
+    """
+    contest = _get_contest(contest_id, db, current_user)
+    if ContestScoring.status(contest) != "running":
+        raise HTTPException(status_code=403, detail="Contest is not running")
+
+    challenge = db.query(Challenge).join(
+        ContestChallenge, ContestChallenge.challenge_id == Challenge.id
+    ).filter(
+        ContestChallenge.contest_id == contest.id,
+        Challenge.id == challenge_id
+    ).first()
+    if not challenge:
+        raise HTTPException(status_code=404, detail="Challenge not found in this contest")
+
+    return ContestScoring.submit(contest, challenge, current_user.id, flag, db)
+
+
+@router.get("/{contest_id}/scoreboard", response_model=List[dict])
+async def get_contest_scoreboard(
+    contest_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of the contest scoreboard; equal points are ordered by who reached them first"""
+    contest = _get_contest(contest_id, db, current_user)
+    return ContestScoring.scoreboard(contest.id, db, offset, limit)
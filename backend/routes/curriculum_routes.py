@@ -1,32 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
 
 from database.connection import get_db
 from models.curriculum import Tier, Module, Lesson, ContentBlock
-from schemas import TierResponse, ModuleResponse, LessonResponse
+from models.progress import LessonProgress, ModuleProgress
+from models.user import User
+from auth.rbac import get_current_user
+from schemas import (
+    TierSummaryResponse, ModuleSummaryResponse, LessonResponse,
+    ModuleBundleResponse, LessonProgressState, ModuleProgressState, CurriculumChangesResponse
+)
+from services.curriculum_cache import CurriculumCache, lesson_summary_loader
+from services.curriculum_sync import CurriculumSync
+from services.completion_bits import CompletionBits
+from services.lesson_renderer import LessonRenderer
 
 router = APIRouter()
 
+# Rendered HTML requested by content hash never changes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
-@router.get("/tiers", response_model=List[TierResponse])
+
+@router.get("/tiers", response_model=List[TierSummaryResponse])
 async def get_tiers(db: Session = Depends(get_db)):
     """
     Get all curriculum tiers with their modules.
     Only returns active tiers and published modules.
+    Lessons are summaries; full content comes from /lessons/{lesson_id}.
+    """
+    # Built with selectin loading and serialized once per curriculum version
+    return Response(content=CurriculumCache.get_tiers_json(db), media_type="application/json")
+
+
+@router.get("/changes", response_model=CurriculumChangesResponse)
+async def get_curriculum_changes(
+    since: int = Query(0, ge=0, description="Revision from the client's last sync"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get curriculum rows changed since a revision, for incremental client sync
+    
+    Returns changed tiers, modules, lessons and content blocks as flat rows
+    plus the ids of deleted ones. With since=0 (or an unknown revision) the
+    whole curriculum is returned and `full` is true. Store `revision` and
+    pass it as `since` next time.
     """
-    tiers = db.query(Tier).filter(Tier.is_active == True).order_by(Tier.order).all()
-    # Note: Filtering nested relations in SQLAlchemy usually required joinedload with filter, 
-    # but for simplicity we'll rely on active tiers. 
-    # Ideally we should filter modules too, but Pydantic will serialize what's loaded.
-    # For a production app, we'd want to be more specific with loading strategies.
-    return tiers
+    return CurriculumSync.changes_since(db, since)
 
 
-@router.get("/tiers/{tier_id}", response_model=TierResponse)
+@router.get("/tiers/{tier_id}", response_model=TierSummaryResponse)
 async def get_tier(tier_id: int, db: Session = Depends(get_db)):
     """Get a specific tier details"""
-    tier = db.query(Tier).filter(Tier.id == tier_id).first()
+    tier = db.query(Tier).options(
+        lesson_summary_loader(selectinload(Tier.modules).selectinload(Module.lessons))
+    ).filter(Tier.id == tier_id).first()
     if not tier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -35,10 +64,12 @@ async def get_tier(tier_id: int, db: Session = Depends(get_db)):
     return tier
 
 
-@router.get("/modules/{module_id}", response_model=ModuleResponse)
+@router.get("/modules/{module_id}", response_model=ModuleSummaryResponse)
 async def get_module(module_id: int, db: Session = Depends(get_db)):
-    """Get a specific module details with its lessons"""
-    module = db.query(Module).filter(Module.id == module_id).first()
+    """Get a specific module details with its lesson summaries"""
+    module = db.query(Module).options(
+        lesson_summary_loader(selectinload(Module.lessons))
+    ).filter(Module.id == module_id).first()
     if not module:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,6 +78,76 @@ async def get_module(module_id: int, db: Session = Depends(get_db)):
     return module
 
 
+@router.get("/modules/{module_id}/bundle", response_model=ModuleBundleResponse)
+async def get_module_bundle(
+    module_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a module with its ordered lessons, content blocks and the caller's progress
+    
+    Six queries regardless of module size (module, lessons, blocks, module
+    progress, lesson progress, unlock index), so a client can prefetch a
+    whole module in one request instead of one call per lesson.
+    """
+    module = db.query(Module).options(
+        selectinload(Module.lessons).selectinload(Lesson.content_blocks)
+    ).filter(Module.id == module_id).first()
+    if not module:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Module not found"
+        )
+    
+    module_progress = db.query(ModuleProgress).filter(
+        ModuleProgress.user_id == current_user.id,
+        ModuleProgress.module_id == module_id
+    ).first()
+    progress_by_lesson = {
+        p.lesson_id: p for p in db.query(LessonProgress).join(
+            Lesson, Lesson.id == LessonProgress.lesson_id
+        ).filter(
+            LessonProgress.user_id == current_user.id,
+            Lesson.module_id == module_id
+        )
+    }
+    
+    bundle = ModuleBundleResponse.model_validate(module)
+    lessons = []
+    completed = 0
+    next_lesson_id = None
+    for lesson, item in zip(module.lessons, bundle.lessons):
+        lp = progress_by_lesson.get(lesson.id)
+        if lp and lp.is_completed:
+            completed += 1
+        elif next_lesson_id is None and lesson.is_published:
+            next_lesson_id = lesson.id
+        lessons.append(item.model_copy(update={
+            "content_hash": LessonRenderer.source_hash(lesson),
+            "progress": LessonProgressState(
+                is_completed=lp.is_completed,
+                started_at=lp.started_at,
+                completed_at=lp.completed_at,
+                time_spent_minutes=lp.time_spent_minutes or 0
+            ) if lp else LessonProgressState()
+        }))
+    
+    return bundle.model_copy(update={
+        "lessons": lessons,
+        "progress": ModuleProgressState(
+            is_unlocked=CompletionBits.get_index(current_user.id, db).is_module_unlocked(module_id),
+            completion_percentage=module_progress.completion_percentage if module_progress else 0.0,
+            is_completed=module_progress.is_completed if module_progress else False,
+            lessons_completed=completed,
+            total_lessons=len(lessons),
+            started_at=module_progress.started_at if module_progress else None,
+            completed_at=module_progress.completed_at if module_progress else None,
+            next_lesson_id=next_lesson_id
+        )
+    })
+
+
 @router.get("/lessons/{lesson_id}", response_model=LessonResponse)
 async def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
     """Get full lesson content including content blocks"""
@@ -63,4 +164,47 @@ async def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
     # Ensure content blocks are ordered
     lesson.content_blocks.sort(key=lambda x: x.order)
     
-    return lesson
+    return LessonResponse.model_validate(lesson).model_copy(
+        update={"content_hash": LessonRenderer.source_hash(lesson)}
+    )
+
+
+@router.get("/lessons/{lesson_id}/html", response_class=HTMLResponse)
+async def get_lesson_html(
+    lesson_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get a lesson's markdown and content blocks as sanitized HTML
+    
+    Pass the lesson's content_hash as `v` to get a response that can be
+    cached forever; without it the response must be revalidated.
+    """
+    # Known hash: serve the stored render without loading the lesson source
+    if v:
+        cached = LessonRenderer.get_cached(lesson_id, v, db)
+        if cached is not None:
+            return HTMLResponse(cached, headers={"ETag": f'"{v}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    
+    lesson = db.query(Lesson).options(
+        selectinload(Lesson.content_blocks)
+    ).filter(Lesson.id == lesson_id).first()
+    
+    if not lesson:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson not found"
+        )
+    
+    source_hash, html = LessonRenderer.get_html(lesson, db)
+    db.commit()
+    
+    headers = {
+        "ETag": f'"{source_hash}"',
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == source_hash else "no-cache"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return HTMLResponse(html, headers=headers)
@@ -2,17 +2,26 @@
 Progress Tracking API Routes
 Handle lesson, module, and tier progress tracking
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import func, case
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
 
-from database.connection import get_db
+from config import settings
+from database.connection import get_db, dialect_insert
+from database.cache import get_version
 from models.user import User
-from models.progress import LessonProgress, ModuleProgress, TierProgress, Achievement, UserAchievement
-from models.curriculum import Tier, Module, Lesson
+from models.progress import LessonProgress, ModuleProgress, TierProgress, progress_version_name
+from models.curriculum import Module, CURRICULUM_VERSION
 from auth.rbac import get_current_user
+from schemas import LessonCompletionEvent, LessonSyncRequest, HeartbeatRequest
+from services.progress_service import ProgressService, LESSON_POINTS, MODULE_POINTS
+from services.achievement_service import AchievementService, AchievementEvent
+from services.curriculum_cache import CurriculumCache
+from services.heartbeat_service import HeartbeatService
+from services.completion_bits import CompletionBits
+from services.score_buckets import ScoreBuckets
 
 router = APIRouter(tags=["progress"])
 
@@ -20,166 +29,52 @@ router = APIRouter(tags=["progress"])
 # Test user helper removed - using real auth now
 
 
-@router.get("/me")
-async def get_my_progress(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get current user's detailed progress for dashboard"""
-    # Sync achievements first (retroactive check)
-    await check_achievements(current_user.id, db)
-
-    # 1. Calculate Overall Stats
-    total_lessons_completed = db.query(LessonProgress).filter(
-        LessonProgress.user_id == current_user.id,
-        LessonProgress.is_completed == True
-    ).count()
+# ===== CONDITIONAL GET =====
 
-    total_modules_completed = db.query(ModuleProgress).filter(
-        ModuleProgress.user_id == current_user.id,
-        ModuleProgress.is_completed == True
-    ).count()
-
-    # Calculate total time
-    total_time_minutes = db.query(func.sum(LessonProgress.time_spent_minutes)).filter(
-        LessonProgress.user_id == current_user.id
-    ).scalar() or 0
-
-    # Get current tier
-    current_tier_progress = db.query(TierProgress).filter(
-        TierProgress.user_id == current_user.id,
-        TierProgress.is_unlocked == True
-    ).order_by(TierProgress.tier_id.desc()).first()
-    
-    current_tier_number = 0
-    if current_tier_progress:
-        tier = db.query(Tier).filter(Tier.id == current_tier_progress.tier_id).first()
-        if tier:
-            current_tier_number = tier.tier_number
-
-    # Mock achievements (feature not implemented yet)
-    # Mock achievements (feature not implemented yet)
-    # in future: db.query(UserAchievement).filter(...)
-    user_achievements = db.query(UserAchievement).filter(
-        UserAchievement.user_id == current_user.id
-    ).all()
+def progress_etag(user_id: int) -> Optional[str]:
+    """
+    Strong ETag for a user's progress views, from the user's progress
+    version and the curriculum version (no progress tables are read)
     
-    achievements_data = []
-    for ua in user_achievements:
-        achievements_data.append({
-            "name": ua.achievement.name,
-            "description": ua.achievement.description,
-            "icon_url": ua.achievement.icon_name, # Mapping name to frontend icon logic
-            "earned_at": ua.earned_at
-        })
-
-    # 2. Build Module List
-    modules_data = []
-    all_modules = db.query(Module).all()
-    
-    for module in all_modules:
-        # Get module progress
-        mp = db.query(ModuleProgress).filter(
-            ModuleProgress.user_id == current_user.id,
-            ModuleProgress.module_id == module.id
-        ).first()
-
-        # Get lessons stats for this module
-        module_lessons = db.query(Lesson).filter(Lesson.module_id == module.id).all()
-        lesson_ids = [l.id for l in module_lessons]
-        
-        lessons_completed_count = db.query(LessonProgress).filter(
-            LessonProgress.user_id == current_user.id,
-            LessonProgress.lesson_id.in_(lesson_ids),
-            LessonProgress.is_completed == True
-        ).count()
-
-        module_time = db.query(func.sum(LessonProgress.time_spent_minutes)).filter(
-            LessonProgress.user_id == current_user.id,
-            LessonProgress.lesson_id.in_(lesson_ids)
-        ).scalar() or 0
-
-        modules_data.append({
-            "module_id": module.id,
-            "title": module.title,
-            "completion_percent": mp.completion_percentage if mp else 0.0,
-            "is_completed": mp.is_completed if mp else False,
-            "lessons_completed": lessons_completed_count,
-            "total_lessons": len(module_lessons),
-            "time_spent_minutes": module_time
-        })
-
-    # Sort modules by id? or order? Assuming ID assumes order for now
-    modules_data.sort(key=lambda x: x["module_id"])
-
-    return {
-        "overall": {
-            "current_tier": current_tier_number,
-            "modules_completed": total_modules_completed,
-            "labs_completed": 0, # Lab tracking not yet implemented
-            "challenges_solved": 0, # Challenge tracking to be fixed separately or derived
-            "total_points": total_lessons_completed * 10, # Mock points
-            "total_achievements": len(achievements_data),
-            "total_time_minutes": total_time_minutes
-        },
-        "modules": modules_data,
-        "achievements": achievements_data
-    }
+    None when Redis is unavailable: per-process versions alone could
+    hand out a stale 304 from a worker that missed the change.
+    """
+    progress_version = get_version(progress_version_name(user_id))
+    curriculum_version = get_version(CURRICULUM_VERSION)
+    if progress_version.startswith("-") or curriculum_version.startswith("-"):
+        return None
+    return f'"p{progress_version}-c{curriculum_version}"'
 
 
-async def check_achievements(user_id: int, db: Session):
-    """Internal function to check and award achievements"""
-    # Get all possible achievements
-    all_achievements = db.query(Achievement).all()
+def not_modified(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """Return a 304 if the client's copy is current, otherwise tag the response"""
+    if etag is None:
+        return None
     
-    # Get user stats
-    lesson_count = db.query(LessonProgress).filter(
-        LessonProgress.user_id == user_id, LessonProgress.is_completed == True
-    ).count()
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    # Need to check challenges too (circular import risk if importing Challenge routes/models here? No, models are fine)
-    # We will import ChallengeSubmission inside function or at top if safe
-    from models.challenge import ChallengeSubmission
-    challenge_count = db.query(ChallengeSubmission).filter(
-        ChallengeSubmission.user_id == user_id, ChallengeSubmission.is_correct == True
-    ).count()
+    response.headers.update(headers)
+    return None
 
-    module_completions = db.query(ModuleProgress).filter(
-        ModuleProgress.user_id == user_id, ModuleProgress.is_completed == True
-    ).all()
-    completed_module_ids = [m.module_id for m in module_completions]
-    
-    newly_awarded = False
-    
-    for ach in all_achievements:
-        # Check if already earned
-        earned = db.query(UserAchievement).filter(
-            UserAchievement.user_id == user_id,
-            UserAchievement.achievement_id == ach.id
-        ).first()
-        
-        if earned:
-            continue
-            
-        award = False
-        
-        if ach.criteria_type == 'lesson_count':
-            if lesson_count >= ach.criteria_value:
-                award = True
-        elif ach.criteria_type == 'challenge_count':
-            if challenge_count >= ach.criteria_value:
-                award = True
-        elif ach.criteria_type == 'module_complete':
-            if ach.criteria_value in completed_module_ids:
-                award = True
-                
-        if award:
-            new_ach = UserAchievement(user_id=user_id, achievement_id=ach.id)
-            db.add(new_ach)
-            newly_awarded = True
-            
-    if newly_awarded:
-        db.commit()
+
+@router.get("/me")
+async def get_my_progress(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get current user's detailed progress for dashboard"""
+    cached = not_modified(request, response, progress_etag(current_user.id))
+    if cached:
+        return cached
+    
+    # Achievements are awarded on write, so the read path only aggregates
+    # with a constant number of grouped queries regardless of curriculum size
+    return ProgressService.get_dashboard(current_user.id, db)
 
 
 # ===== LESSON PROGRESS =====
@@ -192,73 +87,267 @@ async def start_lesson(
 ):
     """Mark a lesson as started"""
     # Check if lesson exists
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-    if not lesson:
+    if lesson_id not in CurriculumCache.get(db).lesson_module:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    
-    # Check if progress already exists
-    progress = db.query(LessonProgress).filter(
-        LessonProgress.user_id == current_user.id,
-        LessonProgress.lesson_id == lesson_id
-    ).first()
-    
-    if not progress:
-        progress = LessonProgress(
-            user_id=current_user.id,
-            lesson_id=lesson_id
-        )
-        db.add(progress)
-        db.commit()
-        db.refresh(progress)
+    if CompletionBits.is_lesson_locked(current_user.id, lesson_id, db):
+        raise HTTPException(status_code=403, detail="Lesson is locked: complete its prerequisites first")
+    
+    # Insert-or-keep in one round trip; the no-op update lets RETURNING
+    # hand back started_at for rows that already existed
+    stmt = dialect_insert(db, LessonProgress).values(
+        user_id=current_user.id,
+        lesson_id=lesson_id,
+        is_completed=False,
+        time_spent_minutes=0
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "lesson_id"],
+        set_={"lesson_id": stmt.excluded.lesson_id}
+    ).returning(LessonProgress.started_at)
+    started_at = db.execute(stmt).scalar()
+    db.commit()
     
     return {
         "lesson_id": lesson_id,
         "started": True,
-        "started_at": progress.started_at
+        "started_at": started_at
     }
 
 
+def _local_time(value: datetime) -> datetime:
+    """A timestamp as naive server-local time, the form progress times are written in"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+async def apply_lesson_completions(
+    user_id: int,
+    completions: List[LessonCompletionEvent],
+    db: Session
+) -> List[dict]:
+    """
+    Write a set of lesson completions in one transaction
+    
+    Lesson rows are written with a single upsert, the module/tier rollup
+    runs once per affected module and tier, and the summary counters and
+    achievements are updated once for the whole set. Commits once.
+    
+    A client completed_at (offline syncs) is rejected if it is later than
+    server time plus COMPLETION_CLOCK_SKEW_SECONDS (within the skew it is
+    clamped to server time) or earlier than when the lesson was started; a
+    lesson with no start on record is taken as started when it was completed.
+    
+    Returns:
+        One result dict per input item, in input order
+    """
+    module_by_lesson = CurriculumCache.get(db).lesson_module
+    
+    results = []
+    rows = {}
+    now = datetime.now()
+    latest = now + timedelta(seconds=settings.COMPLETION_CLOCK_SKEW_SECONDS)
+    client_dated = []
+    for completion in completions:
+        lesson_id = completion.lesson_id
+        if lesson_id not in module_by_lesson:
+            results.append({"lesson_id": lesson_id, "status": "not_found"})
+            continue
+        if lesson_id in rows:
+            results.append({"lesson_id": lesson_id, "status": "duplicate"})
+            continue
+        completed_at = now
+        if completion.completed_at is not None:
+            completed_at = _local_time(completion.completed_at)
+            if completed_at > latest:
+                results.append({"lesson_id": lesson_id, "status": "invalid_completed_at"})
+                continue
+            completed_at = min(completed_at, now)  # Within the allowed skew
+            client_dated.append(lesson_id)
+        rows[lesson_id] = {
+            "user_id": user_id,
+            "lesson_id": lesson_id,
+            "is_completed": True,
+            "started_at": completed_at,  # Only used when the row is new
+            "completed_at": completed_at,
+            "time_spent_minutes": completion.time_spent_minutes or 0
+        }
+        results.append({"lesson_id": lesson_id, "status": None})
+    
+    # A client timestamp cannot predate the lesson being started
+    if client_dated:
+        started = db.query(LessonProgress.lesson_id, LessonProgress.started_at).filter(
+            LessonProgress.user_id == user_id,
+            LessonProgress.lesson_id.in_(client_dated)
+        ).all()
+        too_early = {
+            lesson_id for lesson_id, started_at in started
+            if started_at is not None and rows[lesson_id]["completed_at"] < _local_time(started_at)
+        }
+        for result in results:
+            if result["status"] is None and result["lesson_id"] in too_early:
+                result["status"] = "invalid_completed_at"
+                rows.pop(result["lesson_id"])
+    
+    # Locked lessons are rejected, counting prerequisites completed in this same set
+    if rows:
+        locked = CompletionBits.locked_lessons(user_id, list(rows), db)
+        for result in results:
+            if result["status"] is None and result["lesson_id"] in locked:
+                result["status"] = "locked"
+                rows.pop(result["lesson_id"])
+    
+    if not rows:
+        return results
+    
+    # One upsert for the whole set. Already-completed rows fail the WHERE and
+    # are neither touched nor returned, so RETURNING yields exactly the lessons
+    # completed for the first time, even under concurrent requests.
+    stmt = dialect_insert(db, LessonProgress).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "lesson_id"],
+        set_={
+            "is_completed": True,
+            "completed_at": stmt.excluded.completed_at,
+            "time_spent_minutes": case(
+                (LessonProgress.time_spent_minutes > stmt.excluded.time_spent_minutes, LessonProgress.time_spent_minutes),
+                else_=stmt.excluded.time_spent_minutes
+            )
+        },
+        where=(LessonProgress.is_completed == False)
+    ).returning(LessonProgress.lesson_id, LessonProgress.completed_at)
+    newly_completed = dict(db.execute(stmt).all())
+    
+    already_completed = {}
+    if len(newly_completed) < len(rows):
+        already_completed = dict(db.query(LessonProgress.lesson_id, LessonProgress.completed_at).filter(
+            LessonProgress.user_id == user_id,
+            LessonProgress.lesson_id.in_([lid for lid in rows if lid not in newly_completed])
+        ).all())
+    
+    for result in results:
+        if result["status"] is None:
+            lesson_id = result["lesson_id"]
+            if lesson_id in newly_completed:
+                result.update(status="completed", completed_at=newly_completed[lesson_id])
+            else:
+                result.update(status="already_completed", completed_at=already_completed.get(lesson_id))
+    
+    if not newly_completed:
+        db.commit()
+        return results
+    
+    # Roll up each affected module once, then each affected tier once
+    bits = CompletionBits.add(user_id, newly_completed, db)
+    completed_modules = []
+    affected_tiers = set()
+    for module_id in sorted({module_by_lesson[lid] for lid in newly_completed}):
+        rollup = await update_module_progress(user_id, module_id, db, bits)
+        if rollup:
+            tier_id, module_completed = rollup
+            affected_tiers.add(tier_id)
+            if module_completed:
+                completed_modules.append(module_id)
+    
+    unlocked_tier = None
+    for tier_id in sorted(affected_tiers):
+        tier_number = await update_tier_progress(user_id, tier_id, db, bits)
+        if tier_number is not None:
+            unlocked_tier = max(unlocked_tier or 0, tier_number)
+    
+    # One summary update for the whole set, then only the affected achievements
+    counters = ProgressService.increment_counters(
+        user_id, db,
+        recount=("modules_completed", "total_time_minutes"),
+        current_tier=unlocked_tier,
+        lessons_completed=len(newly_completed)
+    )
+    events = [AchievementEvent.LESSON_COMPLETED]
+    if completed_modules:
+        events.append(AchievementEvent.MODULE_COMPLETED)
+    AchievementService.evaluate(user_id, events, counters, db, completed_modules)
+    
+    # Points land on the server's day, never the client's completed_at, so
+    # offline syncs cannot be dated into past or future leaderboard windows
+    ScoreBuckets.add(db, [
+        (user_id, now, "lesson_points", LESSON_POINTS) for _ in newly_completed
+    ] + [
+        (user_id, now, "module_points", MODULE_POINTS) for _ in completed_modules
+    ])
+    
+    db.commit()
+    return results
+
+
 @router.post("/lessons/{lesson_id}/complete")
 async def complete_lesson(
     lesson_id: int,
-    time_spent: Optional[int] = 0,
+    time_spent: Optional[int] = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Mark a lesson as completed"""
-    # Get or create lesson progress
-    progress = db.query(LessonProgress).filter(
-        LessonProgress.user_id == current_user.id,
-        LessonProgress.lesson_id == lesson_id
-    ).first()
+    completion = LessonCompletionEvent(lesson_id=lesson_id, time_spent_minutes=time_spent)
+    result = (await apply_lesson_completions(current_user.id, [completion], db))[0]
     
-    if not progress:
-        progress = LessonProgress(
-            user_id=current_user.id,
-            lesson_id=lesson_id
-        )
-        db.add(progress)
+    if result["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    if result["status"] == "locked":
+        raise HTTPException(status_code=403, detail="Lesson is locked: complete its prerequisites first")
     
-    # Update completion
-    progress.is_completed = True
-    progress.completed_at = datetime.now()
-    progress.time_spent_minutes = time_spent
+    return {
+        "lesson_id": lesson_id,
+        "is_completed": True,
+        "completed_at": result["completed_at"]
+    }
+
+
+@router.post("/lessons/sync")
+async def sync_lesson_completions(
+    sync_request: LessonSyncRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply many lesson completions at once (offline clients, cohort imports)
     
-    db.commit()
-    db.refresh(progress)
+    All items are written in a single transaction with one module/tier
+    rollup per affected module/tier. Each item gets its own status.
+    """
+    results = await apply_lesson_completions(current_user.id, sync_request.completions, db)
+    
+    return {
+        "processed": len(results),
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "results": results
+    }
+
+
+@router.post("/heartbeat")
+async def record_heartbeat(
+    heartbeat: HeartbeatRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Record time-on-task while a lesson (or a lab/challenge inside it) is open
+    
+    Heartbeats are buffered and written to the lesson's time_spent_minutes
+    in periodic batches, so this does not write to the progress tables; it
+    only reads the user's unlock index to reject locked lessons.
+    """
+    if heartbeat.lesson_id not in CurriculumCache.get(db).lesson_module:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    # The flush creates progress rows, so locked lessons must not get that far
+    if CompletionBits.is_lesson_locked(current_user.id, heartbeat.lesson_id, db):
+        raise HTTPException(status_code=403, detail="Lesson is locked: complete its prerequisites first")
     
-    # Update module progress
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-    if lesson:
-        await update_module_progress(current_user.id, lesson.module_id, db)
-        
-    # Check for achievements
-    await check_achievements(current_user.id, db)
+    seconds = HeartbeatService.record(current_user.id, heartbeat.lesson_id)
     
     return {
-        "lesson_id": lesson_id,
-        "is_completed": True,
-        "completed_at": progress.completed_at
+        "lesson_id": heartbeat.lesson_id,
+        "credited_seconds": seconds,
+        "next_heartbeat_seconds": settings.HEARTBEAT_INTERVAL_SECONDS
     }
 
 
@@ -293,53 +382,47 @@ async def get_lesson_progress(
 
 # ===== MODULE PROGRESS =====
 
-async def update_module_progress(user_id: int, module_id: int, db: Session):
-    """Internal function to update module progress based on lessons"""
-    # Get module with lessons
-    module = db.query(Module).filter(Module.id == module_id).first()
-    if not module:
-        return
+async def update_module_progress(
+    user_id: int, module_id: int, db: Session, bits: int
+) -> Optional[Tuple[int, bool]]:
+    """
+    Internal function to update module progress based on lessons
+    
+    Counts completed lessons from the user's completion bitset and upserts
+    the module row in one statement. The caller rolls up the tier and commits.
+    
+    Returns:
+        (tier_id, is_completed) or None if the module has no lessons
+    """
+    topology = CurriculumCache.get(db)
     
     # Count completed lessons
-    total_lessons = len(module.lessons)
+    completed_lessons, total_lessons = CompletionBits.module_progress(bits, topology, module_id)
     if total_lessons == 0:
-        return
-    
-    completed_lessons = db.query(LessonProgress).filter(
-        LessonProgress.user_id == user_id,
-        LessonProgress.lesson_id.in_([l.id for l in module.lessons]),
-        LessonProgress.is_completed == True
-    ).count()
+        return None
     
     # Calculate percentage
     percentage = (completed_lessons / total_lessons) * 100
+    is_completed = (percentage == 100.0)
+    
+    stmt = dialect_insert(db, ModuleProgress).values(
+        user_id=user_id,
+        module_id=module_id,
+        completion_percentage=percentage,
+        is_completed=is_completed,
+        completed_at=datetime.now() if is_completed else None
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "module_id"],
+        set_={
+            "completion_percentage": stmt.excluded.completion_percentage,
+            "is_completed": stmt.excluded.is_completed,
+            # Keep the first completion time
+            "completed_at": func.coalesce(ModuleProgress.completed_at, stmt.excluded.completed_at)
+        }
+    ))
     
-    # Get or create module progress
-    module_progress = db.query(ModuleProgress).filter(
-        ModuleProgress.user_id == user_id,
-        ModuleProgress.module_id == module_id
-    ).first()
-    
-    if not module_progress:
-        module_progress = ModuleProgress(
-            user_id=user_id,
-            module_id=module_id
-        )
-        db.add(module_progress)
-    
-    # Update progress
-    module_progress.completion_percentage = percentage
-    module_progress.is_completed = (percentage == 100.0)
-    
-    if module_progress.is_completed and not module_progress.completed_at:
-        module_progress.completed_at = datetime.now()
-    
-    db.commit()
-    
-    # Update tier progress
-    tier = db.query(Tier).join(Module).filter(Module.id == module_id).first()
-    if tier:
-        await update_tier_progress(user_id, tier.id, db)
+    return topology.module_tier[module_id], is_completed
 
 
 @router.get("/modules/{module_id}")
@@ -366,12 +449,15 @@ async def get_module_progress(
         LessonProgress.lesson_id.in_(lesson_ids)
     ).all()
     
-    completed_count = sum(1 for lp in lesson_progress if lp.is_completed)
+    topology = CurriculumCache.get(db)
+    bits = CompletionBits.get(current_user.id, db)
+    completed_count, _ = CompletionBits.module_progress(bits, topology, module_id)
     
     # Create lesson progress map
+    progress_by_lesson = {p.lesson_id: p for p in lesson_progress}
     lesson_status = []
     for lesson in module.lessons:
-        lp = next((p for p in lesson_progress if p.lesson_id == lesson.id), None)
+        lp = progress_by_lesson.get(lesson.id)
         lesson_status.append({
             "lesson_id": lesson.id,
             "title": lesson.title,
@@ -387,16 +473,23 @@ async def get_module_progress(
         "total_lessons": len(module.lessons),
         "started_at": module_progress.started_at if module_progress else None,
         "completed_at": module_progress.completed_at if module_progress else None,
+        "next_lesson_id": CompletionBits.next_lesson(bits, topology, module_id),
         "lessons": lesson_status
     }
 
 
 @router.get("/modules")
 async def get_all_module_progress(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get progress for all modules"""
+    cached = not_modified(request, response, progress_etag(current_user.id))
+    if cached:
+        return cached
+    
     results = db.query(ModuleProgress, Module).join(
         Module, ModuleProgress.module_id == Module.id
     ).filter(
@@ -417,69 +510,109 @@ async def get_all_module_progress(
     ]
 
 
+@router.get("/unlocks")
+async def get_unlocks(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get what the user can open next
+    
+    Read from the user's precomputed unlock index (one row); modules are
+    listed in prerequisite order.
+    """
+    cached = not_modified(request, response, progress_etag(current_user.id))
+    if cached:
+        return cached
+    
+    index = CompletionBits.get_index(current_user.id, db)
+    topology = index.topology
+    available = index.available_modules()
+    
+    next_lesson_id = None
+    for module_id in available:
+        next_lesson_id = CompletionBits.next_lesson(index.bits, topology, module_id)
+        if next_lesson_id is not None:
+            break
+    
+    return {
+        "available_modules": [
+            {"module_id": module_id, "tier_id": topology.module_tier[module_id]} for module_id in available
+        ],
+        "unlocked_module_ids": index.unlocked_modules(),
+        "next_lesson_id": next_lesson_id
+    }
+
+
 # ===== TIER PROGRESS =====
 
-async def update_tier_progress(user_id: int, tier_id: int, db: Session):
-    """Internal function to update tier progress based on modules"""
-    # Get tier with modules
-    tier = db.query(Tier).filter(Tier.id == tier_id).first()
-    if not tier:
-        return
+async def update_tier_progress(user_id: int, tier_id: int, db: Session, bits: int) -> Optional[int]:
+    """
+    Internal function to update tier progress based on modules
+    
+    Counts completed modules from the user's completion bitset, upserts the
+    tier row and, once the tier is complete, unlocks the next tier. The
+    caller commits.
+    
+    Returns:
+        tier_number of the tier unlocked by this update, if any
+    """
+    topology = CurriculumCache.get(db)
+    tier_number = topology.tier_number.get(tier_id)
+    if tier_number is None:
+        return None
     
     # Count completed modules
-    total_modules = len(tier.modules)
+    total_modules = len(topology.tier_modules.get(tier_id, []))
     if total_modules == 0:
-        return
+        return None
     
-    completed_modules = db.query(ModuleProgress).filter(
-        ModuleProgress.user_id == user_id,
-        ModuleProgress.module_id.in_([m.id for m in tier.modules]),
-        ModuleProgress.is_completed == True
-    ).count()
+    completed_modules = CompletionBits.completed_modules(bits, topology, tier_id)
     
     # Calculate percentage
     percentage = (completed_modules / total_modules) * 100
+    is_completed = (percentage == 100.0)
+    
+    stmt = dialect_insert(db, TierProgress).values(
+        user_id=user_id,
+        tier_id=tier_id,
+        completion_percentage=percentage,
+        is_completed=is_completed,
+        completed_at=datetime.now() if is_completed else None,
+        is_unlocked=(tier_number == 0)  # Tier 0 always unlocked
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "tier_id"],
+        set_={
+            "completion_percentage": stmt.excluded.completion_percentage,
+            "is_completed": stmt.excluded.is_completed,
+            "completed_at": func.coalesce(TierProgress.completed_at, stmt.excluded.completed_at)
+        }
+    ))
     
-    # Get or create tier progress
-    tier_progress = db.query(TierProgress).filter(
-        TierProgress.user_id == user_id,
-        TierProgress.tier_id == tier_id
-    ).first()
+    if not is_completed:
+        return None
     
-    if not tier_progress:
-        tier_progress = TierProgress(
-            user_id=user_id,
-            tier_id=tier_id,
-            is_unlocked=(tier.tier_number == 0)  # Tier 0 always unlocked
-        )
-        db.add(tier_progress)
-    
-    # Update progress
-    tier_progress.completion_percentage = percentage
-    tier_progress.is_completed = (percentage == 100.0)
-    
-    if tier_progress.is_completed and not tier_progress.completed_at:
-        tier_progress.completed_at = datetime.now()
-        
-        # Unlock next tier
-        next_tier = db.query(Tier).filter(Tier.tier_number == tier.tier_number + 1).first()
-        if next_tier:
-            next_tier_progress = db.query(TierProgress).filter(
-                TierProgress.user_id == user_id,
-                TierProgress.tier_id == next_tier.id
-            ).first()
-            
-            if not next_tier_progress:
-                next_tier_progress = TierProgress(
-                    user_id=user_id,
-                    tier_id=next_tier.id,
-                    is_unlocked=True
-                )
-                db.add(next_tier_progress)
-            else:
-                next_tier_progress.is_unlocked = True
+    # Unlock next tier
+    next_tier_id = topology.next_tier_id(tier_id)
+    if next_tier_id is None:
+        return None
     
-    db.commit()
+    stmt = dialect_insert(db, TierProgress).values(
+        user_id=user_id,
+        tier_id=next_tier_id,
+        completion_percentage=0.0,
+        is_completed=False,
+        is_unlocked=True
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "tier_id"],
+        set_={"is_unlocked": True}
+    ))
+    
+    return tier_number + 1
 
 
 @router.get("/tiers/{tier_number}")
@@ -489,118 +622,74 @@ async def get_tier_progress(
     current_user: User = Depends(get_current_user)
 ):
     """Get progress for a specific tier"""
-    tier = db.query(Tier).filter(Tier.tier_number == tier_number).first()
-    if not tier:
+    tiers = ProgressService.get_tier_listing(current_user.id, db, tier_number=tier_number)["tiers"]
+    if not tiers:
         raise HTTPException(status_code=404, detail="Tier not found")
     
-    tier_progress = db.query(TierProgress).filter(
-        TierProgress.user_id == current_user.id,
-        TierProgress.tier_id == tier.id
-    ).first()
-    
-    # If no progress exists, tier 0 is unlocked by default
-    if not tier_progress:
-        is_unlocked = (tier_number == 0)
-        return {
-            "tier_number": tier_number,
-            "is_unlocked": is_unlocked,
-            "is_completed": False,
-            "completion_percentage": 0.0
-        }
-    
+    tier = tiers[0]
     return {
         "tier_number": tier_number,
-        "is_unlocked": tier_progress.is_unlocked,
-        "is_completed": tier_progress.is_completed,
-        "completion_percentage": tier_progress.completion_percentage,
-        "started_at": tier_progress.started_at,
-        "completed_at": tier_progress.completed_at
+        "is_unlocked": tier["is_unlocked"],
+        "is_completed": tier["is_completed"],
+        "completion_percentage": tier["completion_percentage"],
+        "started_at": tier["started_at"],
+        "completed_at": tier["completed_at"]
     }
 
 
 @router.get("/tiers")
 async def get_all_tier_progress(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get progress for all tiers"""
-    # Get all tiers
-    tiers = db.query(Tier).order_by(Tier.tier_number).all()
-    
-    result = []
-    for tier in tiers:
-        tier_progress = db.query(TierProgress).filter(
-            TierProgress.user_id == current_user.id,
-            TierProgress.tier_id == tier.id
-        ).first()
-        
-        if tier_progress:
-            result.append({
-                "tier_number": tier.tier_number,
-                "tier_name": tier.name,
-                "is_unlocked": tier_progress.is_unlocked,
-                "is_completed": tier_progress.is_completed,
-                "completion_percentage": tier_progress.completion_percentage
-            })
-        else:
-            # Tier 0 is always unlocked
-            result.append({
-                "tier_number": tier.tier_number,
-                "tier_name": tier.name,
-                "is_unlocked": (tier.tier_number == 0),
-                "is_completed": False,
-                "completion_percentage": 0.0
-            })
-    
-    return result
+    cached = not_modified(request, response, progress_etag(current_user.id))
+    if cached:
+        return cached
+    
+    listing = ProgressService.get_tier_listing(current_user.id, db)
+    
+    return [
+        {
+            "tier_number": tier["tier_number"],
+            "tier_name": tier["tier_name"],
+            "is_unlocked": tier["is_unlocked"],
+            "is_completed": tier["is_completed"],
+            "completion_percentage": tier["completion_percentage"]
+        }
+        for tier in listing["tiers"]
+    ]
 
 
 # ===== DASHBOARD STATS =====
 
 @router.get("/stats")
 async def get_progress_stats(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get overall progress statistics for dashboard"""
-    # Count completed lessons
-    total_lessons_completed = db.query(LessonProgress).filter(
-        LessonProgress.user_id == current_user.id,
-        LessonProgress.is_completed == True
-    ).count()
+    cached = not_modified(request, response, progress_etag(current_user.id))
+    if cached:
+        return cached
     
-    # Count completed modules
-    total_modules_completed = db.query(ModuleProgress).filter(
-        ModuleProgress.user_id == current_user.id,
-        ModuleProgress.is_completed == True
-    ).count()
-    
-    # Get current tier (highest unlocked)
-    current_tier_progress = db.query(TierProgress).filter(
-        TierProgress.user_id == current_user.id,
-        TierProgress.is_unlocked == True
-    ).order_by(TierProgress.tier_id.desc()).first()
-    
-    current_tier = 0
-    if current_tier_progress:
-        tier = db.query(Tier).filter(Tier.id == current_tier_progress.tier_id).first()
-        if tier:
-            current_tier = tier.tier_number
-    
-    # Calculate total time spent
-    total_time_minutes = db.query(func.sum(LessonProgress.time_spent_minutes)).filter(
-        LessonProgress.user_id == current_user.id
-    ).scalar() or 0
+    summary = ProgressService.get_summary(current_user.id, db)
     
     # Get total lessons available
-    total_lessons = db.query(Lesson).filter(Lesson.is_published == True).count()
-    completion_percentage = (total_lessons_completed / total_lessons * 100) if total_lessons > 0 else 0
+    topology = CurriculumCache.get(db)
+    total_lessons = topology.published_lesson_count
+    completion_percentage = (summary.lessons_completed / total_lessons * 100) if total_lessons > 0 else 0
     
     return {
-        "total_lessons_completed": total_lessons_completed,
+        "total_lessons_completed": summary.lessons_completed,
         "total_lessons": total_lessons,
-        "total_modules_completed": total_modules_completed,
-        "current_tier": current_tier,
-        "total_time_minutes": total_time_minutes,
-        "completion_percentage": round(completion_percentage, 1)
+        "total_modules_completed": summary.modules_completed,
+        "current_tier": summary.current_tier,
+        "total_time_minutes": summary.total_time_minutes,
+        "completion_percentage": round(completion_percentage, 1),
+        "next_lesson_id": CompletionBits.next_lesson(CompletionBits.get(current_user.id, db), topology)
     }
@@ -0,0 +1,149 @@
+"""
+Quiz API Routes
+Serve quiz blocks, grade attempts and feed passed quizzes into lesson completion
+"""
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.connection import get_db
+from models.user import User
+from models.progress import QuizAttempt
+from auth.rbac import get_current_user, require_tutor
+from schemas import QuizSubmission, QuizBatchRequest, LessonCompletionEvent
+from services.quiz_engine import QuizEngine, QuizDefinitionError
+from services.completion_bits import CompletionBits
+from routes.progress_routes import apply_lesson_completions
+
+router = APIRouter()
+
+
+@router.get("/{block_id}")
+async def get_quiz(
+    block_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a quiz's questions (without answers) and the user's best attempt"""
+    quiz = QuizEngine.get(block_id, db)
+    if quiz is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+
+    best = db.query(
+        func.max(QuizAttempt.score), func.count(QuizAttempt.id), func.max(QuizAttempt.submitted_at)
+    ).filter(
+        QuizAttempt.user_id == current_user.id,
+        QuizAttempt.block_id == block_id
+    ).one()
+
+    return {
+        "block_id": block_id,
+        "lesson_id": quiz.lesson_id,
+        "questions": quiz.questions,
+        "max_score": quiz.max_score,
+        "best_score": best[0],
+        "passed": best[0] is not None and best[0] >= quiz.pass_score,
+        "attempts": best[1],
+        "last_attempt_at": best[2]
+    }
+
+
+@router.post("/{block_id}/attempts")
+async def submit_quiz(
+    block_id: int,
+    submission: QuizSubmission,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Grade a quiz attempt and record it
+
+    When the attempt passes and every quiz in the lesson has now been
+    passed, the lesson is completed as if /progress/lessons/{id}/complete
+    had been called.
+    """
+    quiz = QuizEngine.get(block_id, db)
+    if quiz is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+    if CompletionBits.is_lesson_locked(current_user.id, quiz.lesson_id, db):
+        raise HTTPException(status_code=403, detail="Lesson is locked: complete its prerequisites first")
+
+    try:
+        result = QuizEngine.grade(quiz, submission.answers)
+    except QuizDefinitionError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    QuizEngine.record(db, [(current_user.id, quiz, submission.answers, result, None)])
+
+    lesson_completed = False
+    if result["passed"] and QuizEngine.passed_lessons(current_user.id, [quiz.lesson_id], db):
+        completion = (await apply_lesson_completions(
+            current_user.id, [LessonCompletionEvent(lesson_id=quiz.lesson_id)], db
+        ))[0]
+        lesson_completed = completion["status"] == "completed"
+    else:
+        db.commit()
+
+    return {"block_id": block_id, **result, "lesson_completed": lesson_completed}
+
+
+@router.post("/grade-batch")
+async def grade_batch(
+    batch: QuizBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_tutor())
+):
+    """
+    Grade imported answer sheets in one pass
+
+    All attempts are inserted with one statement; lessons whose quizzes
+    are all passed are then completed with one batch per user. Each sheet
+    gets its own status.
+    """
+    user_ids = {sheet.user_id for sheet in batch.sheets}
+    known_users = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+
+    results = []
+    attempts = []
+    passed_by_user = defaultdict(set)
+    for sheet in batch.sheets:
+        quiz = QuizEngine.get(sheet.block_id, db)
+        if quiz is None or sheet.user_id not in known_users:
+            results.append({
+                "user_id": sheet.user_id, "block_id": sheet.block_id,
+                "status": "quiz_not_found" if quiz is None else "user_not_found"
+            })
+            continue
+        try:
+            result = QuizEngine.grade(quiz, sheet.answers)
+        except QuizDefinitionError as e:
+            results.append({"user_id": sheet.user_id, "block_id": sheet.block_id, "status": "invalid", "detail": str(e)})
+            continue
+
+        attempts.append((sheet.user_id, quiz, sheet.answers, result, sheet.submitted_at))
+        if result["passed"]:
+            passed_by_user[sheet.user_id].add(quiz.lesson_id)
+        results.append({
+            "user_id": sheet.user_id, "block_id": sheet.block_id, "status": "graded",
+            "score": result["score"], "max_score": result["max_score"], "passed": result["passed"]
+        })
+
+    QuizEngine.record(db, attempts)
+    db.commit()
+
+    lessons_completed = 0
+    for user_id, lesson_ids in passed_by_user.items():
+        lessons = sorted(QuizEngine.passed_lessons(user_id, lesson_ids, db))
+        if lessons:
+            completions = await apply_lesson_completions(
+                user_id, [LessonCompletionEvent(lesson_id=lesson_id) for lesson_id in lessons], db
+            )
+            lessons_completed += sum(1 for c in completions if c["status"] == "completed")
+
+    return {
+        "processed": len(results),
+        "graded": len(attempts),
+        "lessons_completed": lessons_completed,
+        "results": results
+    }
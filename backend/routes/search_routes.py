@@ -0,0 +1,35 @@
+"""
+Search API Routes
+Full-text search over lessons, challenges and labs
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database.connection import get_db
+from models.user import User
+from auth.rbac import get_current_user
+from services.search_service import SearchService, DOC_TYPES
+
+router = APIRouter()
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, pattern="^(" + "|".join(DOC_TYPES) + ")(,(" + "|".join(DOC_TYPES) + "))*$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search published lessons, published challenges and active labs
+    
+    Results are ranked by BM25; every query term must match and the last
+    one also matches as a prefix. `type` is a comma-separated filter.
+    Requires authentication, like the challenge and lab endpoints whose
+    content it quotes.
+    """
+    doc_types = type.split(",") if type else None
+    return SearchService.search(q, db, doc_types=doc_types, page=page, page_size=page_size)
@@ -69,7 +69,9 @@ async def list_users(
     return users
 
 
-from models.progress import TierProgress, UserAchievement, Achievement  # Added imports
+from models.progress import UserAchievement, Achievement  # Added imports
+from models.challenge import Leaderboard
+from services.progress_service import ProgressService
 from schemas import UserResponse, UserUpdate, PublicProfileResponse  # Added imports
 
 # ... (existing imports)
@@ -100,20 +102,15 @@ async def get_public_profile(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Calculate stats
-    tier_progress = db.query(TierProgress).filter(
-        TierProgress.user_id == user.id,
-        TierProgress.is_completed == True
-    ).order_by(TierProgress.tier_id.desc()).first()
+    # Stats come from the per-user summary maintained on write
+    summary = ProgressService.get_summary(user.id, db)
+    current_tier = summary.current_tier
+    total_points = summary.total_points  # The score the rank is computed from
     
-    current_tier = tier_progress.tier_id if tier_progress else 0
-    
-    # Total points (simple calculation from tier or just stored? Assuming calculation)
-    # Ideally we'd have a Leaderboard entry, but let's use what we have.
-    # Actually Leaderboard table has total_points.
-    from models.challenge import Leaderboard
-    leaderboard_entry = db.query(Leaderboard).filter(Leaderboard.user_id == user.id).first()
-    total_points = leaderboard_entry.total_points if leaderboard_entry else 0
+    # Materialized rank: a single-row lookup instead of sorting the leaderboard
+    rank, previous_rank = db.query(Leaderboard.rank, Leaderboard.previous_rank).filter(
+        Leaderboard.user_id == user.id
+    ).first() or (None, None)
     
     # Achievements
     user_achievements = db.query(UserAchievement).filter(UserAchievement.user_id == user.id).all()
@@ -138,5 +135,7 @@ async def get_public_profile(
         created_at=user.created_at,
         current_tier=current_tier,
         total_points=total_points,
+        rank=rank,
+        rank_change=previous_rank - rank if rank is not None and previous_rank is not None else None,
         achievements=achievements_data
     )
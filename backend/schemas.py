@@ -1,9 +1,10 @@
 """
 Pydantic Schemas for API Request/Response Models
 """
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional, Union
+from datetime import datetime, timezone
+import json
 from models.user import UserRole
 
 
@@ -68,6 +69,8 @@ class PublicProfileResponse(BaseModel):
     # Gamification Stats
     current_tier: int = 0
     total_points: int = 0
+    rank: Optional[int] = None  # Leaderboard rank by total points (ties share a rank), refreshed by the ranking job
+    rank_change: Optional[int] = None  # Places gained (negative if lost) at the last rank change
     achievements: list[dict] = []
     
     class Config:
@@ -115,10 +118,37 @@ class ContentBlockCreate(ContentBlockBase):
     pass
 
 
+def _quiz_client_view(quiz_data: Optional[str]) -> Optional[str]:
+    """Quiz questions without answers or explanations, as GET /api/quizzes/{block_id} serves them"""
+    if not quiz_data:
+        return quiz_data
+    try:
+        data = json.loads(quiz_data)
+    except ValueError:
+        return None
+    questions = data.get("questions") if isinstance(data, dict) else data
+    if not isinstance(questions, list):
+        return None
+    return json.dumps({"questions": [
+        {
+            "question": q.get("question"),
+            "options": q.get("options", []),
+            "multiple": q.get("multiple", q.get("correct_indices") is not None)
+        }
+        for q in questions if isinstance(q, dict)
+    ]})
+
+
 class ContentBlockResponse(ContentBlockBase):
     id: int
     lesson_id: int
     
+    @field_validator("quiz_data")
+    @classmethod
+    def hide_quiz_answers(cls, value: Optional[str]) -> Optional[str]:
+        # Passing a quiz completes the lesson, so answer keys never leave the server
+        return _quiz_client_view(value)
+    
     class Config:
         from_attributes = True
 
@@ -144,6 +174,7 @@ class LessonResponse(LessonBase):
     updated_at: Optional[datetime]
     content_blocks: list[ContentBlockResponse] = []
     challenge_id: Optional[int] = None
+    content_hash: Optional[str] = None  # Version of the pre-rendered HTML (/lessons/{id}/html?v=...)
     
     class Config:
         from_attributes = True
@@ -195,6 +226,163 @@ class TierResponse(TierBase):
         from_attributes = True
 
 
+# Curriculum navigation (summary) schemas: no lesson bodies or block content
+class ContentBlockSummaryResponse(BaseModel):
+    id: int
+    type: str
+    order: int
+    
+    class Config:
+        from_attributes = True
+
+
+class LessonSummaryResponse(BaseModel):
+    id: int
+    module_id: int
+    title: str
+    description: Optional[str] = None
+    order: int
+    duration_minutes: Optional[int] = None
+    difficulty: Optional[str] = "beginner"
+    is_published: bool = False
+    challenge_id: Optional[int] = None
+    content_blocks: list[ContentBlockSummaryResponse] = []
+    
+    class Config:
+        from_attributes = True
+
+
+class ModuleSummaryResponse(ModuleBase):
+    id: int
+    tier_id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    lessons: list[LessonSummaryResponse] = []
+    
+    class Config:
+        from_attributes = True
+
+
+class TierSummaryResponse(TierBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    modules: list[ModuleSummaryResponse] = []
+    
+    class Config:
+        from_attributes = True
+
+
+# Curriculum delta sync schemas: flat rows, children reference their parent by id
+class TierRecord(TierBase):
+    id: int
+    
+    class Config:
+        from_attributes = True
+
+
+class ModuleRecord(ModuleBase):
+    id: int
+    tier_id: int
+    
+    class Config:
+        from_attributes = True
+
+
+class LessonRecord(LessonBase):
+    id: int
+    module_id: int
+    challenge_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CurriculumDeletions(BaseModel):
+    tiers: list[int] = []
+    modules: list[int] = []
+    lessons: list[int] = []
+    content_blocks: list[int] = []
+
+
+class CurriculumChangesResponse(BaseModel):
+    revision: int  # Pass as `since` on the next sync
+    full: bool  # True when this is a complete snapshot rather than a delta
+    tiers: list[TierRecord] = []
+    modules: list[ModuleRecord] = []
+    lessons: list[LessonRecord] = []
+    content_blocks: list[ContentBlockResponse] = []
+    deleted: CurriculumDeletions = CurriculumDeletions()
+
+
+# Progress Schemas
+class LessonCompletionEvent(BaseModel):
+    lesson_id: int
+    time_spent_minutes: Optional[int] = Field(0, ge=0)
+    completed_at: Optional[datetime] = None  # Client-side time for offline completions; checked against server time
+
+
+class LessonSyncRequest(BaseModel):
+    completions: list[LessonCompletionEvent] = Field(..., max_length=500)
+
+
+class HeartbeatRequest(BaseModel):
+    lesson_id: int  # Lesson being studied, or the lesson a lab/challenge was opened from
+
+
+# Quiz Schemas
+class QuizSubmission(BaseModel):
+    answers: list[Union[int, list[int], None]] = Field(..., max_length=200)  # Option index (or indices) per question
+
+
+class QuizAnswerSheet(QuizSubmission):
+    user_id: int
+    block_id: int
+    submitted_at: Optional[datetime] = None
+
+
+class QuizBatchRequest(BaseModel):
+    sheets: list[QuizAnswerSheet] = Field(..., max_length=1000)
+
+
+class LessonProgressState(BaseModel):
+    is_completed: bool = False
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    time_spent_minutes: int = 0
+
+
+class ModuleProgressState(BaseModel):
+    is_unlocked: bool = False  # Prerequisites and previous tier complete
+    completion_percentage: float = 0.0
+    is_completed: bool = False
+    lessons_completed: int = 0
+    total_lessons: int = 0
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    next_lesson_id: Optional[int] = None
+
+
+class ModuleBundleLesson(LessonResponse):
+    progress: LessonProgressState = LessonProgressState()
+    
+    class Config:
+        from_attributes = True
+
+
+class ModuleBundleResponse(ModuleBase):
+    """A module with full lessons, content blocks and the caller's progress"""
+    id: int
+    tier_id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    lessons: list[ModuleBundleLesson] = []
+    progress: ModuleProgressState = ModuleProgressState()
+    
+    class Config:
+        from_attributes = True
+
+
 # Capstone Schemas
 from typing import Any, Dict, List
 
@@ -288,3 +476,30 @@ class CapstoneGradeRequest(BaseModel):
 
 class CapstoneFeatureRequest(BaseModel):
     is_featured: bool
+
+
+# Contest Schemas
+class ContestChallengeConfig(BaseModel):
+    challenge_id: int
+    max_points: Optional[int] = Field(None, ge=1)  # Defaults to the challenge's base points
+    min_points: Optional[int] = Field(None, ge=0)  # Defaults to a fifth of max_points
+    decay: int = Field(30, ge=1)  # Solves after the first until the value bottoms out at min_points
+    order: int = 0
+
+
+class ContestCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    starts_at: datetime
+    ends_at: datetime
+    first_blood_bonus: int = Field(0, ge=0)
+    is_published: bool = False
+    challenges: List[ContestChallengeConfig] = Field(..., min_length=1, max_length=500)
+
+    @field_validator("starts_at", "ends_at")
+    @classmethod
+    def as_utc(cls, value: datetime) -> datetime:
+        # Times without an offset are taken as UTC, so both ends always compare
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
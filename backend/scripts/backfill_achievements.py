@@ -0,0 +1,39 @@
+"""
+Backfill achievements for existing users
+Achievements are normally awarded as progress events happen; run this once
+after adding new achievement definitions so past progress is credited too
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.curriculum
+from models.user import User
+from services.achievement_service import AchievementService
+
+
+def backfill():
+    db = SessionLocal()
+    try:
+        print("🚀 Backfilling achievements...")
+        user_ids = [user_id for (user_id,) in db.query(User.id).all()]
+
+        total_awarded = 0
+        for user_id in user_ids:
+            awarded = AchievementService.evaluate_all(user_id, db)
+            total_awarded += len(awarded)
+
+        db.commit()
+        print(f"✅ Checked {len(user_ids)} users, awarded {total_awarded} achievements")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,32 @@
+"""
+Backfill the user_daily_points score buckets
+Recomputes every user's points per day from correct challenge submissions
+and lesson/module completions. Run once after the migration, or any time the
+time-windowed leaderboards are suspected to have drifted.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.curriculum
+from services.score_buckets import ScoreBuckets
+
+
+def backfill():
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding daily score buckets...")
+        count = ScoreBuckets.rebuild(db)
+        print(f"✅ Done: {count} (user, day) buckets written")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill()
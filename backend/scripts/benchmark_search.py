@@ -0,0 +1,138 @@
+"""
+Benchmark /api/search latency on a synthetic corpus
+Seeds an in-memory database with a large generated curriculum, builds the
+search index once and reports query latency percentiles against the target
+"""
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connection import Base
+import models.user        # Register User (needed by LabInstance)
+from models.curriculum import Tier, Module, Lesson, ContentBlock, ContentType
+from models.challenge import Challenge, ChallengeCategory, ChallengeDifficulty
+from models.labs import Lab
+from services.search_service import SearchService
+
+LESSONS = 5000
+BLOCKS_PER_LESSON = 2
+CHALLENGES = 1000
+LABS = 100
+WORDS_PER_LESSON = 400
+QUERIES = 500
+P95_TARGET_MS = 50.0
+
+VOCABULARY_SIZE = 20000
+SECURITY_TERMS = [
+    "sql", "injection", "xss", "csrf", "buffer", "overflow", "nmap", "wireshark", "privilege",
+    "escalation", "linux", "kernel", "firewall", "phishing", "malware", "reverse", "shell",
+    "encryption", "hashing", "password", "cracking", "forensics", "network", "packet", "exploit",
+]
+
+
+def build_vocabulary(rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = {"".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)}
+    return SECURITY_TERMS + sorted(words)
+
+
+def text(rng: random.Random, vocabulary, n_words: int) -> str:
+    # Zipf-like: low indexes (including the security terms) are far more common
+    return " ".join(vocabulary[int(rng.paretovariate(1.1)) % len(vocabulary)] for _ in range(n_words))
+
+
+def build_session(rng: random.Random, vocabulary):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    tier = Tier(tier_number=0, name="Tier 0", order=0)
+    db.add(tier)
+    db.flush()
+    modules = [Module(tier_id=tier.id, title=f"Module {m}", order=m, is_published=True) for m in range(LESSONS // 20)]
+    db.add_all(modules)
+    db.flush()
+
+    for i in range(LESSONS):
+        lesson = Lesson(
+            module_id=modules[i % len(modules)].id, order=i, is_published=True,
+            title=text(rng, vocabulary, 5), content_markdown=text(rng, vocabulary, WORDS_PER_LESSON)
+        )
+        db.add(lesson)
+        db.flush()
+        db.add_all([
+            ContentBlock(lesson_id=lesson.id, type=ContentType.TEXT, order=b, text_content=text(rng, vocabulary, 50))
+            for b in range(BLOCKS_PER_LESSON)
+        ])
+
+    db.add_all([
+        Challenge(
+            title=text(rng, vocabulary, 4), description=text(rng, vocabulary, 100), flag="F{x}",
+            category=ChallengeCategory.WEB_SECURITY, difficulty=ChallengeDifficulty.EASY,
+            base_points=100, is_published=True
+        )
+        for _ in range(CHALLENGES)
+    ])
+    db.add_all([
+        Lab(title=text(rng, vocabulary, 4), content=text(rng, vocabulary, 200), docker_image="lab")
+        for _ in range(LABS)
+    ])
+    db.commit()
+    return db
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def benchmark_search():
+    print("⏱️  SEARCH LATENCY BENCHMARK")
+    print("=" * 70)
+
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(rng)
+    db = build_session(rng, vocabulary)
+
+    start = time.perf_counter()
+    SearchService.refresh(db, force=True)
+    print(f"   Indexed {LESSONS} lessons, {CHALLENGES} challenges, {LABS} labs "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    queries = []
+    for _ in range(QUERIES):
+        words = [vocabulary[int(rng.paretovariate(1.1)) % 2000] for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.5:
+            words[-1] = words[-1][:max(2, len(words[-1]) - 2)]  # Search-as-you-type prefix
+        queries.append(" ".join(words))
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        SearchService.search(query, db)
+        latencies.append((time.perf_counter() - start) * 1000)
+    db.close()
+
+    p50, p95, p99 = (percentile(latencies, p) for p in (50, 95, 99))
+    print(f"   {QUERIES} queries: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+
+    if p95 <= P95_TARGET_MS:
+        print(f"\n✅ PASSED: p95 within {P95_TARGET_MS:.0f} ms")
+        return True
+
+    print(f"\n❌ FAILED: p95 above {P95_TARGET_MS:.0f} ms")
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_search() else 1)
@@ -0,0 +1,117 @@
+"""
+Benchmark the tier progress listing
+Times the previous per-tier query loop against ProgressService.get_tier_listing
+on an in-memory curriculum of increasing size
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connection import Base
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+from models.user import User
+from models.curriculum import Tier
+from models.progress import TierProgress
+from services.progress_service import ProgressService
+
+TIER_COUNTS = [5, 25, 100]
+ITERATIONS = 200
+
+
+def build_session(tier_count: int):
+    """Create a throwaway SQLite database with `tier_count` tiers, half of them started"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="student@example.com", username="student", password_hash="x")
+    db.add(user)
+    db.flush()
+    for n in range(tier_count):
+        tier = Tier(tier_number=n, name=f"Tier {n}", order=n)
+        db.add(tier)
+        db.flush()
+        if n < tier_count // 2:
+            db.add(TierProgress(
+                user_id=user.id, tier_id=tier.id, is_unlocked=True,
+                is_completed=n < tier_count // 2 - 1, completion_percentage=100.0
+            ))
+    db.commit()
+    return engine, db, user.id
+
+
+def legacy_listing(user_id: int, db):
+    """The listing as it was built before: one TierProgress query per tier"""
+    result = []
+    for tier in db.query(Tier).order_by(Tier.tier_number).all():
+        tier_progress = db.query(TierProgress).filter(
+            TierProgress.user_id == user_id,
+            TierProgress.tier_id == tier.id
+        ).first()
+        if tier_progress:
+            result.append((tier.tier_number, tier_progress.is_unlocked, tier_progress.is_completed))
+        else:
+            result.append((tier.tier_number, tier.tier_number == 0, False))
+    return result
+
+
+def current_listing(user_id: int, db):
+    listing = ProgressService.get_tier_listing(user_id, db)
+    return [(t["tier_number"], t["is_unlocked"], t["is_completed"]) for t in listing["tiers"]]
+
+
+def measure(fn, engine, db, user_id):
+    """Average latency in ms and statements per call"""
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    fn(user_id, db)
+    event.remove(engine, "before_cursor_execute", _count)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        db.expire_all()
+        fn(user_id, db)
+    elapsed = (time.perf_counter() - start) / ITERATIONS * 1000
+    return elapsed, len(statements)
+
+
+def benchmark_tier_progress():
+    print("⏱️  TIER PROGRESS LISTING BENCHMARK")
+    print("=" * 70)
+
+    ok = True
+    for tier_count in TIER_COUNTS:
+        engine, db, user_id = build_session(tier_count)
+
+        if legacy_listing(user_id, db) != current_listing(user_id, db):
+            print(f"   {tier_count:>4} tiers -> ❌ listings differ")
+            ok = False
+
+        before_ms, before_q = measure(legacy_listing, engine, db, user_id)
+        after_ms, after_q = measure(current_listing, engine, db, user_id)
+        print(
+            f"   {tier_count:>4} tiers -> before {before_ms:7.2f} ms ({before_q} queries), "
+            f"after {after_ms:7.2f} ms ({after_q} queries)"
+        )
+        db.close()
+
+    print("\n✅ PASSED: listings match" if ok else "\n❌ FAILED: listings differ")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_tier_progress() else 1)
@@ -0,0 +1,86 @@
+"""
+Load a declarative content package into the database
+Usage:
+    python scripts/load_content.py <package dir> [--dry-run]
+    python scripts/load_content.py --export <dir>
+
+Loading is idempotent: only rows that differ from the package are written,
+in one transaction. See services/content_loader.py for the package layout.
+"""
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.user        # Register User (needed by LabInstance)
+from services.content_loader import ContentLoader, ContentPackageError, read_package
+
+
+def load(path: str, dry_run: bool):
+    try:
+        package = read_package(path)
+    except ContentPackageError as e:
+        print(f"❌ Invalid package: {e}")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        print(f"📦 Loading {path}{' (dry run)' if dry_run else ''}...")
+        report = ContentLoader.apply(db, package, dry_run=dry_run)
+
+        for level in ("tiers", "modules", "lessons"):
+            counts = report[level]
+            print(f"   {level}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                  f"{counts['unchanged']} unchanged")
+        blocks = report["blocks"]
+        print(f"   blocks: replaced for {blocks['lessons_replaced']} lessons "
+              f"({blocks['deleted']} deleted, {blocks['inserted']} inserted)")
+
+        for module, entries in report["unresolved_prerequisites"].items():
+            print(f"ℹ️  Prerequisites of module {module} name no module (kept as text): {', '.join(entries)}")
+
+        for level, missing in report["not_in_package"].items():
+            if missing:
+                print(f"⚠️  {len(missing)} {level} in the database are not in the package (kept): "
+                      f"{', '.join(map(str, missing[:10]))}{' ...' if len(missing) > 10 else ''}")
+
+        if not report["changed"]:
+            print("✅ Already up to date")
+        elif dry_run:
+            print("✅ Dry run complete, nothing written")
+        else:
+            print("✅ Content loaded")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def export(path: str):
+    db = SessionLocal()
+    try:
+        print(f"📤 Exporting curriculum to {path}...")
+        count = ContentLoader.export(db, path)
+        print(f"✅ Exported {count} lessons")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load or export curriculum content packages")
+    parser.add_argument("path", nargs="?", help="Content package directory")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
+    parser.add_argument("--export", metavar="DIR", help="Write the current curriculum as a package")
+    args = parser.parse_args()
+
+    if args.export:
+        export(args.export)
+    elif args.path:
+        load(args.path, args.dry_run)
+    else:
+        parser.print_help()
@@ -0,0 +1,31 @@
+"""
+Pre-render lesson HTML for the whole curriculum
+Run after seeding or bulk content edits. Only lessons whose markdown or
+content blocks changed since their last render are rendered again.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.user        # Register User (needed by LabInstance)
+from services.lesson_renderer import LessonRenderer
+
+
+def prerender():
+    db = SessionLocal()
+    try:
+        print("🖨️  Pre-rendering lesson HTML...")
+        rendered, unchanged = LessonRenderer.prerender_all(db)
+        print(f"✅ Done: {rendered} lessons rendered, {unchanged} unchanged")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    prerender()
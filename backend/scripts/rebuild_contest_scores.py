@@ -0,0 +1,38 @@
+"""
+Rebuild a contest's scoreboard
+Recomputes challenge values, first bloods and every participant's score from
+the contest's solves. Solves keep the scoreboard current on their own; use
+this only if it is suspected to have drifted.
+
+Usage: python scripts/rebuild_contest_scores.py <contest_id>
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.curriculum
+import models.contest
+from services.contest_scoring import ContestScoring
+
+
+def rebuild(contest_id: int):
+    db = SessionLocal()
+    try:
+        print(f"🔄 Rebuilding scoreboard for contest {contest_id}...")
+        count = ContestScoring.rebuild(contest_id, db)
+        print(f"✅ Done: {count} participants scored")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/rebuild_contest_scores.py <contest_id>")
+        sys.exit(1)
+    rebuild(int(sys.argv[1]))
@@ -0,0 +1,38 @@
+"""
+Rebuild the leaderboard sorted set
+Reloads every user's total_points from user_progress_summary into Redis.
+Use after a Redis flush or restore, or if rankings look out of date.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.curriculum
+import redis
+from database.cache import get_redis
+from services.leaderboard_service import LeaderboardService
+
+
+def rebuild():
+    try:
+        get_redis().ping()
+    except redis.RedisError as e:
+        print(f"❌ Redis is unavailable ({e}); workers serve the leaderboard from local copies until it returns")
+        return
+
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding leaderboard...")
+        count = LeaderboardService.rebuild(db)
+        print(f"✅ Done: {count} users ranked")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,32 @@
+"""
+Rebuild the user_progress_summary read model
+Recomputes every user's counters from lesson/module/tier progress, challenge
+submissions and the leaderboard. Use after the migration to backfill existing
+users, or any time the summary is suspected to have drifted.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.curriculum
+from services.progress_service import ProgressService
+
+
+def rebuild():
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding user progress summaries...")
+        changed = ProgressService.rebuild_all(db)
+        print(f"✅ Done: {changed} summary rows created or corrected")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
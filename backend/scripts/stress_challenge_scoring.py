@@ -0,0 +1,199 @@
+"""
+Stress-test challenge scoring under concurrent submissions
+Fires hundreds of simultaneous flag submissions, most of them duplicate
+solves, at ChallengeScoring and checks that every counter matches the
+submissions that were recorded. Uses DATABASE_URL unless --database-url is
+given (PostgreSQL exercises real row-level concurrency); the users and
+challenges it creates are removed afterwards.
+"""
+import sys
+import os
+import argparse
+import random
+import threading
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database.connection import Base
+import models.labs        # Register LabInstance (needed by User)
+import models.curriculum
+from models.user import User
+from models.challenge import Challenge, ChallengeSubmission, ChallengeDifficulty, Leaderboard
+from models.progress import UserAchievement, UserProgressSummary
+from services.challenge_scoring import ChallengeScoring, DIFFICULTY_COUNTERS
+
+
+def setup(Session, tag: str, n_users: int, n_challenges: int):
+    db = Session()
+    try:
+        users = [
+            User(email=f"stress_{tag}_{i}@example.com", username=f"stress_{tag}_{i}", password_hash="x")
+            for i in range(n_users)
+        ]
+        difficulties = list(ChallengeDifficulty)
+        challenges = [
+            Challenge(
+                title=f"Stress {tag} {i}", description="Scoring stress test", category="forensics",
+                difficulty=difficulties[i % len(difficulties)], flag=f"FLAG{{{tag}-{i}}}",
+                base_points=100 * (i + 1), hint_penalty=10, is_published=False
+            )
+            for i in range(n_challenges)
+        ]
+        db.add_all(users + challenges)
+        db.commit()
+        return [u.id for u in users], [(c.id, c.flag, c.difficulty) for c in challenges]
+    finally:
+        db.close()
+
+
+def submit(Session, barrier, user_id: int, challenge_id: int, flag: str):
+    db = Session()
+    try:
+        challenge = db.get(Challenge, challenge_id)
+        barrier.wait(timeout=60)
+        return user_id, challenge_id, ChallengeScoring.submit(user_id, challenge, flag, db)
+    finally:
+        db.close()
+
+
+def verify(Session, user_ids, challenges, responses) -> list:
+    """Compare every counter with the recorded submissions; returns failures"""
+    db = Session()
+    failures = []
+    try:
+        awarded = defaultdict(int)
+        for user_id, _, response in responses:
+            awarded[user_id] += response.get("points_earned", 0)
+
+        solves = Counter(
+            (user_id, challenge_id) for user_id, challenge_id in db.query(
+                ChallengeSubmission.user_id, ChallengeSubmission.challenge_id
+            ).filter(ChallengeSubmission.user_id.in_(user_ids), ChallengeSubmission.is_correct == True)
+        )
+        duplicates = [key for key, count in solves.items() if count > 1]
+        if duplicates:
+            failures.append(f"{len(duplicates)} (user, challenge) pairs solved more than once")
+        if len(solves) != len(user_ids) * len(challenges):
+            failures.append(f"{len(solves)} solves recorded, expected {len(user_ids) * len(challenges)}")
+
+        recorded = dict(db.query(ChallengeSubmission.user_id, func.sum(ChallengeSubmission.points_earned)).filter(
+            ChallengeSubmission.user_id.in_(user_ids), ChallengeSubmission.is_correct == True
+        ).group_by(ChallengeSubmission.user_id))
+        leaderboard = {row.user_id: row for row in db.query(Leaderboard).filter(Leaderboard.user_id.in_(user_ids))}
+        summaries = {
+            row.user_id: row for row in db.query(UserProgressSummary).filter(UserProgressSummary.user_id.in_(user_ids))
+        }
+        expected_by_difficulty = Counter(DIFFICULTY_COUNTERS[difficulty] for _, _, difficulty in challenges)
+
+        for user_id in user_ids:
+            entry, summary = leaderboard.get(user_id), summaries.get(user_id)
+            if entry is None or summary is None:
+                failures.append(f"user {user_id}: missing leaderboard or summary row")
+                continue
+            points = int(recorded.get(user_id) or 0)
+            if not (entry.total_points == summary.challenge_points == points == awarded[user_id]):
+                failures.append(
+                    f"user {user_id}: leaderboard {entry.total_points}, summary {summary.challenge_points}, "
+                    f"submissions {points}, responses {awarded[user_id]}"
+                )
+            if not (entry.challenges_solved == summary.challenges_solved == len(challenges)):
+                failures.append(
+                    f"user {user_id}: solved {entry.challenges_solved} (leaderboard), "
+                    f"{summary.challenges_solved} (summary), expected {len(challenges)}"
+                )
+            for name, expected in expected_by_difficulty.items():
+                if getattr(entry, name) != expected:
+                    failures.append(f"user {user_id}: {name} is {getattr(entry, name)}, expected {expected}")
+
+        for challenge_id, solver_count in db.query(Challenge.id, Challenge.solver_count).filter(
+            Challenge.id.in_([challenge_id for challenge_id, _, _ in challenges])
+        ):
+            if solver_count != len(user_ids):
+                failures.append(f"challenge {challenge_id}: solver_count {solver_count}, expected {len(user_ids)}")
+    finally:
+        db.close()
+    return failures
+
+
+def cleanup(Session, user_ids, challenge_ids):
+    db = Session()
+    try:
+        for model in (UserAchievement, UserProgressSummary, Leaderboard, ChallengeSubmission):
+            db.query(model).filter(model.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(Challenge).filter(Challenge.id.in_(challenge_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent challenge scoring stress test")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--challenges", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=4, help="Correct submissions per user and challenge")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    is_sqlite = args.database_url.startswith("sqlite")
+    engine = create_engine(
+        args.database_url,
+        connect_args={"check_same_thread": False, "timeout": 60} if is_sqlite else {},
+        pool_size=args.workers,  # Every worker holds a connection while waiting for its wave
+        max_overflow=0
+    )
+    if is_sqlite:
+        Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    tag = uuid.uuid4().hex[:8]
+    user_ids, challenges = setup(Session, tag, args.users, args.challenges)
+    jobs = [
+        (user_id, challenge_id, flag if attempt < args.repeats else "FLAG{wrong}")
+        for user_id in user_ids
+        for challenge_id, flag, _ in challenges
+        for attempt in range(args.repeats + 1)
+    ]
+    random.shuffle(jobs)
+    print(f"🔄 {len(jobs)} submissions from {len(user_ids)} users on {len(challenges)} challenges, "
+          f"{args.workers} at a time...")
+
+    responses, errors = [], []
+    barrier = threading.Barrier(args.workers)
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            # Each wave of `workers` submissions is released at once
+            wave_size = len(jobs) - len(jobs) % args.workers
+            futures = [pool.submit(submit, Session, barrier, *job) for job in jobs[:wave_size]]
+            for future in futures:
+                try:
+                    responses.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        # Leftovers that do not fill a wave
+        for job in jobs[wave_size:]:
+            responses.append(submit(Session, threading.Barrier(1), *job))
+
+        failures = [f"submission failed: {e!r}" for e in errors[:10]] + verify(Session, user_ids, challenges, responses)
+    finally:
+        cleanup(Session, user_ids, [challenge_id for challenge_id, _, _ in challenges])
+
+    solved = sum(1 for _, _, r in responses if r.get("points_earned"))
+    duplicates = sum(1 for _, _, r in responses if r.get("message") == "Already solved")
+    print(f"   {solved} solves scored, {duplicates} duplicate solves rejected, {len(errors)} errors")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ All totals exact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Verify per-user lesson completion bitsets against lesson_progress
+Reports users whose stored bitset disagrees with their completed lesson rows,
+or whose module unlock index disagrees with their bitset.
+Bitsets stored for an older curriculum layout are reported as stale; they
+are rebuilt automatically on the user's next completion.
+
+Usage: python scripts/verify_completion_bits.py [--repair]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import defaultdict
+
+from database.connection import SessionLocal
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+from models.progress import LessonProgress, UserLessonBits
+from services.curriculum_cache import CurriculumCache
+from services.completion_bits import CompletionBits, _from_bytes, _to_bytes
+
+
+def verify_completion_bits(repair: bool = False) -> bool:
+    print("🔍 COMPLETION BITSET VERIFICATION")
+    print("=" * 70)
+
+    db = SessionLocal()
+    try:
+        topology = CurriculumCache.get(db)
+
+        # Expected bitsets from the relational rows, in one pass
+        expected = defaultdict(int)
+        for user_id, lesson_id in db.query(LessonProgress.user_id, LessonProgress.lesson_id).filter(
+            LessonProgress.is_completed == True
+        ):
+            position = topology.lesson_bit.get(lesson_id)
+            if position is not None:
+                expected[user_id] |= 1 << position
+
+        checked = stale = mismatched = 0
+        for row in db.query(UserLessonBits).all():
+            checked += 1
+            if row.layout != topology.layout:
+                stale += 1
+                continue
+
+            stored = _from_bytes(row.bits)
+            want = expected.get(row.user_id, 0)
+            completed, unlocked = CompletionBits.module_state(want, topology)
+            if stored != want:
+                mismatched += 1
+                print(
+                    f"   ❌ user {row.user_id}: {stored.bit_count()} bits set, "
+                    f"{want.bit_count()} lessons completed "
+                    f"(missing {(want & ~stored).bit_count()}, extra {(stored & ~want).bit_count()})"
+                )
+            elif (_from_bytes(row.modules_completed), _from_bytes(row.modules_unlocked)) != (completed, unlocked):
+                mismatched += 1
+                print(f"   ❌ user {row.user_id}: unlock index disagrees with completed lessons")
+            else:
+                continue
+            if repair:
+                row.bits = _to_bytes(want)
+                row.modules_completed = _to_bytes(completed)
+                row.modules_unlocked = _to_bytes(unlocked)
+
+        if repair and mismatched:
+            db.commit()
+            print(f"\n🔧 Repaired {mismatched} bitsets")
+
+        print(f"\n   {checked} bitsets checked, {stale} stale layout, {mismatched} mismatched")
+        if mismatched == 0 or repair:
+            print("\n✅ PASSED: bitsets match lesson_progress")
+            return True
+
+        print("\n❌ FAILED: bitsets disagree with lesson_progress (run with --repair)")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_completion_bits(repair="--repair" in sys.argv) else 1)
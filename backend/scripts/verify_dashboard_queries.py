@@ -0,0 +1,96 @@
+"""
+Verify that the progress dashboard uses a fixed number of queries
+Seeds an in-memory curriculum of increasing size and counts SQL statements
+issued by ProgressService.get_dashboard for each size
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connection import Base
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+from models.user import User
+from models.curriculum import Tier, Module, Lesson
+from models.progress import LessonProgress, ModuleProgress, TierProgress
+from services.progress_service import ProgressService
+
+MODULE_COUNTS = [1, 5, 25, 100]
+LESSONS_PER_MODULE = 4
+
+
+def build_session(module_count: int):
+    """Create a throwaway SQLite database seeded with `module_count` modules"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="student@example.com", username="student", password_hash="x")
+    tier = Tier(tier_number=0, name="Tier 0", order=0)
+    db.add_all([user, tier])
+    db.flush()
+    db.add(TierProgress(user_id=user.id, tier_id=tier.id, is_unlocked=True))
+
+    for m in range(module_count):
+        module = Module(tier_id=tier.id, title=f"Module {m}", order=m, is_published=True)
+        db.add(module)
+        db.flush()
+        for l in range(LESSONS_PER_MODULE):
+            lesson = Lesson(module_id=module.id, title=f"Lesson {m}.{l}", order=l, is_published=True)
+            db.add(lesson)
+            db.flush()
+            # Complete every other lesson so the aggregates are non-trivial
+            if l % 2 == 0:
+                db.add(LessonProgress(
+                    user_id=user.id, lesson_id=lesson.id,
+                    is_completed=True, time_spent_minutes=5
+                ))
+        db.add(ModuleProgress(user_id=user.id, module_id=module.id, completion_percentage=50.0))
+
+    db.commit()
+    return engine, db, user.id
+
+
+def count_dashboard_queries(module_count: int):
+    engine, db, user_id = build_session(module_count)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    dashboard = ProgressService.get_dashboard(user_id, db)
+    db.close()
+
+    assert len(dashboard["modules"]) == module_count
+    assert dashboard["overall"]["total_time_minutes"] == module_count * (LESSONS_PER_MODULE // 2) * 5
+    return len(statements)
+
+
+def verify_dashboard_queries():
+    print("🔍 DASHBOARD QUERY COUNT VERIFICATION")
+    print("=" * 70)
+
+    counts = {}
+    for module_count in MODULE_COUNTS:
+        counts[module_count] = count_dashboard_queries(module_count)
+        print(f"   {module_count:>4} modules -> {counts[module_count]} queries")
+
+    if len(set(counts.values())) == 1:
+        print("\n✅ PASSED: query count is independent of curriculum size")
+        return True
+
+    print("\n❌ FAILED: query count grows with the number of modules")
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_dashboard_queries() else 1)
@@ -0,0 +1,83 @@
+"""
+Verify cache invalidation around savepoints
+A user's first progress write seeds their summary row inside a SAVEPOINT.
+Releasing or rolling back that savepoint must neither bump the progress
+ETag version early nor drop the changes marked so far; both must wait for
+the outer commit. Runs against a throwaway in-memory database.
+
+Usage: python scripts/verify_savepoint_invalidation.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.cache import get_local_version
+from database.connection import Base
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+import models.curriculum
+from models.user import User
+from models.progress import UserProgressSummary, mark_progress_changed, progress_version_name
+from services.progress_service import ProgressService
+
+
+def verify_savepoint_invalidation() -> bool:
+    print("🔍 SAVEPOINT INVALIDATION VERIFICATION")
+    print("=" * 70)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    failures = []
+
+    def check(ok: bool, label: str):
+        print(f"   {'✅' if ok else '❌'} {label}")
+        if not ok:
+            failures.append(label)
+
+    db = Session()
+    try:
+        first, second = User(email="first@example.com", username="first", password_hash="x"), \
+            User(email="second@example.com", username="second", password_hash="x")
+        db.add_all([first, second])
+        db.commit()
+
+        # First write for a user: the summary row is seeded in a savepoint
+        version = progress_version_name(first.id)
+        before = get_local_version(version)
+        ProgressService.increment_counters(first.id, db, total_time_minutes=5)
+        check(db.get(UserProgressSummary, first.id) is not None, "first write seeds the summary row")
+        check(get_local_version(version) == before, "ETag version unchanged before the outer commit")
+        check(first.id in db.info.get("leaderboard_scores", {}), "leaderboard score still staged")
+        db.commit()
+        check(get_local_version(version) == before + 1, "ETag version bumped by the outer commit")
+
+        # A savepoint that fails (as when another request seeds the row first)
+        version = progress_version_name(second.id)
+        before = get_local_version(version)
+        mark_progress_changed(db, [second.id])
+        try:
+            with db.begin_nested():
+                db.add(UserProgressSummary(user_id=first.id))
+        except IntegrityError:
+            pass
+        check(second.id in db.info.get("progress_changed", set()), "marks survive a savepoint rollback")
+        db.commit()
+        check(get_local_version(version) == before + 1, "outer commit still publishes the marks")
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n❌ FAILED: {len(failures)} checks")
+        return False
+    print("\n✅ PASSED: invalidation waits for the outer transaction")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_savepoint_invalidation() else 1)
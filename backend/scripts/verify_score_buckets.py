@@ -0,0 +1,92 @@
+"""
+Verify that lesson points are bucketed on server time
+An offline sync reports its own completed_at. Whatever the client claims,
+the points must land in today's bucket: a future-dated completion must not
+reach a future leaderboard window and a backdated one must not reach a
+past window. Runs against a throwaway in-memory database.
+
+Usage: python scripts/verify_score_buckets.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connection import Base
+import models.labs        # Register LabInstance (needed by User)
+import models.challenge   # Register Challenge (needed by Lesson)
+from models.curriculum import Tier, Module, Lesson
+from models.progress import UserDailyPoints
+from models.user import User
+from routes.progress_routes import apply_lesson_completions
+from schemas import LessonCompletionEvent
+from services.progress_service import LESSON_POINTS
+from services.score_buckets import ScoreBuckets, ScorePeriod
+
+
+def verify_score_buckets() -> bool:
+    print("🔍 SCORE BUCKET DATING VERIFICATION")
+    print("=" * 70)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    failures = []
+
+    def check(ok: bool, label: str):
+        print(f"   {'✅' if ok else '❌'} {label}")
+        if not ok:
+            failures.append(label)
+
+    def window_points(user_id: int, on: date) -> int:
+        start, end = ScoreBuckets.window(ScorePeriod.WEEKLY, on)
+        entries = ScoreBuckets.leaderboard(db, start, end)
+        return sum(entry["total_points"] for entry in entries if entry["user_id"] == user_id)
+
+    db = Session()
+    try:
+        user = User(email="offline@example.com", username="offline", password_hash="x")
+        tier = Tier(tier_number=0, name="Tier 0", order=0)
+        db.add_all([user, tier])
+        db.flush()
+        module = Module(tier_id=tier.id, title="Module", order=0, is_published=True)
+        db.add(module)
+        db.flush()
+        lessons = [Lesson(module_id=module.id, title=f"Lesson {i}", order=i, is_published=True) for i in range(3)]
+        db.add_all(lessons)
+        db.commit()
+
+        future, past = datetime(2031, 6, 2, 12, 0), datetime(2019, 6, 3, 12, 0)
+        results = asyncio.run(apply_lesson_completions(user.id, [
+            LessonCompletionEvent(lesson_id=lessons[0].id, completed_at=future),
+            LessonCompletionEvent(lesson_id=lessons[1].id, completed_at=past),
+        ], db))
+        completed = sum(result["status"] == "completed" for result in results)
+        print(f"   Sync results: {[result['status'] for result in results]}")
+
+        check(window_points(user.id, future.date()) == 0, "future-dated completion adds nothing to a future window")
+        check(window_points(user.id, past.date()) == 0, "backdated completion adds nothing to a past window")
+        check(
+            window_points(user.id, date.today()) == completed * LESSON_POINTS,
+            "accepted completions count in this week's window"
+        )
+        days = {day for (day,) in db.query(UserDailyPoints.day).filter(UserDailyPoints.user_id == user.id)}
+        check(days <= {date.today()}, "no bucket other than today's was written")
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n❌ FAILED: {len(failures)} checks")
+        return False
+    print("\n✅ PASSED: lesson points are bucketed on the server's day")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_score_buckets() else 1)
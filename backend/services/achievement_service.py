@@ -0,0 +1,195 @@
+"""
+Achievement Service
+Event-driven achievement evaluation against maintained per-user counters
+"""
+import enum
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Iterable, Tuple
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.connection import dialect_insert
+from models.progress import Achievement, UserAchievement, ModuleProgress, mark_progress_changed
+from services.progress_service import ProgressService
+
+logger = logging.getLogger(__name__)
+
+
+class AchievementEvent(str, enum.Enum):
+    """Progress events that can unlock achievements"""
+    LESSON_COMPLETED = "lesson_completed"
+    MODULE_COMPLETED = "module_completed"
+    CHALLENGE_SOLVED = "challenge_solved"
+
+
+# Event -> (criteria_type it can satisfy, summary counter it bumps)
+EVENT_CRITERIA = {
+    AchievementEvent.LESSON_COMPLETED: ("lesson_count", "lessons_completed"),
+    AchievementEvent.MODULE_COMPLETED: ("module_complete", "modules_completed"),
+    AchievementEvent.CHALLENGE_SOLVED: ("challenge_count", "challenges_solved"),
+}
+
+# criteria_type -> [(achievement_id, criteria_value)], refreshed every ACHIEVEMENT_INDEX_TTL_SECONDS
+_index: Dict[str, List[Tuple[int, int]]] = {}
+_index_loaded_at: float = 0.0
+
+
+class AchievementService:
+    """Awards achievements incrementally as progress events happen"""
+
+    @staticmethod
+    def get_index(db: Session) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Achievement definitions indexed by criteria_type
+
+        Definitions only change through the seed scripts, so each worker
+        just reloads them every ACHIEVEMENT_INDEX_TTL_SECONDS; a new or
+        edited achievement can go unnoticed for that long.
+        """
+        global _index, _index_loaded_at
+
+        if _index_loaded_at and time.monotonic() - _index_loaded_at < settings.ACHIEVEMENT_INDEX_TTL_SECONDS:
+            return _index
+
+        index: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for achievement_id, criteria_type, criteria_value in db.query(
+            Achievement.id, Achievement.criteria_type, Achievement.criteria_value
+        ).all():
+            index[criteria_type].append((achievement_id, criteria_value or 0))
+
+        _index = dict(index)
+        _index_loaded_at = time.monotonic()
+        return _index
+
+    @staticmethod
+    def award(user_id: int, achievement_ids: Iterable[int], db: Session) -> List[int]:
+        """
+        Award achievements the user does not have yet in one bulk insert
+
+        Safe against concurrent awards: INSERT ... ON CONFLICT DO NOTHING
+        skips achievements another transaction awarded first.
+
+        Args:
+            user_id: ID of the user
+            achievement_ids: Candidate achievement IDs
+            db: Database session
+
+        Returns:
+            IDs of newly awarded achievements (not committed)
+        """
+        candidates = set(achievement_ids)
+        if not candidates:
+            return []
+
+        earned = {
+            achievement_id for (achievement_id,) in db.query(UserAchievement.achievement_id).filter(
+                UserAchievement.user_id == user_id,
+                UserAchievement.achievement_id.in_(candidates)
+            )
+        }
+        missing = sorted(candidates - earned)
+        if not missing:
+            return []
+
+        # A concurrent event may award the same achievement; the unique index keeps one
+        new_ids = sorted(db.execute(
+            dialect_insert(db, UserAchievement).values([
+                {"user_id": user_id, "achievement_id": aid} for aid in missing
+            ]).on_conflict_do_nothing(
+                index_elements=["user_id", "achievement_id"]
+            ).returning(UserAchievement.achievement_id)
+        ).scalars().all())
+
+        if new_ids:
+            mark_progress_changed(db, [user_id])
+            logger.info(f"Awarded achievements {new_ids} to user {user_id}")
+        return new_ids
+
+    @staticmethod
+    def record_event(
+        user_id: int,
+        event: AchievementEvent,
+        db: Session,
+        count: int = 1,
+        subject_ids: Optional[Iterable[int]] = None,
+        extra_deltas: Optional[Dict[str, int]] = None
+    ) -> List[int]:
+        """
+        Record a progress event and evaluate only the criteria it affects
+
+        Args:
+            user_id: ID of the user
+            event: What just happened
+            db: Database session
+            count: How many events of this kind happened at once
+            subject_ids: IDs the event applies to (module IDs for MODULE_COMPLETED)
+            extra_deltas: Other summary counters to bump in the same statement
+
+        Returns:
+            IDs of newly awarded achievements (caller commits)
+        """
+        if count <= 0:
+            return []
+
+        _, counter = EVENT_CRITERIA[event]
+        counters = ProgressService.increment_counters(user_id, db, **{**(extra_deltas or {}), counter: count})
+        return AchievementService.evaluate(user_id, [event], counters, db, subject_ids)
+
+    @staticmethod
+    def evaluate(
+        user_id: int,
+        events: Iterable[AchievementEvent],
+        counters: Dict[str, int],
+        db: Session,
+        subject_ids: Optional[Iterable[int]] = None
+    ) -> List[int]:
+        """
+        Evaluate the criteria affected by events whose counters are already updated
+
+        Args:
+            user_id: ID of the user
+            events: Events that just happened
+            counters: Current summary counters (as returned by ProgressService)
+            db: Database session
+            subject_ids: Module IDs completed, for MODULE_COMPLETED
+
+        Returns:
+            IDs of newly awarded achievements (caller commits)
+        """
+        index = AchievementService.get_index(db)
+        subjects = set(subject_ids or ())
+
+        candidates = []
+        for event in set(events):
+            criteria_type, counter = EVENT_CRITERIA[event]
+            for aid, value in index.get(criteria_type, []):
+                if event == AchievementEvent.MODULE_COMPLETED:
+                    if value in subjects:
+                        candidates.append(aid)
+                elif counters[counter] >= value:
+                    candidates.append(aid)
+
+        return AchievementService.award(user_id, candidates, db)
+
+    @staticmethod
+    def evaluate_all(user_id: int, db: Session) -> List[int]:
+        """
+        Full re-evaluation from the raw progress rows (backfill only)
+
+        Args:
+            user_id: ID of the user
+            db: Database session
+
+        Returns:
+            IDs of newly awarded achievements (caller commits)
+        """
+        counters = ProgressService.compute_counters(user_id, db)
+        completed_module_ids = {
+            module_id for (module_id,) in db.query(ModuleProgress.module_id).filter(
+                ModuleProgress.user_id == user_id,
+                ModuleProgress.is_completed == True
+            )
+        }
+        return AchievementService.evaluate(user_id, list(AchievementEvent), counters, db, completed_module_ids)
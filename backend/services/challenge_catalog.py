@@ -0,0 +1,111 @@
+"""
+Challenge Catalog
+Published challenges per category/difficulty filter, cached per worker, with
+solver counts and the user's solves overlaid per request
+"""
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.cache import get_version, get_local_version
+from models.challenge import Challenge, ChallengeSubmission, CHALLENGE_VERSION
+
+logger = logging.getLogger(__name__)
+
+_version: Optional[str] = None
+_checked_local_version: int = -1
+_checked_at: float = 0.0
+
+# (category, difficulty) -> (challenge version, catalog entries)
+_catalogs: Dict[Tuple[Optional[str], Optional[str]], Tuple[str, List[Dict[str, Any]]]] = {}
+
+
+class ChallengeCatalog:
+    """Static challenge listings per worker, rebuilt when the challenge version changes"""
+
+    @staticmethod
+    def version() -> str:
+        """
+        Current challenge catalog version
+
+        The shared version is checked at most every CHALLENGE_CACHE_CHECK_SECONDS;
+        changes committed in this worker are picked up immediately.
+        """
+        global _version, _checked_local_version, _checked_at
+
+        now = time.monotonic()
+        local_version = get_local_version(CHALLENGE_VERSION)
+        if _version is not None and now - _checked_at < settings.CHALLENGE_CACHE_CHECK_SECONDS \
+                and _checked_local_version == local_version:
+            return _version
+
+        _version = get_version(CHALLENGE_VERSION)
+        _checked_local_version = local_version
+        _checked_at = now
+        return _version
+
+    @staticmethod
+    def get(db: Session, category: Optional[str] = None, difficulty: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Published challenges matching the filter, without per-user or live fields"""
+        version = ChallengeCatalog.version()
+        key = (category, difficulty)
+        cached = _catalogs.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        query = db.query(
+            Challenge.id, Challenge.title, Challenge.description, Challenge.category,
+            Challenge.difficulty, Challenge.base_points, Challenge.tags
+        ).filter(Challenge.is_published == True)
+        if category:
+            query = query.filter(Challenge.category == category)
+        if difficulty:
+            query = query.filter(Challenge.difficulty == difficulty)
+
+        entries = [
+            {
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "category": row.category,
+                "difficulty": row.difficulty,
+                "base_points": row.base_points,
+                "tags": row.tags
+            }
+            for row in query.order_by(Challenge.id)
+        ]
+        # Entries from older versions are dropped so the cache only grows with distinct filters
+        for stale in [k for k, (v, _) in _catalogs.items() if v != version]:
+            del _catalogs[stale]
+        _catalogs[key] = (version, entries)
+        logger.debug(f"Built challenge catalog {key} with {len(entries)} entries at v{version}")
+        return entries
+
+    @staticmethod
+    def list_for_user(
+        user_id: int, db: Session, category: Optional[str] = None, difficulty: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Catalog entries with solver counts and the user's solve status
+
+        Two queries regardless of catalog size: the maintained solver_count
+        column for the listed challenges and the user's solved set.
+        """
+        entries = ChallengeCatalog.get(db, category, difficulty)
+        if not entries:
+            return []
+        ids = [entry["id"] for entry in entries]
+
+        solver_counts = dict(db.query(Challenge.id, Challenge.solver_count).filter(Challenge.id.in_(ids)))
+        solved = {challenge_id for (challenge_id,) in db.query(ChallengeSubmission.challenge_id).filter(
+            ChallengeSubmission.user_id == user_id,
+            ChallengeSubmission.challenge_id.in_(ids),
+            ChallengeSubmission.is_correct == True
+        ).distinct()}
+
+        return [
+            {**entry, "solved": entry["id"] in solved, "solvers_count": solver_counts.get(entry["id"], 0)}
+            for entry in entries
+        ]
@@ -0,0 +1,143 @@
+"""
+Challenge Scoring
+Records flag submissions and applies solve points with single-statement atomic writes
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import update, func
+from sqlalchemy.orm import Session
+
+from database.connection import dialect_insert
+from models.challenge import Challenge, ChallengeSubmission, ChallengeDifficulty, Leaderboard
+from services.achievement_service import AchievementService, AchievementEvent
+from services.score_buckets import ScoreBuckets
+
+logger = logging.getLogger(__name__)
+
+# Leaderboard counter bumped per solve, by challenge difficulty
+DIFFICULTY_COUNTERS = {
+    ChallengeDifficulty.EASY: "easy_solved",
+    ChallengeDifficulty.MEDIUM: "medium_solved",
+    ChallengeDifficulty.HARD: "hard_solved",
+    ChallengeDifficulty.INSANE: "insane_solved",
+}
+
+
+class ChallengeScoring:
+    """
+    Scores flag submissions without read-modify-write cycles
+
+    A user's first correct submission per challenge is guaranteed by the
+    partial unique index on correct submissions; every counter is bumped
+    with UPDATE ... SET x = x + n or an upsert, so parallel solves never
+    lose points. Row locks are taken in a fixed order (submission, the
+    user's leaderboard and summary rows, then the challenge's solver
+    count) and held only until the commit at the end of submit().
+    """
+
+    @staticmethod
+    def _already_solved(user_id: int, challenge_id: int, db: Session) -> bool:
+        return db.query(ChallengeSubmission.id).filter(
+            ChallengeSubmission.challenge_id == challenge_id,
+            ChallengeSubmission.user_id == user_id,
+            ChallengeSubmission.is_correct == True
+        ).first() is not None
+
+    @staticmethod
+    def _record_solve(user_id: int, challenge: Challenge, flag: str, points: int, hints_used: int, db: Session) -> bool:
+        """Insert the correct submission; False if one already exists for this user and challenge"""
+        stmt = dialect_insert(db, ChallengeSubmission).values(
+            challenge_id=challenge.id,
+            user_id=user_id,
+            submitted_flag=flag,
+            is_correct=True,
+            points_earned=points,
+            hints_used=hints_used
+        )
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=["user_id", "challenge_id"],
+            index_where=ChallengeSubmission.is_correct == True
+        ).returning(ChallengeSubmission.id)
+        return db.execute(stmt).first() is not None
+
+    @staticmethod
+    def _add_to_leaderboard(user_id: int, difficulty: ChallengeDifficulty, points: int, db: Session) -> None:
+        """Upsert the user's leaderboard row, incrementing its counters in place"""
+        counter = DIFFICULTY_COUNTERS.get(difficulty)
+        values = {
+            "user_id": user_id,
+            "total_points": points,
+            "challenges_solved": 1,
+            "last_solve_at": datetime.utcnow(),
+            **{name: int(name == counter) for name in DIFFICULTY_COUNTERS.values()}
+        }
+        stmt = dialect_insert(db, Leaderboard).values(values)
+        increments = {
+            name: func.coalesce(getattr(Leaderboard, name), 0) + getattr(stmt.excluded, name)
+            for name in ("total_points", "challenges_solved", *DIFFICULTY_COUNTERS.values())
+        }
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={**increments, "last_solve_at": stmt.excluded.last_solve_at, "updated_at": func.now()}
+        ))
+
+    @staticmethod
+    def submit(user_id: int, challenge: Challenge, flag: str, db: Session) -> Dict[str, Any]:
+        """
+        Check a flag and record the submission; commits
+
+        Returns:
+            Response dict for POST /challenges/{id}/submit
+        """
+        if ChallengeScoring._already_solved(user_id, challenge.id, db):
+            return {"correct": True, "message": "Already solved", "points": 0}
+
+        is_correct = (flag.strip() == challenge.flag.strip())
+
+        # Calculate points (base points minus hint penalties)
+        hints_used = db.query(func.count(ChallengeSubmission.id)).filter(
+            ChallengeSubmission.challenge_id == challenge.id,
+            ChallengeSubmission.user_id == user_id
+        ).scalar()  # Simplified: count previous attempts as hints
+
+        if not is_correct:
+            db.add(ChallengeSubmission(
+                challenge_id=challenge.id,
+                user_id=user_id,
+                submitted_flag=flag,
+                is_correct=False,
+                points_earned=0,
+                hints_used=hints_used
+            ))
+            db.commit()
+            return {"correct": False, "message": "Incorrect flag. Try again!", "points_earned": 0}
+
+        penalty = (hints_used * (challenge.hint_penalty or 0)) / 100
+        points = int(challenge.base_points * (1 - penalty))
+
+        if not ChallengeScoring._record_solve(user_id, challenge, flag, points, hints_used, db):
+            # A parallel request recorded the solve first
+            db.rollback()
+            return {"correct": True, "message": "Already solved", "points": 0}
+
+        ChallengeScoring._add_to_leaderboard(user_id, challenge.difficulty, points, db)
+        ScoreBuckets.add(db, [(user_id, datetime.now(), "challenge_points", points)])
+        AchievementService.record_event(
+            user_id, AchievementEvent.CHALLENGE_SOLVED, db,
+            extra_deltas={"challenge_points": points}
+        )
+        # Last, so the hot challenge row is locked only briefly; a bulk UPDATE
+        # changes the counter without invalidating the cached catalog
+        db.execute(
+            update(Challenge).where(Challenge.id == challenge.id)
+            .values(solver_count=Challenge.solver_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        return {
+            "correct": True,
+            "message": f"Correct! You earned {points} points.",
+            "points_earned": points
+        }
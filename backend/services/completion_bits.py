@@ -0,0 +1,249 @@
+"""
+Lesson Completion Bitsets
+Per-user completion state as a bitset over the curriculum's lesson order,
+plus the module unlock index derived from it
+"""
+from typing import Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+
+from database.connection import dialect_insert
+from models.progress import LessonProgress, UserLessonBits
+from services.curriculum_cache import CurriculumCache, CurriculumTopology
+
+
+def _to_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def _from_bytes(data: Optional[bytes]) -> int:
+    return int.from_bytes(data or b"", "little")
+
+
+class UnlockIndex:
+    """A user's completed and unlocked modules as bitsets over the topology's module order"""
+
+    def __init__(self, topology: CurriculumTopology, bits: int, completed: int, unlocked: int):
+        self.topology = topology
+        self.bits = bits
+        self.completed = completed
+        self.unlocked = unlocked
+
+    def is_module_unlocked(self, module_id: int) -> bool:
+        position = self.topology.module_bit.get(module_id)
+        return position is not None and bool(self.unlocked >> position & 1)
+
+    def is_lesson_locked(self, lesson_id: int) -> bool:
+        module_id = self.topology.lesson_module.get(lesson_id)
+        return module_id is None or not self.is_module_unlocked(module_id)
+
+    def available_modules(self) -> List[int]:
+        """Unlocked modules not yet completed, in dependency order"""
+        remaining = self.unlocked & ~self.completed
+        modules = []
+        while remaining:
+            low = remaining & -remaining
+            modules.append(self.topology.module_order[low.bit_length() - 1])
+            remaining ^= low
+        return modules
+
+    def unlocked_modules(self) -> List[int]:
+        return [m for m in self.topology.module_order if self.unlocked >> self.topology.module_bit[m] & 1]
+
+    def locked_lessons(self, lesson_ids: Iterable[int]) -> Set[int]:
+        """
+        Lessons of a batch that stay locked even when the batch's other lessons
+        are completed first (an offline client may finish a prerequisite and
+        its dependent in one sync)
+        """
+        topology = self.topology
+        pending = {l for l in lesson_ids if self.is_lesson_locked(l)}
+        bits = self.bits
+        for lesson_id in lesson_ids:
+            if lesson_id not in pending and lesson_id in topology.lesson_bit:
+                bits |= 1 << topology.lesson_bit[lesson_id]
+
+        opened = True
+        while opened and pending:
+            opened = False
+            for lesson_id in list(pending):
+                module_id = topology.lesson_module.get(lesson_id)
+                if module_id is None:
+                    continue
+                requires = topology.module_requires[module_id]
+                if bits & requires == requires:
+                    pending.discard(lesson_id)
+                    bits |= 1 << topology.lesson_bit[lesson_id]
+                    opened = True
+        return pending
+
+
+class CompletionBits:
+    """
+    Completion bitsets kept in sync by the lesson completion path
+
+    Bit positions come from the curriculum topology; a stored bitset is
+    only trusted when its layout matches the current one; otherwise it is
+    rebuilt from lesson_progress.
+    """
+
+    @staticmethod
+    def from_rows(user_id: int, topology: CurriculumTopology, db: Session) -> int:
+        """Build a user's bitset from their completed lesson_progress rows"""
+        bits = 0
+        for (lesson_id,) in db.query(LessonProgress.lesson_id).filter(
+            LessonProgress.user_id == user_id,
+            LessonProgress.is_completed == True
+        ):
+            position = topology.lesson_bit.get(lesson_id)
+            if position is not None:
+                bits |= 1 << position
+        return bits
+
+    @staticmethod
+    def module_state(bits: int, topology: CurriculumTopology) -> Tuple[int, int]:
+        """(completed, unlocked) module bitsets computed from scratch"""
+        completed = unlocked = 0
+        for module_id, position in topology.module_bit.items():
+            mask = topology.module_mask.get(module_id, 0)
+            if bits & mask == mask:
+                completed |= 1 << position
+            requires = topology.module_requires[module_id]
+            if bits & requires == requires:
+                unlocked |= 1 << position
+        return completed, unlocked
+
+    @staticmethod
+    def _update_modules(
+        bits: int, topology: CurriculumTopology, completed: int, unlocked: int, lesson_ids: Iterable[int]
+    ) -> Tuple[int, int]:
+        """Apply newly completed lessons to the module bitsets, visiting only their dependents"""
+        for module_id in {topology.lesson_module[l] for l in lesson_ids if l in topology.lesson_module}:
+            mask = topology.module_mask[module_id]
+            if bits & mask == mask:
+                completed |= 1 << topology.module_bit[module_id]
+            # Dependents only need the module's published lessons, which may be done before the module is
+            required = topology.module_required_mask[module_id]
+            if bits & required != required:
+                continue
+            for dependent in topology.prerequisites.dependents[module_id]:
+                requires = topology.module_requires[dependent]
+                if bits & requires == requires:
+                    unlocked |= 1 << topology.module_bit[dependent]
+        return completed, unlocked
+
+    @staticmethod
+    def get_index(user_id: int, db: Session) -> UnlockIndex:
+        """Unlock index for a user (read-only; a stale layout is rebuilt in memory)"""
+        topology = CurriculumCache.get(db)
+        row = db.query(
+            UserLessonBits.layout, UserLessonBits.bits,
+            UserLessonBits.modules_completed, UserLessonBits.modules_unlocked
+        ).filter(UserLessonBits.user_id == user_id).first()
+        if row is not None and row.layout == topology.layout:
+            return UnlockIndex(
+                topology, _from_bytes(row.bits), _from_bytes(row.modules_completed), _from_bytes(row.modules_unlocked)
+            )
+        bits = CompletionBits.from_rows(user_id, topology, db)
+        return UnlockIndex(topology, bits, *CompletionBits.module_state(bits, topology))
+
+    @staticmethod
+    def locked_lessons(user_id: int, lesson_ids: Iterable[int], db: Session) -> Set[int]:
+        """
+        Lessons of a batch the user may not open
+
+        Lessons the user already has progress on stay open: they were started
+        before prerequisites were enforced, or while the module was unlocked.
+        Costs one extra query, and only when something is locked.
+        """
+        locked = CompletionBits.get_index(user_id, db).locked_lessons(lesson_ids)
+        if locked:
+            locked -= {
+                lesson_id for (lesson_id,) in db.query(LessonProgress.lesson_id).filter(
+                    LessonProgress.user_id == user_id,
+                    LessonProgress.lesson_id.in_(locked)
+                )
+            }
+        return locked
+
+    @staticmethod
+    def is_lesson_locked(user_id: int, lesson_id: int, db: Session) -> bool:
+        return bool(CompletionBits.locked_lessons(user_id, [lesson_id], db))
+
+    @staticmethod
+    def get(user_id: int, db: Session) -> int:
+        """Current bitset for a user (read-only; a stale layout is rebuilt in memory)"""
+        topology = CurriculumCache.get(db)
+        row = db.query(UserLessonBits.layout, UserLessonBits.bits).filter(
+            UserLessonBits.user_id == user_id
+        ).first()
+        if row is not None and row.layout == topology.layout:
+            return _from_bytes(row.bits)
+        return CompletionBits.from_rows(user_id, topology, db)
+
+    @staticmethod
+    def add(user_id: int, lesson_ids: Iterable[int], db: Session) -> int:
+        """
+        Set the bits of newly completed lessons and return the updated bitset
+
+        The row is created empty if missing and then locked, so concurrent
+        completions for the same user apply one after the other. The unlock
+        index is updated for the modules these lessons complete. Call after
+        the lesson_progress rows are written; does not commit.
+        """
+        topology = CurriculumCache.get(db)
+
+        db.execute(dialect_insert(db, UserLessonBits).values(
+            user_id=user_id, layout="", bits=b""
+        ).on_conflict_do_nothing(index_elements=["user_id"]))
+        row = db.query(UserLessonBits).filter(
+            UserLessonBits.user_id == user_id
+        ).with_for_update().populate_existing().one()
+
+        lesson_ids = list(lesson_ids)
+        if row.layout == topology.layout:
+            bits = _from_bytes(row.bits)
+            for lesson_id in lesson_ids:
+                position = topology.lesson_bit.get(lesson_id)
+                if position is not None:
+                    bits |= 1 << position
+            completed, unlocked = CompletionBits._update_modules(
+                bits, topology, _from_bytes(row.modules_completed), _from_bytes(row.modules_unlocked), lesson_ids
+            )
+        else:
+            # New user or the curriculum changed shape: rows already include this change
+            bits = CompletionBits.from_rows(user_id, topology, db)
+            completed, unlocked = CompletionBits.module_state(bits, topology)
+
+        row.layout = topology.layout
+        row.bits = _to_bytes(bits)
+        row.modules_completed = _to_bytes(completed)
+        row.modules_unlocked = _to_bytes(unlocked)
+        return bits
+
+    @staticmethod
+    def count(bits: int, mask: int) -> int:
+        """Number of completed lessons within a mask"""
+        return (bits & mask).bit_count()
+
+    @staticmethod
+    def module_progress(bits: int, topology: CurriculumTopology, module_id: int) -> Tuple[int, int]:
+        """(completed, total) lessons for a module"""
+        mask = topology.module_mask.get(module_id, 0)
+        return CompletionBits.count(bits, mask), mask.bit_count()
+
+    @staticmethod
+    def completed_modules(bits: int, topology: CurriculumTopology, tier_id: int) -> int:
+        """Number of modules in a tier with every lesson completed"""
+        masks = [topology.module_mask[module_id] for module_id in topology.tier_modules.get(tier_id, [])]
+        return sum(1 for mask in masks if mask and bits & mask == mask)
+
+    @staticmethod
+    def next_lesson(bits: int, topology: CurriculumTopology, module_id: Optional[int] = None) -> Optional[int]:
+        """First uncompleted published lesson in curriculum order, optionally within one module"""
+        mask = topology.published_mask
+        if module_id is not None:
+            mask &= topology.module_mask.get(module_id, 0)
+        remaining = mask & ~bits
+        if not remaining:
+            return None
+        return topology.lesson_order[(remaining & -remaining).bit_length() - 1]
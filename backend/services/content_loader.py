@@ -0,0 +1,391 @@
+"""
+Content Package Loader
+Loads curriculum from a declarative content package with bulk, idempotent writes
+
+Package layout (one directory per tier and per module, JSON manifests):
+
+    <package>/
+        <tier dir>/tier.json            {"tier_number", "name", "description", "order", "is_active"}
+        <tier dir>/<module dir>/module.json
+            {"title", "description", "order", "estimated_hours", "prerequisites",
+             "is_published", "lessons": [
+                {"title", "file": "01-intro.md", "description", "duration_minutes",
+                 "difficulty", "is_published", "challenge_id", "blocks": [
+                    {"type", "text_content" | "text_file", "code_content" | "code_file",
+                     "code_language", "media_url", "quiz_data"}]}]}
+        <tier dir>/<module dir>/01-intro.md   (lesson markdown)
+
+Tiers are matched by tier_number, modules by title within their tier and
+lessons by title within their module. Module prerequisites are comma-separated
+module titles (or ids) and must not form a cycle. Lesson and module order default to
+their position. A lesson's blocks are replaced as a whole when any of them
+changed. Rows missing from the package are reported, never deleted, since
+progress rows reference them.
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import Session
+
+from models.curriculum import (
+    Tier, Module, Lesson, ContentBlock, ContentType, CURRICULUM_ENTITIES, record_curriculum_changes
+)
+from services.prerequisite_graph import PrerequisiteGraph
+from services.quiz_engine import QuizEngine, QuizDefinitionError
+
+logger = logging.getLogger(__name__)
+
+TIER_FIELDS = ("name", "description", "order", "is_active")
+MODULE_FIELDS = ("description", "order", "estimated_hours", "prerequisites", "is_published")
+LESSON_FIELDS = (
+    "description", "order", "content_markdown", "duration_minutes", "difficulty", "is_published", "challenge_id"
+)
+BLOCK_FIELDS = ("type", "order", "text_content", "code_content", "code_language", "media_url", "quiz_data")
+
+
+class ContentPackageError(ValueError):
+    """The content package is malformed"""
+
+
+def _slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")[:50] or "untitled"
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ContentPackageError(f"{path}: {e}")
+
+
+def _read_text(base: Path, name: str) -> str:
+    path = base / name
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise ContentPackageError(f"{path}: {e}")
+
+
+def _require(data: Dict[str, Any], key: str, path: Path) -> Any:
+    if data.get(key) in (None, ""):
+        raise ContentPackageError(f"{path}: missing '{key}'")
+    return data[key]
+
+
+def _block(data: Dict[str, Any], base: Path, path: Path, position: int) -> Dict[str, Any]:
+    try:
+        block_type = ContentType(_require(data, "type", path)).value
+    except ValueError:
+        raise ContentPackageError(f"{path}: unknown block type '{data.get('type')}'")
+
+    quiz_data = data.get("quiz_data")
+    if quiz_data is not None and not isinstance(quiz_data, str):
+        quiz_data = json.dumps(quiz_data, sort_keys=True)
+    if block_type == ContentType.QUIZ.value:
+        try:
+            QuizEngine.parse(quiz_data)
+        except QuizDefinitionError as e:
+            raise ContentPackageError(f"{path}: invalid quiz: {e}")
+
+    return {
+        "type": block_type,
+        "order": data.get("order", position),
+        "text_content": _read_text(base, data["text_file"]) if "text_file" in data else data.get("text_content"),
+        "code_content": _read_text(base, data["code_file"]) if "code_file" in data else data.get("code_content"),
+        "code_language": data.get("code_language"),
+        "media_url": data.get("media_url"),
+        "quiz_data": quiz_data,
+    }
+
+
+def read_package(root: str) -> List[Dict[str, Any]]:
+    """
+    Read and validate a content package
+
+    Returns:
+        Tiers with nested "modules", "lessons" and "blocks", values ready to write
+    """
+    root_path = Path(root)
+    if not root_path.is_dir():
+        raise ContentPackageError(f"{root}: not a directory")
+
+    tiers = []
+    for tier_manifest in sorted(root_path.glob("*/tier.json")):
+        data = _read_json(tier_manifest)
+        tier = {
+            "tier_number": _require(data, "tier_number", tier_manifest),
+            "name": _require(data, "name", tier_manifest),
+            "description": data.get("description"),
+            "order": data.get("order", data["tier_number"]),
+            "is_active": data.get("is_active", True),
+            "modules": [],
+        }
+
+        for position, module_manifest in enumerate(sorted(tier_manifest.parent.glob("*/module.json"))):
+            data = _read_json(module_manifest)
+            base = module_manifest.parent
+            module = {
+                "title": _require(data, "title", module_manifest),
+                "description": data.get("description"),
+                "order": data.get("order", position),
+                "estimated_hours": data.get("estimated_hours"),
+                "prerequisites": data.get("prerequisites"),
+                "is_published": data.get("is_published", False),
+                "lessons": [],
+            }
+
+            for lesson_position, lesson_data in enumerate(data.get("lessons", [])):
+                lesson = {
+                    "title": _require(lesson_data, "title", module_manifest),
+                    "description": lesson_data.get("description"),
+                    "order": lesson_data.get("order", lesson_position),
+                    "content_markdown": _read_text(base, lesson_data["file"]) if "file" in lesson_data
+                    else lesson_data.get("content_markdown"),
+                    "duration_minutes": lesson_data.get("duration_minutes"),
+                    "difficulty": lesson_data.get("difficulty", "beginner"),
+                    "is_published": lesson_data.get("is_published", False),
+                    "challenge_id": lesson_data.get("challenge_id"),
+                    "blocks": [
+                        _block(block, base, module_manifest, block_position)
+                        for block_position, block in enumerate(lesson_data.get("blocks", []))
+                    ],
+                }
+                module["lessons"].append(lesson)
+
+            titles = [l["title"] for l in module["lessons"]]
+            if len(titles) != len(set(titles)):
+                raise ContentPackageError(f"{module_manifest}: duplicate lesson titles")
+            tier["modules"].append(module)
+
+        titles = [m["title"] for m in tier["modules"]]
+        if len(titles) != len(set(titles)):
+            raise ContentPackageError(f"{tier_manifest.parent}: duplicate module titles")
+        tiers.append(tier)
+
+    numbers = [t["tier_number"] for t in tiers]
+    if len(numbers) != len(set(numbers)):
+        raise ContentPackageError(f"{root}: duplicate tier numbers")
+    return tiers
+
+
+def _normalize(value: Any) -> Any:
+    return value.value if isinstance(value, ContentType) else value
+
+
+def _diff(
+    existing: Dict[Any, Dict[str, Any]],
+    wanted: Dict[Any, Dict[str, Any]],
+    fields: Tuple[str, ...]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    """(rows to insert, {"id", changed fields} to update, unchanged count)"""
+    inserts, updates, unchanged = [], [], 0
+    for key, values in wanted.items():
+        current = existing.get(key)
+        if current is None:
+            inserts.append(values)
+            continue
+        changed = {f: values[f] for f in fields if _normalize(current[f]) != values[f]}
+        if changed:
+            updates.append({"id": current["id"], **changed})
+        else:
+            unchanged += 1
+    return inserts, updates, unchanged
+
+
+class ContentLoader:
+    """Applies a content package to the database in one transaction"""
+
+    @staticmethod
+    def _existing(db: Session, model, key_columns, fields) -> Dict[Any, Dict[str, Any]]:
+        columns = [model.id] + [getattr(model, c) for c in key_columns] + [getattr(model, f) for f in fields]
+        rows = {}
+        for row in db.query(*columns):
+            values = dict(zip(["id"] + list(key_columns) + list(fields), row))
+            key = tuple(values[c] for c in key_columns)
+            rows[key[0] if len(key) == 1 else key] = values
+        return rows
+
+    @staticmethod
+    def _write(db: Session, model, key_columns, inserts, updates) -> Dict[Any, int]:
+        """Bulk insert and update, logging the changes; returns ids of inserted rows by key"""
+        if updates:
+            db.execute(update(model), updates)
+        ids = {}
+        if inserts:
+            returning = [model.id] + [getattr(model, c) for c in key_columns]
+            for row in db.execute(insert(model).returning(*returning), inserts):
+                ids[row[1] if len(key_columns) == 1 else tuple(row[1:])] = row[0]
+        record_curriculum_changes(db, CURRICULUM_ENTITIES[model], [u["id"] for u in updates] + list(ids.values()))
+        return ids
+
+    @staticmethod
+    def apply(db: Session, tiers: List[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Diff a package against the database and write only what changed
+
+        Args:
+            db: Database session
+            tiers: Package as returned by read_package
+            dry_run: Roll back instead of committing
+
+        Returns:
+            Report of inserted/updated/unchanged counts per level and rows
+            that exist in the database but not in the package
+        """
+        report: Dict[str, Any] = {}
+
+        # Tiers, keyed by tier_number
+        existing_tiers = ContentLoader._existing(db, Tier, ("tier_number",), TIER_FIELDS)
+        wanted = {
+            t["tier_number"]: {"tier_number": t["tier_number"], **{f: t[f] for f in TIER_FIELDS}} for t in tiers
+        }
+        inserts, updates, unchanged = _diff(existing_tiers, wanted, TIER_FIELDS)
+        tier_ids = {number: row["id"] for number, row in existing_tiers.items()}
+        tier_ids.update(ContentLoader._write(db, Tier, ("tier_number",), inserts, updates))
+        report["tiers"] = {"inserted": len(inserts), "updated": len(updates), "unchanged": unchanged}
+
+        # Modules, keyed by (tier_id, title)
+        existing_modules = ContentLoader._existing(db, Module, ("tier_id", "title"), MODULE_FIELDS)
+        wanted = {}
+        for t in tiers:
+            tier_id = tier_ids[t["tier_number"]]
+            for m in t["modules"]:
+                wanted[(tier_id, m["title"])] = {
+                    "tier_id": tier_id, "title": m["title"], **{f: m[f] for f in MODULE_FIELDS}
+                }
+        inserts, updates, unchanged = _diff(existing_modules, wanted, MODULE_FIELDS)
+        module_ids = {key: row["id"] for key, row in existing_modules.items()}
+        module_ids.update(ContentLoader._write(db, Module, ("tier_id", "title"), inserts, updates))
+        report["modules"] = {"inserted": len(inserts), "updated": len(updates), "unchanged": unchanged}
+
+        # Lessons, keyed by (module_id, title)
+        existing_lessons = ContentLoader._existing(db, Lesson, ("module_id", "title"), LESSON_FIELDS)
+        wanted, wanted_blocks = {}, {}
+        for t in tiers:
+            for m in t["modules"]:
+                module_id = module_ids[(tier_ids[t["tier_number"]], m["title"])]
+                for l in m["lessons"]:
+                    wanted[(module_id, l["title"])] = {
+                        "module_id": module_id, "title": l["title"], **{f: l[f] for f in LESSON_FIELDS}
+                    }
+                    wanted_blocks[(module_id, l["title"])] = l["blocks"]
+        inserts, updates, unchanged = _diff(existing_lessons, wanted, LESSON_FIELDS)
+        lesson_ids = {key: row["id"] for key, row in existing_lessons.items()}
+        lesson_ids.update(ContentLoader._write(db, Lesson, ("module_id", "title"), inserts, updates))
+        report["lessons"] = {"inserted": len(inserts), "updated": len(updates), "unchanged": unchanged}
+
+        # Blocks: replace a lesson's blocks as a whole when they differ
+        existing_blocks: Dict[int, List[Tuple]] = {}
+        block_ids: Dict[int, List[int]] = {}
+        for row in db.query(
+            ContentBlock.lesson_id, ContentBlock.id, *[getattr(ContentBlock, f) for f in BLOCK_FIELDS]
+        ).order_by(ContentBlock.lesson_id, ContentBlock.order, ContentBlock.id):
+            existing_blocks.setdefault(row[0], []).append(tuple(_normalize(v) for v in row[2:]))
+            block_ids.setdefault(row[0], []).append(row[1])
+
+        replaced, block_rows = [], []
+        for key, blocks in wanted_blocks.items():
+            lesson_id = lesson_ids[key]
+            wanted_rows = [tuple(b[f] for f in BLOCK_FIELDS) for b in sorted(blocks, key=lambda b: b["order"])]
+            if existing_blocks.get(lesson_id, []) != wanted_rows:
+                replaced.append(lesson_id)
+                block_rows.extend({"lesson_id": lesson_id, **b} for b in blocks)
+        changed_blocks = [block_id for lesson_id in replaced for block_id in block_ids.get(lesson_id, [])]
+        if replaced:
+            db.execute(delete(ContentBlock).where(ContentBlock.lesson_id.in_(replaced)))
+        if block_rows:
+            changed_blocks += db.execute(insert(ContentBlock).returning(ContentBlock.id), block_rows).scalars().all()
+        record_curriculum_changes(db, CURRICULUM_ENTITIES[ContentBlock], changed_blocks)
+        report["blocks"] = {
+            "lessons_replaced": len(replaced),
+            "deleted": sum(len(existing_blocks.get(lesson_id, [])) for lesson_id in replaced),
+            "inserted": len(block_rows),
+        }
+
+        package_tiers = {t["tier_number"] for t in tiers}
+        package_modules = {(tier_ids[t["tier_number"]], m["title"]) for t in tiers for m in t["modules"]}
+        report["not_in_package"] = {
+            "tiers": sorted(number for number in existing_tiers if number not in package_tiers),
+            "modules": sorted(
+                f"{row['id']}: {key[1]}" for key, row in existing_modules.items() if key not in package_modules
+            ),
+            "lessons": sorted(
+                f"{row['id']}: {key[1]}" for key, row in existing_lessons.items() if key not in wanted
+            ),
+        }
+
+        # Module prerequisites (ids or titles) must still form a DAG
+        modules = db.query(Module.id, Tier.tier_number, Module.title, Module.prerequisites).join(
+            Tier, Tier.id == Module.tier_id
+        ).order_by(Tier.tier_number, Module.order, Module.id).all()
+        graph = PrerequisiteGraph.build(modules)
+        if graph.cycles:
+            db.rollback()
+            raise ContentPackageError("; ".join(graph.errors({row.id: row.title for row in modules})))
+        report["unresolved_prerequisites"] = {
+            f"{module_id}: {title}": graph.unresolved[module_id]
+            for module_id, _, title, _ in modules if module_id in graph.unresolved
+        }
+
+        changed = any(
+            report[level]["inserted"] or report[level].get("updated") for level in ("tiers", "modules", "lessons")
+        ) or bool(replaced)
+
+        if dry_run:
+            db.rollback()
+        elif changed:
+            db.commit()
+        report["changed"] = changed
+        return report
+
+    @staticmethod
+    def export(db: Session, root: str) -> int:
+        """
+        Write the current curriculum as a content package
+
+        Returns:
+            Number of lessons written
+        """
+        root_path = Path(root)
+        root_path.mkdir(parents=True, exist_ok=True)
+        lessons_written = 0
+        blocks_by_lesson: Dict[int, List[ContentBlock]] = {}
+        for block in db.query(ContentBlock).order_by(ContentBlock.order, ContentBlock.id):
+            blocks_by_lesson.setdefault(block.lesson_id, []).append(block)
+        lessons_by_module: Dict[int, List[Lesson]] = {}
+        for lesson in db.query(Lesson).order_by(Lesson.order, Lesson.id):
+            lessons_by_module.setdefault(lesson.module_id, []).append(lesson)
+        modules_by_tier: Dict[int, List[Module]] = {}
+        for module in db.query(Module).order_by(Module.order, Module.id):
+            modules_by_tier.setdefault(module.tier_id, []).append(module)
+
+        for tier in db.query(Tier).order_by(Tier.tier_number):
+            tier_dir = root_path / f"tier-{tier.tier_number}-{_slug(tier.name)}"
+            tier_dir.mkdir(parents=True, exist_ok=True)
+            (tier_dir / "tier.json").write_text(json.dumps(
+                {"tier_number": tier.tier_number, **{f: getattr(tier, f) for f in TIER_FIELDS}}, indent=2
+            ), encoding="utf-8")
+
+            for position, module in enumerate(modules_by_tier.get(tier.id, [])):
+                module_dir = tier_dir / f"{position + 1:02d}-{_slug(module.title)}"
+                module_dir.mkdir(exist_ok=True)
+                manifest = {"title": module.title, **{f: getattr(module, f) for f in MODULE_FIELDS}, "lessons": []}
+
+                for lesson_position, lesson in enumerate(lessons_by_module.get(module.id, [])):
+                    filename = f"{lesson_position + 1:02d}-{_slug(lesson.title)}.md"
+                    (module_dir / filename).write_text(lesson.content_markdown or "", encoding="utf-8")
+                    entry = {"title": lesson.title, "file": filename}
+                    entry.update({f: getattr(lesson, f) for f in LESSON_FIELDS if f != "content_markdown"})
+                    entry["blocks"] = [
+                        {f: _normalize(getattr(block, f)) for f in BLOCK_FIELDS}
+                        for block in blocks_by_lesson.get(lesson.id, [])
+                    ]
+                    manifest["lessons"].append(entry)
+                    lessons_written += 1
+
+                (module_dir / "module.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        return lessons_written
@@ -0,0 +1,235 @@
+"""
+Contest Scoring
+Dynamic challenge values, first bloods and an incrementally maintained scoreboard
+"""
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from sqlalchemy import case, insert, update
+from sqlalchemy.orm import Session
+
+from database.connection import dialect_insert
+from models.user import User
+from models.challenge import Challenge
+from models.contest import Contest, ContestChallenge, ContestSolve, ContestScore
+
+logger = logging.getLogger(__name__)
+
+
+def challenge_value(max_points: int, min_points: int, decay: int, solver_count: int) -> int:
+    """
+    Points a contest challenge is worth once it has `solver_count` solvers
+
+    Quadratic decay: the first solver's value is max_points and the value
+    reaches min_points at decay + 1 solvers. Every solver earns the current
+    value, so earlier solvers lose points as a challenge gets solved more.
+    """
+    solves = max(solver_count - 1, 0)
+    value = math.ceil((min_points - max_points) / (decay ** 2) * solves ** 2 + max_points)
+    return max(value, min_points)
+
+
+def as_utc(value: datetime) -> datetime:
+    """A stored timestamp as UTC (contest times are written in UTC; SQLite returns them naive)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ContestScoring:
+    """
+    Scores contest solves incrementally
+
+    A solve changes one challenge's value, so only that challenge's solvers
+    are re-scored: they all gain the (usually negative) change in value in
+    one UPDATE, and the new solver also gets the new value plus any first
+    blood bonus. The scoreboard is never recomputed from the solve history
+    except by rebuild(), which exists for repair.
+    """
+
+    @staticmethod
+    def status(contest: Contest) -> str:
+        now = datetime.now(timezone.utc)
+        if now < as_utc(contest.starts_at):
+            return "upcoming"
+        if now > as_utc(contest.ends_at):
+            return "ended"
+        return "running"
+
+    @staticmethod
+    def submit(contest: Contest, challenge: Challenge, user_id: int, flag: str, db: Session) -> Dict[str, Any]:
+        """
+        Check a flag for a running contest and score the solve; commits
+
+        Row locks are taken in a fixed order: the solve, the contest
+        challenge (which serializes solves of one challenge), then the
+        solvers' score rows by user id, so parallel solves of different
+        challenges cannot deadlock on shared solvers.
+        """
+        already = db.query(ContestSolve.id).filter(
+            ContestSolve.contest_id == contest.id,
+            ContestSolve.challenge_id == challenge.id,
+            ContestSolve.user_id == user_id
+        ).first()
+        if already is not None:
+            return {"correct": True, "message": "Already solved", "points_earned": 0}
+
+        if flag.strip() != challenge.flag.strip():
+            return {"correct": False, "message": "Incorrect flag. Try again!", "points_earned": 0}
+
+        now = datetime.now(timezone.utc)
+        solve_id = db.execute(
+            dialect_insert(db, ContestSolve).values(
+                contest_id=contest.id, challenge_id=challenge.id, user_id=user_id, solved_at=now
+            ).on_conflict_do_nothing(
+                index_elements=["contest_id", "challenge_id", "user_id"]
+            ).returning(ContestSolve.id)
+        ).scalar()
+        if solve_id is None:
+            # A parallel request recorded the solve first
+            db.rollback()
+            return {"correct": True, "message": "Already solved", "points_earned": 0}
+
+        db.execute(
+            dialect_insert(db, ContestScore).values(contest_id=contest.id, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=["contest_id", "user_id"])
+        )
+
+        # Count the solve; the row lock on the contest challenge orders solvers of this challenge
+        solver_count, max_points, min_points, decay = db.execute(
+            update(ContestChallenge).where(
+                ContestChallenge.contest_id == contest.id,
+                ContestChallenge.challenge_id == challenge.id
+            ).values(solver_count=ContestChallenge.solver_count + 1).returning(
+                ContestChallenge.solver_count, ContestChallenge.max_points,
+                ContestChallenge.min_points, ContestChallenge.decay
+            )
+        ).one()
+        value = challenge_value(max_points, min_points, decay, solver_count)
+        delta = value - challenge_value(max_points, min_points, decay, solver_count - 1)
+        first_blood = solver_count == 1
+        bonus = contest.first_blood_bonus if first_blood else 0
+
+        challenge_values = {"current_value": value}
+        if first_blood:
+            challenge_values.update(first_blood_user_id=user_id, first_blood_at=now)
+            db.execute(update(ContestSolve).where(ContestSolve.id == solve_id).values(is_first_blood=True))
+        db.execute(update(ContestChallenge).where(
+            ContestChallenge.contest_id == contest.id,
+            ContestChallenge.challenge_id == challenge.id
+        ).values(challenge_values))
+
+        # Re-score this challenge's solvers (just the new solver once the value stops changing)
+        affected = ContestScore.contest_id == contest.id
+        if delta and not first_blood:
+            affected &= ContestScore.user_id.in_(
+                db.query(ContestSolve.user_id).filter(
+                    ContestSolve.contest_id == contest.id,
+                    ContestSolve.challenge_id == challenge.id
+                )
+            )
+        else:
+            affected &= ContestScore.user_id == user_id
+        db.query(ContestScore.user_id).filter(affected).order_by(ContestScore.user_id).with_for_update().all()
+
+        is_solver = ContestScore.user_id == user_id
+        db.execute(update(ContestScore).where(affected).values(
+            points=ContestScore.points + case((is_solver, value + bonus), else_=delta),
+            solves=ContestScore.solves + case((is_solver, 1), else_=0),
+            first_bloods=ContestScore.first_bloods + case((is_solver, int(first_blood)), else_=0),
+            last_solve_at=case((is_solver, now), else_=ContestScore.last_solve_at)
+        ).execution_options(synchronize_session=False))
+        db.commit()
+
+        message = f"Correct! You earned {value + bonus} points."
+        if first_blood:
+            message = f"First blood! You earned {value} points plus a {bonus} point bonus."
+        return {
+            "correct": True,
+            "message": message,
+            "points_earned": value + bonus,
+            "challenge_value": value,
+            "first_blood": first_blood
+        }
+
+    @staticmethod
+    def scoreboard(contest_id: int, db: Session, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """A page of the contest scoreboard; ties on points go to whoever reached them first"""
+        rows = db.query(
+            ContestScore.user_id, User.username, ContestScore.points, ContestScore.solves,
+            ContestScore.first_bloods, ContestScore.last_solve_at
+        ).join(User, User.id == ContestScore.user_id).filter(
+            ContestScore.contest_id == contest_id,
+            ContestScore.solves > 0
+        ).order_by(
+            ContestScore.points.desc(), ContestScore.last_solve_at, ContestScore.user_id
+        ).offset(offset).limit(limit).all()
+
+        return [
+            {
+                "rank": rank,
+                "username": row.username,
+                "points": row.points,
+                "solves": row.solves,
+                "first_bloods": row.first_bloods,
+                "last_solve_at": as_utc(row.last_solve_at).isoformat() if row.last_solve_at else None
+            }
+            for rank, row in enumerate(rows, start=offset + 1)
+        ]
+
+    @staticmethod
+    def rebuild(contest_id: int, db: Session) -> int:
+        """
+        Recompute a contest's challenge values and scores from its solves
+
+        For repair only; solves keep the scoreboard current incrementally.
+
+        Returns:
+            Number of participants scored
+        """
+        challenges = db.query(ContestChallenge).filter(ContestChallenge.contest_id == contest_id).all()
+        bonus = db.query(Contest.first_blood_bonus).filter(Contest.id == contest_id).scalar() or 0
+
+        solves_by_challenge = defaultdict(list)
+        for challenge_id, user_id, solved_at, solve_id in db.query(
+            ContestSolve.challenge_id, ContestSolve.user_id, ContestSolve.solved_at, ContestSolve.id
+        ).filter(ContestSolve.contest_id == contest_id).order_by(ContestSolve.solved_at, ContestSolve.id):
+            solves_by_challenge[challenge_id].append((user_id, solved_at, solve_id))
+
+        scores: Dict[int, Dict[str, Any]] = defaultdict(
+            lambda: {"points": 0, "solves": 0, "first_bloods": 0, "last_solve_at": None}
+        )
+        first_blood_ids = []
+        for contest_challenge in challenges:
+            solves = solves_by_challenge.get(contest_challenge.challenge_id, [])
+            value = challenge_value(
+                contest_challenge.max_points, contest_challenge.min_points, contest_challenge.decay, len(solves)
+            )
+            contest_challenge.solver_count = len(solves)
+            contest_challenge.current_value = value
+            contest_challenge.first_blood_user_id = solves[0][0] if solves else None
+            contest_challenge.first_blood_at = solves[0][1] if solves else None
+            for i, (user_id, solved_at, solve_id) in enumerate(solves):
+                score = scores[user_id]
+                score["points"] += value + (bonus if i == 0 else 0)
+                score["solves"] += 1
+                score["first_bloods"] += int(i == 0)
+                if score["last_solve_at"] is None or solved_at > score["last_solve_at"]:
+                    score["last_solve_at"] = solved_at
+            if solves:
+                first_blood_ids.append(solves[0][2])
+
+        db.execute(update(ContestSolve).where(ContestSolve.contest_id == contest_id).values(
+            is_first_blood=ContestSolve.id.in_(first_blood_ids)
+        ))
+        db.query(ContestScore).filter(ContestScore.contest_id == contest_id).delete(synchronize_session=False)
+        if scores:
+            db.execute(insert(ContestScore), [
+                {"contest_id": contest_id, "user_id": user_id, **score} for user_id, score in scores.items()
+            ])
+        db.commit()
+
+        logger.info(f"Rebuilt contest {contest_id} scoreboard for {len(scores)} participants")
+        return len(scores)
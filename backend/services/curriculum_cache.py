@@ -0,0 +1,226 @@
+"""
+Curriculum Cache
+In-process snapshots of the curriculum: the id-level topology used by progress
+rollups and the serialized tier tree served by GET /curriculum/tiers
+"""
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload, load_only
+
+from config import settings
+from database.cache import get_version, get_local_version, bump_version
+from models.curriculum import Tier, Module, Lesson, ContentBlock, CURRICULUM_VERSION
+from schemas import TierSummaryResponse
+from services.prerequisite_graph import PrerequisiteGraph
+
+logger = logging.getLogger(__name__)
+
+
+class CurriculumTopology:
+    """Read-only id-level view of tiers, modules and lessons at one curriculum version"""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.tier_number: Dict[int, int] = {}          # tier_id -> tier_number
+        self.tier_by_number: Dict[int, int] = {}       # tier_number -> tier_id
+        self.tier_modules: Dict[int, List[int]] = {}   # tier_id -> module ids in order
+        self.module_tier: Dict[int, int] = {}          # module_id -> tier_id
+        self.module_lessons: Dict[int, List[int]] = {} # module_id -> lesson ids in order
+        self.lesson_module: Dict[int, int] = {}        # lesson_id -> module_id
+        self.published_lesson_count = 0
+        self.published_module_count = 0
+
+        # Completion bitset layout: bit i is the i-th lesson in curriculum order
+        self.lesson_order: List[int] = []              # bit position -> lesson_id
+        self.lesson_bit: Dict[int, int] = {}           # lesson_id -> bit position
+        self.module_mask: Dict[int, int] = {}          # module_id -> mask of its lessons
+        self.published_mask = 0                        # Mask of published lessons
+
+        # Unlock index layout: bit i is the i-th module in dependency order
+        self.prerequisites = PrerequisiteGraph()
+        self.module_order: List[int] = []              # bit position -> module_id
+        self.module_bit: Dict[int, int] = {}           # module_id -> bit position
+        self.module_requires: Dict[int, int] = {}      # module_id -> lesson mask to complete before it opens
+        self.module_required_mask: Dict[int, int] = {} # module_id -> its lessons that count as requirements
+
+        self.layout = ""                               # Fingerprint of lesson_order, module_order and requirements
+
+    def next_tier_id(self, tier_id: int) -> Optional[int]:
+        """Tier unlocked by completing `tier_id`, if any"""
+        tier_number = self.tier_number.get(tier_id)
+        if tier_number is None:
+            return None
+        return self.tier_by_number.get(tier_number + 1)
+
+
+_tiers_adapter = TypeAdapter(List[TierSummaryResponse])
+
+
+def lesson_summary_loader(path):
+    """
+    Load options for lessons serialized as LessonSummaryResponse
+    Only navigation columns are selected; bodies and block content stay in the database.
+    """
+    return path.load_only(
+        Lesson.id, Lesson.module_id, Lesson.title, Lesson.description, Lesson.order,
+        Lesson.duration_minutes, Lesson.difficulty, Lesson.is_published, Lesson.challenge_id
+    ).selectinload(Lesson.content_blocks).load_only(
+        ContentBlock.id, ContentBlock.lesson_id, ContentBlock.type, ContentBlock.order
+    )
+
+_version: Optional[str] = None
+_checked_local_version: int = -1
+_checked_at: float = 0.0
+
+_topology: Optional[CurriculumTopology] = None
+_tiers_json: Optional[Tuple[str, bytes]] = None  # (version, serialized tier tree)
+
+
+class CurriculumCache:
+    """Keeps curriculum snapshots per worker, rebuilt when the curriculum version changes"""
+
+    @staticmethod
+    def version() -> str:
+        """
+        Current curriculum version
+
+        The shared version is checked at most every CURRICULUM_CACHE_CHECK_SECONDS;
+        changes committed in this worker are picked up immediately.
+        """
+        global _version, _checked_local_version, _checked_at
+
+        now = time.monotonic()
+        local_version = get_local_version(CURRICULUM_VERSION)
+        if _version is not None and now - _checked_at < settings.CURRICULUM_CACHE_CHECK_SECONDS \
+                and _checked_local_version == local_version:
+            return _version
+
+        _version = get_version(CURRICULUM_VERSION)
+        _checked_local_version = local_version
+        _checked_at = now
+        return _version
+
+    @staticmethod
+    def get(db: Session) -> CurriculumTopology:
+        """Current curriculum topology"""
+        global _topology
+
+        # The version is read before building so a change made mid-build triggers another rebuild
+        version = CurriculumCache.version()
+        if _topology is None or _topology.version != version:
+            _topology = CurriculumCache._build(db, version)
+        return _topology
+
+    @staticmethod
+    def get_tiers_json(db: Session) -> bytes:
+        """
+        Active tiers with their modules and lesson summaries as JSON
+
+        The tree is loaded with one selectin query per level (navigation
+        columns only) and serialized once per curriculum version, so
+        steady-state requests are a cache hit.
+        """
+        global _tiers_json
+
+        version = CurriculumCache.version()
+        if _tiers_json is not None and _tiers_json[0] == version:
+            return _tiers_json[1]
+
+        tiers = db.query(Tier).options(
+            lesson_summary_loader(selectinload(Tier.modules).selectinload(Module.lessons))
+        ).filter(Tier.is_active == True).order_by(Tier.order).all()
+        payload = _tiers_adapter.dump_json(_tiers_adapter.validate_python(tiers, from_attributes=True))
+
+        _tiers_json = (version, payload)
+        logger.info(f"Built curriculum tier tree v{version}: {len(payload)} bytes")
+        return payload
+
+    @staticmethod
+    def invalidate() -> None:
+        """Force a rebuild everywhere (for changes made outside the ORM, e.g. raw SQL)"""
+        bump_version(CURRICULUM_VERSION)
+
+    @staticmethod
+    def _build(db: Session, version: str) -> CurriculumTopology:
+        topology = CurriculumTopology(version)
+
+        for tier_id, tier_number in db.query(Tier.id, Tier.tier_number).all():
+            topology.tier_number[tier_id] = tier_number
+            topology.tier_by_number[tier_number] = tier_id
+            topology.tier_modules[tier_id] = []
+
+        module_rows = {}
+        published_modules = set()
+        for module_id, tier_id, is_published, title, prerequisites in db.query(
+            Module.id, Module.tier_id, Module.is_published, Module.title, Module.prerequisites
+        ).order_by(Module.order, Module.id).all():
+            module_rows[module_id] = (title, prerequisites)
+            topology.module_tier[module_id] = tier_id
+            topology.tier_modules.setdefault(tier_id, []).append(module_id)
+            topology.module_lessons[module_id] = []
+            if is_published:
+                topology.published_module_count += 1
+                published_modules.add(module_id)
+
+        published_lessons = set()
+        for lesson_id, module_id, is_published in db.query(
+            Lesson.id, Lesson.module_id, Lesson.is_published
+        ).order_by(Lesson.order, Lesson.id).all():
+            topology.lesson_module[lesson_id] = module_id
+            topology.module_lessons.setdefault(module_id, []).append(lesson_id)
+            if is_published:
+                topology.published_lesson_count += 1
+                published_lessons.add(lesson_id)
+
+        # Curriculum order: tier number, then module order, then lesson order
+        for tier_number in sorted(topology.tier_by_number):
+            for module_id in topology.tier_modules[topology.tier_by_number[tier_number]]:
+                mask = 0
+                for lesson_id in topology.module_lessons[module_id]:
+                    topology.lesson_bit[lesson_id] = len(topology.lesson_order)
+                    mask |= 1 << len(topology.lesson_order)
+                    if lesson_id in published_lessons:
+                        topology.published_mask |= 1 << len(topology.lesson_order)
+                    topology.lesson_order.append(lesson_id)
+                topology.module_mask[module_id] = mask
+                # Drafts never gate anything: only published lessons of published modules are required
+                topology.module_required_mask[module_id] = (
+                    mask & topology.published_mask if module_id in published_modules else 0
+                )
+
+        # Prerequisites: explicit module dependencies plus the previous tier
+        graph = PrerequisiteGraph.build(
+            (module_id, tier_number, *module_rows[module_id])
+            for tier_number in sorted(topology.tier_by_number)
+            for module_id in topology.tier_modules[topology.tier_by_number[tier_number]]
+        )
+        if graph.cycles:
+            logger.error(f"Ignoring prerequisites of modules on a cycle: {graph.cycles}")
+        tier_mask = {
+            tier_number: sum(topology.module_required_mask[m] for m in topology.tier_modules[tier_id])
+            for tier_number, tier_id in topology.tier_by_number.items()
+        }
+        topology.prerequisites = graph
+        topology.module_order = graph.order
+        for module_id in graph.order:
+            topology.module_bit[module_id] = len(topology.module_bit)
+            requires = tier_mask.get(graph.gate_tier[module_id], 0)
+            for prerequisite in graph.prerequisites[module_id]:
+                requires |= topology.module_required_mask[prerequisite]
+            topology.module_requires[module_id] = requires
+
+        topology.layout = hashlib.sha1("|".join([
+            ",".join(map(str, topology.lesson_order)),
+            ",".join(map(str, topology.module_order)),
+            ";".join(f"{m}:{graph.gate_tier[m]}:{graph.prerequisites[m]}" for m in topology.module_order),
+            ",".join(format(topology.module_requires[m], "x") for m in topology.module_order),
+        ]).encode()).hexdigest()
+
+        logger.info(
+            f"Built curriculum topology v{version}: {len(topology.tier_number)} tiers, "
+            f"{len(topology.module_tier)} modules, {len(topology.lesson_module)} lessons"
+        )
+        return topology
@@ -0,0 +1,58 @@
+"""
+Curriculum Sync
+Revisioned snapshots and deltas of the curriculum from the change log
+"""
+from typing import Any, Dict, List, Set
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.curriculum import CurriculumChange, CURRICULUM_ENTITIES
+
+# Response keys per change log entity type
+ENTITY_KEYS = {"tier": "tiers", "module": "modules", "lesson": "lessons", "content_block": "content_blocks"}
+
+
+class CurriculumSync:
+    """Builds full snapshots and since-revision deltas for client-side curriculum caches"""
+
+    @staticmethod
+    def current_revision(db: Session) -> int:
+        """Latest curriculum revision (0 before the first logged change)"""
+        return db.query(func.max(CurriculumChange.revision)).scalar() or 0
+
+    @staticmethod
+    def changes_since(db: Session, since: int) -> Dict[str, Any]:
+        """
+        Rows changed after revision `since`, and ids of rows deleted since then
+
+        A client with no revision (0) or one this database never issued
+        (e.g. after a restore) gets a full snapshot instead.
+        """
+        revision = CurriculumSync.current_revision(db)
+        result: Dict[str, Any] = {
+            "revision": revision,
+            "full": since <= 0 or since > revision,
+            "deleted": {key: [] for key in ENTITY_KEYS.values()},
+        }
+
+        if result["full"]:
+            for model, entity_type in CURRICULUM_ENTITIES.items():
+                result[ENTITY_KEYS[entity_type]] = db.query(model).order_by(model.id).all()
+            return result
+
+        changed: Dict[str, Set[int]] = {entity_type: set() for entity_type in ENTITY_KEYS}
+        for entity_type, entity_id in db.query(
+            CurriculumChange.entity_type, CurriculumChange.entity_id
+        ).filter(
+            CurriculumChange.revision > since,
+            CurriculumChange.revision <= revision
+        ).distinct():
+            changed[entity_type].add(entity_id)
+
+        # Logged rows that no longer exist were deleted
+        for model, entity_type in CURRICULUM_ENTITIES.items():
+            ids = changed[entity_type]
+            rows: List[Any] = db.query(model).filter(model.id.in_(ids)).order_by(model.id).all() if ids else []
+            result[ENTITY_KEYS[entity_type]] = rows
+            result["deleted"][ENTITY_KEYS[entity_type]] = sorted(ids - {row.id for row in rows})
+        return result
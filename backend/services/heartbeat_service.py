@@ -0,0 +1,207 @@
+"""
+Heartbeat Service
+Buffers time-on-task heartbeats and flushes them to LessonProgress in batches
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Tuple
+from sqlalchemy import update, bindparam
+from sqlalchemy.orm import Session
+
+import redis
+
+from config import settings
+from database.cache import get_redis, mark_redis_failed
+from database.connection import SessionLocal, dialect_insert
+from models.progress import LessonProgress, UserProgressSummary, mark_progress_changed
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "heartbeat:pending"     # hash "user_id:lesson_id" -> buffered seconds
+LAST_BEAT_KEY = "heartbeat:last:{}:{}"  # last heartbeat time per user and lesson
+FLUSH_BATCH_SIZE = 1000
+
+# Local buffer, used when Redis is unavailable
+_pending: Dict[Tuple[int, int], int] = defaultdict(int)
+_last_beat: Dict[Tuple[int, int], float] = {}
+
+
+def _credit(last_beat, now: float) -> int:
+    """Seconds to credit for a heartbeat; the first beat of a session only starts the clock"""
+    if last_beat is None:
+        return 0
+    return int(min(max(now - float(last_beat), 0), settings.HEARTBEAT_INTERVAL_SECONDS))
+
+
+class HeartbeatService:
+    """Coalesces heartbeats in Redis (or memory) so the database sees one write per flush"""
+
+    @staticmethod
+    def record(user_id: int, lesson_id: int) -> int:
+        """
+        Record a heartbeat for an open lesson
+
+        Clients beat every HEARTBEAT_INTERVAL_SECONDS; each beat credits the
+        time since the previous one, capped at the interval, so extra tabs or
+        fast clients cannot inflate the total and gaps are not counted.
+
+        Returns:
+            Seconds credited by this heartbeat
+        """
+        now = time.time()
+        expiry = settings.HEARTBEAT_INTERVAL_SECONDS * 4
+
+        client = get_redis()
+        if client is not None:
+            try:
+                last_key = LAST_BEAT_KEY.format(user_id, lesson_id)
+                pipe = client.pipeline()
+                pipe.getset(last_key, now)
+                pipe.expire(last_key, expiry)
+                last_beat, _ = pipe.execute()
+                seconds = _credit(last_beat, now)
+                if seconds:
+                    client.hincrby(PENDING_KEY, f"{user_id}:{lesson_id}", seconds)
+                return seconds
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+
+        key = (user_id, lesson_id)
+        last_beat = _last_beat.get(key)
+        _last_beat[key] = now
+        seconds = _credit(last_beat if last_beat and now - last_beat < expiry else None, now)
+        if seconds:
+            _pending[key] += seconds
+        return seconds
+
+    @staticmethod
+    def _take_pending() -> Dict[Tuple[int, int], int]:
+        """Atomically take everything buffered so far (Redis and local)"""
+        global _pending
+
+        taken, _pending = _pending, defaultdict(int)
+
+        # Forget sessions that stopped beating
+        cutoff = time.time() - settings.HEARTBEAT_INTERVAL_SECONDS * 4
+        for key in [k for k, t in _last_beat.items() if t < cutoff]:
+            del _last_beat[key]
+
+        client = get_redis()
+        if client is not None:
+            flushing_key = f"heartbeat:flushing:{uuid.uuid4().hex}"
+            try:
+                # RENAME is atomic: beats arriving now land in a fresh pending hash
+                client.rename(PENDING_KEY, flushing_key)
+            except redis.ResponseError:
+                return taken  # Nothing buffered in Redis
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+                return taken
+            try:
+                for field, seconds in client.hgetall(flushing_key).items():
+                    user_id, lesson_id = field.split(":")
+                    taken[(int(user_id), int(lesson_id))] += int(seconds)
+                client.delete(flushing_key)
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+
+        return taken
+
+    @staticmethod
+    def _carry_over(remainders: Dict[Tuple[int, int], int]) -> None:
+        """Return sub-minute remainders to the buffer for the next flush"""
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                for (user_id, lesson_id), seconds in remainders.items():
+                    pipe.hincrby(PENDING_KEY, f"{user_id}:{lesson_id}", seconds)
+                pipe.execute()
+                return
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+
+        for key, seconds in remainders.items():
+            _pending[key] += seconds
+
+    @staticmethod
+    def flush(db: Session) -> int:
+        """
+        Write buffered time to LessonProgress and the progress summaries
+
+        Whole minutes are added with one multi-row upsert per batch and one
+        executemany UPDATE of the summaries; leftover seconds stay buffered.
+
+        Returns:
+            Number of (user, lesson) rows updated
+        """
+        pending = HeartbeatService._take_pending()
+        if not pending:
+            return 0
+
+        rows = []
+        minutes_by_user: Dict[int, int] = defaultdict(int)
+        remainders = {}
+        for (user_id, lesson_id), seconds in pending.items():
+            minutes, remainder = divmod(seconds, 60)
+            if remainder:
+                remainders[(user_id, lesson_id)] = remainder
+            if minutes:
+                rows.append({"user_id": user_id, "lesson_id": lesson_id, "time_spent_minutes": minutes})
+                minutes_by_user[user_id] += minutes
+
+        try:
+            for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+                stmt = dialect_insert(db, LessonProgress).values(rows[i:i + FLUSH_BATCH_SIZE])
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=["user_id", "lesson_id"],
+                    set_={"time_spent_minutes": LessonProgress.time_spent_minutes + stmt.excluded.time_spent_minutes}
+                ))
+
+            if minutes_by_user:
+                mark_progress_changed(db, minutes_by_user)
+                summary = UserProgressSummary.__table__
+                db.execute(
+                    update(summary).where(summary.c.user_id == bindparam("summary_user_id")).values(
+                        total_time_minutes=summary.c.total_time_minutes + bindparam("minutes")
+                    ),
+                    [{"summary_user_id": uid, "minutes": m} for uid, m in minutes_by_user.items()]
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put everything back so the time is not lost
+            HeartbeatService._carry_over(pending)
+            raise
+
+        HeartbeatService._carry_over(remainders)
+        if rows:
+            logger.info(f"Flushed {sum(minutes_by_user.values())} minutes of time-on-task for {len(rows)} lessons")
+        return len(rows)
+
+    @staticmethod
+    async def run_flush_loop() -> None:
+        """Flush buffered heartbeats every HEARTBEAT_FLUSH_SECONDS until cancelled"""
+        def flush_once():
+            db = SessionLocal()
+            try:
+                HeartbeatService.flush(db)
+            finally:
+                db.close()
+
+        try:
+            while True:
+                await asyncio.sleep(settings.HEARTBEAT_FLUSH_SECONDS)
+                try:
+                    await asyncio.to_thread(flush_once)
+                except Exception as e:
+                    logger.error(f"Heartbeat flush failed: {str(e)}")
+        finally:
+            # Final flush on shutdown
+            try:
+                await asyncio.to_thread(flush_once)
+            except Exception as e:
+                logger.error(f"Final heartbeat flush failed: {str(e)}")
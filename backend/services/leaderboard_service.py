@@ -0,0 +1,310 @@
+"""
+Leaderboard Service
+Combined scores (challenge + lesson + module points) in a Redis sorted set,
+updated when scoring transactions commit and rebuilt from SQL on demand
+"""
+import bisect
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.cache import get_redis, mark_redis_failed, bump_version
+from models.user import User
+from models.progress import UserProgressSummary
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "leaderboard:global"        # sorted set user_id -> total_points
+LEADERBOARD_READY_KEY = "leaderboard:ready"   # Set once the sorted set holds every user
+LEADERBOARD_LOCK_KEY = "leaderboard:rebuilding"
+REBUILD_BATCH_SIZE = 5000
+
+# Cache version bumped whenever committed scores change
+SCORE_VERSION = "scores"
+
+
+class LocalSortedSets:
+    """
+    In-process stand-in for the Redis sorted-set commands the leaderboard uses
+
+    Used for tests and single-worker development, and when Redis is
+    unreachable. Members are kept in a list sorted by (-score, member), so
+    ranks are a binary search; inserts shift the list, which is fine at the
+    sizes a single process serves.
+    """
+
+    def __init__(self):
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._order: Dict[str, List[Tuple[float, str]]] = {}
+        self._values: Dict[str, str] = {}
+
+    def _remove(self, key: str, member: str) -> None:
+        score = self._scores[key].pop(member)
+        order = self._order[key]
+        del order[bisect.bisect_left(order, (-score, member))]
+
+    def zadd(self, key: str, mapping: Dict[Any, float], gt: bool = False) -> int:
+        """Set members' scores; with gt, existing members are only ever raised (as ZADD GT)"""
+        scores = self._scores.setdefault(key, {})
+        order = self._order.setdefault(key, [])
+        added = 0
+        for member, score in mapping.items():
+            member = str(member)
+            if member in scores:
+                if gt and float(score) <= scores[member]:
+                    continue
+                self._remove(key, member)
+            else:
+                added += 1
+            scores[member] = float(score)
+            bisect.insort(order, (-float(score), member))
+        return added
+
+    def zrem(self, key: str, *members: Any) -> int:
+        removed = 0
+        for member in map(str, members):
+            if member in self._scores.get(key, {}):
+                self._remove(key, member)
+                removed += 1
+        return removed
+
+    def zscore(self, key: str, member: Any) -> Optional[float]:
+        return self._scores.get(key, {}).get(str(member))
+
+    def zrevrank(self, key: str, member: Any) -> Optional[int]:
+        score = self.zscore(key, member)
+        if score is None:
+            return None
+        return bisect.bisect_left(self._order[key], (-score, str(member)))
+
+    def zrevrange(self, key: str, start: int, end: int, withscores: bool = False) -> list:
+        order = self._order.get(key, [])
+        stop = len(order) if end == -1 else end + 1
+        entries = order[max(start, 0):stop]
+        if withscores:
+            return [(member, -score) for score, member in entries]
+        return [member for _, member in entries]
+
+    def zcount(self, key: str, min: str, max: str) -> int:
+        """Members scoring above an exclusive lower bound "(x" (max is always +inf here)"""
+        return bisect.bisect_left(self._order.get(key, []), (-float(min.lstrip("(")), ""))
+
+    def zcard(self, key: str) -> int:
+        return len(self._scores.get(key, {}))
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    def set(self, key: str, value: Any, **kwargs) -> bool:
+        if kwargs.get("nx") and key in self._values:
+            return False
+        self._values[key] = str(value)
+        return True
+
+    def rename(self, source: str, target: str) -> None:
+        self._scores[target] = self._scores.pop(source, {})
+        self._order[target] = self._order.pop(source, [])
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._scores.pop(key, None)
+            self._order.pop(key, None)
+            self._values.pop(key, None)
+
+
+# Local sorted sets, used when Redis is unavailable; reseeded from SQL
+# every LEADERBOARD_LOCAL_REFRESH_SECONDS since they miss other workers' writes
+_local = LocalSortedSets()
+_local_loaded_at: Optional[float] = None
+
+
+def _rank_entries(store, start: int, end: int) -> List[Tuple[int, int, int]]:
+    """
+    (rank, user_id, score) for sorted-set positions start..end
+
+    Ranks are competition ranks (1, 2, 2, 4): tied users share a rank,
+    whatever order the store lists them in.
+    """
+    entries = store.zrevrange(LEADERBOARD_KEY, start, end, withscores=True)
+    result = []
+    previous_score, rank = None, 0
+    for position, (member, score) in enumerate(entries, start=start):
+        score = int(score)
+        if score != previous_score:
+            rank = store.zcount(LEADERBOARD_KEY, f"({score}", "+inf") + 1 if previous_score is None else position + 1
+            previous_score = score
+        result.append((rank, int(member), score))
+    return result
+
+
+class LeaderboardService:
+    """Ranks users by total_points in O(log n) per lookup"""
+
+    @staticmethod
+    def stage_scores(db: Session, scores: Dict[int, int]) -> None:
+        """Queue users' new total_points; they are published when the transaction commits"""
+        db.info.setdefault("leaderboard_scores", {}).update(scores)
+
+    @staticmethod
+    def _write(apply: Callable[[Any], Any]) -> None:
+        """Apply a write to Redis, or to the local sets when Redis is down and they are loaded"""
+        client = get_redis()
+        if client is not None:
+            try:
+                apply(client)
+                return
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+        if _local_loaded_at is not None:
+            apply(_local)
+
+    @staticmethod
+    def publish(scores: Dict[int, int]) -> None:
+        """
+        Set users' scores in the sorted set
+
+        Scores only grow, so a score is never lowered: a publish that lands
+        after a later one (commits racing across workers) cannot leave a
+        stale score behind. New users are added at their score.
+        """
+        if scores:
+            LeaderboardService._write(lambda store: store.zadd(LEADERBOARD_KEY, scores, gt=True))
+
+    @staticmethod
+    def _load_scores(db: Session) -> Iterable[Tuple[int, int]]:
+        """Every user's total_points from SQL; users without a summary score zero"""
+        return db.query(
+            User.id, func.coalesce(UserProgressSummary.total_points, 0)
+        ).outerjoin(UserProgressSummary, User.id == UserProgressSummary.user_id).yield_per(REBUILD_BATCH_SIZE)
+
+    @staticmethod
+    def _fill(store, db: Session) -> int:
+        """Build the sorted set under a temporary key and swap it in"""
+        building_key = f"leaderboard:building:{uuid.uuid4().hex}"
+        count = 0
+        batch: Dict[int, int] = {}
+        for user_id, points in LeaderboardService._load_scores(db):
+            batch[user_id] = int(points)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                store.zadd(building_key, batch)
+                count += len(batch)
+                batch = {}
+        if batch:
+            store.zadd(building_key, batch)
+            count += len(batch)
+
+        if count:
+            store.rename(building_key, LEADERBOARD_KEY)
+        else:
+            store.delete(LEADERBOARD_KEY)
+        store.set(LEADERBOARD_READY_KEY, 1)
+        return count
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Rebuild the leaderboard from user_progress_summary
+
+        Scores committed while the rebuild runs may be overwritten by the
+        snapshot; they are corrected on the user's next score change or
+        the next rebuild.
+
+        Returns:
+            Number of users ranked
+        """
+        bump_version(SCORE_VERSION)
+        client = get_redis()
+        if client is not None:
+            try:
+                count = LeaderboardService._fill(client, db)
+                logger.info(f"Rebuilt leaderboard with {count} users")
+                return count
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+
+        return LeaderboardService.rebuild_local(db)
+
+    @staticmethod
+    def _read(db: Session, query: Callable[[Any], Any]) -> Any:
+        """Run a read against a fully built sorted set, building it first if needed"""
+        client = get_redis()
+        if client is not None:
+            try:
+                if not client.get(LEADERBOARD_READY_KEY):
+                    # One worker rebuilds; the others serve from SQL-seeded local sets meanwhile
+                    if client.set(LEADERBOARD_LOCK_KEY, 1, nx=True, ex=60):
+                        try:
+                            LeaderboardService._fill(client, db)
+                        finally:
+                            client.delete(LEADERBOARD_LOCK_KEY)
+                if client.get(LEADERBOARD_READY_KEY):
+                    return query(client)
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+
+        if _local_loaded_at is None or time.monotonic() - _local_loaded_at >= settings.LEADERBOARD_LOCAL_REFRESH_SECONDS:
+            LeaderboardService.rebuild_local(db)
+        return query(_local)
+
+    @staticmethod
+    def rebuild_local(db: Session) -> int:
+        """Reseed this worker's local sorted sets from SQL"""
+        global _local_loaded_at
+        count = LeaderboardService._fill(_local, db)
+        _local_loaded_at = time.monotonic()
+        return count
+
+    @staticmethod
+    def page(db: Session, offset: int = 0, limit: int = 100) -> List[Tuple[int, int, int]]:
+        """(rank, user_id, score) for leaderboard positions offset..offset+limit-1"""
+        if limit <= 0:
+            return []
+        return LeaderboardService._read(db, lambda store: _rank_entries(store, offset, offset + limit - 1))
+
+    @staticmethod
+    def around(
+        user_id: int, db: Session, radius: int = 5
+    ) -> Tuple[Optional[int], List[Tuple[int, int, int]]]:
+        """
+        A user's rank and the entries `radius` positions either side of them
+
+        Returns:
+            (rank, entries); rank is None if the user is not on the leaderboard
+        """
+        def query(store):
+            position = store.zrevrank(LEADERBOARD_KEY, user_id)
+            if position is None:
+                return None, []
+            entries = _rank_entries(store, max(position - radius, 0), position + radius)
+            rank = next(rank for rank, member, _ in entries if member == user_id)
+            return rank, entries
+
+        return LeaderboardService._read(db, query)
+
+    @staticmethod
+    def size(db: Session) -> int:
+        return LeaderboardService._read(db, lambda store: store.zcard(LEADERBOARD_KEY))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_leaderboard_scores(session):
+    """Publish scores staged in this transaction once they are committed"""
+    if session.in_nested_transaction():
+        return  # Savepoint released; wait for the outer commit
+    scores = session.info.pop("leaderboard_scores", None)
+    if scores:
+        LeaderboardService.publish(scores)
+        bump_version(SCORE_VERSION)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_leaderboard_scores(session):
+    if session.in_nested_transaction():
+        return  # Savepoint rolled back; marks still apply to the outer transaction
+    session.info.pop("leaderboard_scores", None)
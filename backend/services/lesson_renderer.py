@@ -0,0 +1,161 @@
+"""
+Lesson Renderer
+Renders lesson markdown and content blocks to sanitized HTML, cached by source hash
+"""
+import hashlib
+import html
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+import bleach
+import markdown
+from sqlalchemy.orm import Session, selectinload
+
+from database.connection import dialect_insert
+from models.curriculum import Lesson, LessonHtml, ContentType
+
+logger = logging.getLogger(__name__)
+
+# Bump to re-render every lesson after changing the pipeline below
+RENDERER_VERSION = "1"
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "sane_lists"]
+
+ALLOWED_TAGS = bleach.sanitizer.ALLOWED_TAGS | {
+    "p", "br", "hr", "pre", "span", "div", "img", "video",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+    "table", "thead", "tbody", "tr", "th", "td",
+}
+ALLOWED_ATTRIBUTES = {
+    **bleach.sanitizer.ALLOWED_ATTRIBUTES,
+    "code": ["class"],
+    "div": ["class", "data-block-id"],
+    "img": ["src", "alt", "title"],
+    "video": ["src", "controls", "preload"],
+    "th": ["align"],
+    "td": ["align"],
+}
+ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
+
+
+class LessonRenderer:
+    """Turns lesson source into HTML once per distinct source"""
+
+    @staticmethod
+    def source_hash(lesson: Lesson) -> str:
+        """Hash of everything that affects the rendered HTML"""
+        digest = hashlib.sha256(RENDERER_VERSION.encode())
+        digest.update((lesson.content_markdown or "").encode())
+        for block in lesson.content_blocks:
+            for part in (block.id, block.type, block.order, block.text_content,
+                         block.code_content, block.code_language, block.media_url):
+                digest.update(b"\x00" + str(part if part is not None else "").encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _render_block(block) -> str:
+        block_type = ContentType(block.type)
+        attrs = f'class="lesson-block lesson-{block_type.value}" data-block-id="{block.id}"'
+
+        if block_type == ContentType.TEXT:
+            body = markdown.markdown(block.text_content or "", extensions=MARKDOWN_EXTENSIONS)
+        elif block_type == ContentType.CODE:
+            language = re.sub(r"[^A-Za-z0-9_+#-]", "", block.code_language or "") or "text"
+            body = f'<pre><code class="language-{language}">{html.escape(block.code_content or "")}</code></pre>'
+        elif block_type == ContentType.IMAGE:
+            body = f'<img src="{html.escape(block.media_url or "", quote=True)}" alt="">'
+        elif block_type == ContentType.VIDEO:
+            body = f'<video src="{html.escape(block.media_url or "", quote=True)}" controls preload="metadata"></video>'
+        else:
+            # Quizzes are interactive; the client mounts them on this placeholder
+            body = ""
+        return f"<div {attrs}>{body}</div>"
+
+    @staticmethod
+    def render(lesson: Lesson) -> str:
+        """Sanitized HTML for a lesson's markdown followed by its blocks"""
+        parts = [markdown.markdown(lesson.content_markdown or "", extensions=MARKDOWN_EXTENSIONS)]
+        parts.extend(LessonRenderer._render_block(block) for block in lesson.content_blocks)
+        return bleach.clean(
+            "\n".join(parts),
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            protocols=ALLOWED_PROTOCOLS,
+            strip=True
+        )
+
+    @staticmethod
+    def get_cached(lesson_id: int, source_hash: str, db: Session) -> Optional[str]:
+        """Stored HTML for a lesson if it was rendered from exactly this source"""
+        return db.query(LessonHtml.html).filter(
+            LessonHtml.lesson_id == lesson_id,
+            LessonHtml.source_hash == source_hash
+        ).scalar()
+
+    @staticmethod
+    def _store(db: Session, rows: List[Dict]) -> None:
+        stmt = dialect_insert(db, LessonHtml).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["lesson_id"],
+            set_={"source_hash": stmt.excluded.source_hash, "html": stmt.excluded.html}
+        ))
+
+    @staticmethod
+    def get_html(lesson: Lesson, db: Session) -> Tuple[str, str]:
+        """
+        (source_hash, html) for a lesson, rendering only if the source changed
+
+        Args:
+            lesson: Lesson with content_blocks loaded
+            db: Database session
+
+        Returns:
+            Hash of the source and the sanitized HTML (caller commits)
+        """
+        source_hash = LessonRenderer.source_hash(lesson)
+        cached = LessonRenderer.get_cached(lesson.id, source_hash, db)
+        if cached is not None:
+            return source_hash, cached
+
+        rendered = LessonRenderer.render(lesson)
+        LessonRenderer._store(db, [{"lesson_id": lesson.id, "source_hash": source_hash, "html": rendered}])
+        return source_hash, rendered
+
+    @staticmethod
+    def prerender_all(db: Session, batch_size: int = 100) -> Tuple[int, int]:
+        """
+        Render every lesson whose source changed since it was last rendered
+
+        Args:
+            db: Database session
+            batch_size: Lessons loaded and written per transaction
+
+        Returns:
+            (rendered, unchanged) lesson counts
+        """
+        stored = dict(db.query(LessonHtml.lesson_id, LessonHtml.source_hash).all())
+        lesson_ids = [lesson_id for (lesson_id,) in db.query(Lesson.id).order_by(Lesson.id)]
+
+        rendered = unchanged = 0
+        for i in range(0, len(lesson_ids), batch_size):
+            lessons = db.query(Lesson).options(selectinload(Lesson.content_blocks)).filter(
+                Lesson.id.in_(lesson_ids[i:i + batch_size])
+            ).all()
+
+            rows = []
+            for lesson in lessons:
+                source_hash = LessonRenderer.source_hash(lesson)
+                if stored.get(lesson.id) == source_hash:
+                    unchanged += 1
+                    continue
+                rows.append({"lesson_id": lesson.id, "source_hash": source_hash, "html": LessonRenderer.render(lesson)})
+
+            if rows:
+                LessonRenderer._store(db, rows)
+                rendered += len(rows)
+            db.commit()
+            db.expunge_all()
+
+        logger.info(f"Pre-rendered {rendered} lessons ({unchanged} unchanged)")
+        return rendered, unchanged
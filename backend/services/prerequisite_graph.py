@@ -0,0 +1,152 @@
+"""
+Module Prerequisite Graph
+Parses Module.prerequisites into a dependency DAG, validated and topologically ordered
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# (module_id, tier_number, title, prerequisites), in curriculum order
+ModuleRow = Tuple[int, int, str, Optional[str]]
+
+
+class PrerequisiteGraph:
+    """
+    Module dependencies: explicit prerequisites plus the tier gate
+
+    `prerequisites` is a comma-separated list of module ids or titles;
+    entries that name no module are treated as description text. Every
+    module also depends on the whole previous tier (tier N opens once
+    tier N-1 is complete). Explicit prerequisites of modules on a cycle
+    are dropped so the content stays reachable, and reported in `cycles`.
+    """
+
+    def __init__(self):
+        self.prerequisites: Dict[int, List[int]] = {}  # module_id -> explicit prerequisite module ids
+        self.gate_tier: Dict[int, Optional[int]] = {}   # module_id -> tier_number that must be complete first
+        self.dependents: Dict[int, List[int]] = {}      # module_id -> modules whose requirements include it
+        self.order: List[int] = []                      # Modules in dependency order
+        self.unresolved: Dict[int, List[str]] = {}      # module_id -> entries naming no module
+        self.cycles: List[int] = []                     # Modules on a prerequisite cycle
+
+    @staticmethod
+    def parse(text: Optional[str], by_id: Dict[int, int], by_title: Dict[str, int]) -> Tuple[List[int], List[str]]:
+        """Split a prerequisites field into (module ids, unresolved entries)"""
+        ids, unresolved = [], []
+        for entry in (text or "").split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            module_id = by_id.get(int(entry)) if entry.isdigit() else by_title.get(entry.lower())
+            if module_id is None:
+                unresolved.append(entry)
+            elif module_id not in ids:
+                ids.append(module_id)
+        return ids, unresolved
+
+    @staticmethod
+    def build(modules: Iterable[ModuleRow]) -> "PrerequisiteGraph":
+        graph = PrerequisiteGraph()
+        rows = list(modules)
+        position = {module_id: i for i, (module_id, _, _, _) in enumerate(rows)}
+        by_id = {module_id: module_id for module_id in position}
+        by_title: Dict[str, int] = {}
+        tier_modules: Dict[int, List[int]] = {}
+        for module_id, tier_number, title, _ in rows:
+            by_title.setdefault(title.lower(), module_id)
+            tier_modules.setdefault(tier_number, []).append(module_id)
+
+        tier_of = {module_id: tier_number for module_id, tier_number, _, _ in rows}
+        for module_id, tier_number, _, text in rows:
+            ids, unresolved = PrerequisiteGraph.parse(text, by_id, by_title)
+            graph.prerequisites[module_id] = [p for p in ids if p != module_id]
+            graph.gate_tier[module_id] = tier_number - 1 if tier_number - 1 in tier_modules else None
+            if unresolved:
+                graph.unresolved[module_id] = unresolved
+
+        order, blocked = graph._sort(position, tier_modules, tier_of)
+        if blocked:
+            graph.cycles = sorted((m for m in blocked if not isinstance(m, tuple)), key=position.get)
+            for module_id in graph.cycles:
+                graph.prerequisites[module_id] = []
+            order, _ = graph._sort(position, tier_modules, tier_of)
+        graph.order = order
+
+        for module_id in position:
+            graph.dependents[module_id] = []
+        for module_id in order:
+            for prerequisite in graph.prerequisites[module_id]:
+                graph.dependents[prerequisite].append(module_id)
+            gate = graph.gate_tier[module_id]
+            if gate is not None:
+                for prerequisite in tier_modules[gate]:
+                    if module_id not in graph.dependents[prerequisite]:
+                        graph.dependents[prerequisite].append(module_id)
+        return graph
+
+    def _sort(
+        self, position: Dict[int, int], tier_modules: Dict[int, List[int]], tier_of: Dict[int, int]
+    ) -> Tuple[List[int], Set[object]]:
+        """
+        Kahn's algorithm, ties broken by curriculum position
+
+        Each tier gate is a virtual node between the modules of one tier and
+        the next, so the gate costs O(modules) edges instead of O(modules^2).
+
+        Returns:
+            (sorted modules, nodes on or between cycles)
+        """
+        gates = {tier_number: ("gate", tier_number) for tier_number in tier_modules}
+        successors: Dict[object, List[object]] = {}
+        indegree: Dict[object, int] = {node: 0 for node in list(position) + list(gates.values())}
+
+        def edge(source, target):
+            successors.setdefault(source, []).append(target)
+            indegree[target] += 1
+
+        for module_id in position:
+            for prerequisite in self.prerequisites[module_id]:
+                edge(prerequisite, module_id)
+            gate = self.gate_tier[module_id]
+            if gate is not None:
+                edge(gates[tier_of[module_id]], module_id)
+        for tier_number, module_ids in tier_modules.items():
+            if tier_number + 1 in tier_modules:
+                for module_id in module_ids:
+                    edge(module_id, gates[tier_number + 1])
+
+        def key(node):
+            # Gates sort before the first module of their tier
+            if isinstance(node, tuple):
+                return (position[tier_modules[node[1]][0]], 0)
+            return (position[node], 1)
+
+        ready = [(key(node), node) for node, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, node = heapq.heappop(ready)
+            if not isinstance(node, tuple):
+                order.append(node)
+            for successor in successors.get(node, []):
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    heapq.heappush(ready, (key(successor), successor))
+
+        # Unsorted nodes are on a cycle or downstream of one; trim the
+        # downstream ones (nothing unsorted depends on them) to keep the cycles
+        blocked = {node for node, degree in indegree.items() if degree > 0}
+        trimmed = True
+        while trimmed:
+            trimmed = False
+            for node in list(blocked):
+                if not any(successor in blocked for successor in successors.get(node, [])):
+                    blocked.discard(node)
+                    trimmed = True
+        return order, blocked
+
+    def errors(self, titles: Dict[int, str]) -> List[str]:
+        """Human-readable problems, for loaders and checks"""
+        return [
+            f"Prerequisite cycle through module {module_id} ({titles.get(module_id, '?')})"
+            for module_id in self.cycles
+        ]
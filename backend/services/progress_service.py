@@ -0,0 +1,429 @@
+"""
+Progress Service
+Set-based aggregation of student progress and the per-user summary read model
+"""
+import logging
+from typing import Dict, Any, List, Iterable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, and_, update, select
+from sqlalchemy.exc import IntegrityError
+
+from models.progress import (
+    LessonProgress, ModuleProgress, TierProgress, Achievement, UserAchievement, UserProgressSummary,
+    mark_progress_changed
+)
+from models.curriculum import Tier, Module, Lesson
+from models.challenge import ChallengeSubmission, Leaderboard
+from models.user import User
+from services.leaderboard_service import LeaderboardService
+
+logger = logging.getLogger(__name__)
+
+
+# Additive counters kept on UserProgressSummary and maintained by the write paths
+SUMMARY_COUNTERS = (
+    "lessons_completed", "modules_completed", "challenges_solved", "challenge_points", "total_time_minutes"
+)
+SUMMARY_FIELDS = SUMMARY_COUNTERS + ("total_points", "current_tier")
+
+# Points awarded per completed lesson / module (challenge points come from scoring)
+LESSON_POINTS = 10
+MODULE_POINTS = 50
+
+
+def _total_points(lessons_completed: int, modules_completed: int, challenge_points: int) -> int:
+    return challenge_points + lessons_completed * LESSON_POINTS + modules_completed * MODULE_POINTS
+
+
+class ProgressService:
+    """Builds per-user progress views with a fixed number of grouped queries"""
+
+    @staticmethod
+    def compute_counters(user_id: int, db: Session) -> Dict[str, int]:
+        """Recompute a user's summary fields from the raw progress rows in one query"""
+        lessons = db.query(func.count(LessonProgress.id)).filter(
+            LessonProgress.user_id == user_id,
+            LessonProgress.is_completed == True
+        ).scalar_subquery()
+        modules = db.query(func.count(ModuleProgress.id)).filter(
+            ModuleProgress.user_id == user_id,
+            ModuleProgress.is_completed == True
+        ).scalar_subquery()
+        challenges = db.query(func.count(func.distinct(ChallengeSubmission.challenge_id))).filter(
+            ChallengeSubmission.user_id == user_id,
+            ChallengeSubmission.is_correct == True
+        ).scalar_subquery()
+        challenge_points = db.query(Leaderboard.total_points).filter(
+            Leaderboard.user_id == user_id
+        ).scalar_subquery()
+        minutes = db.query(func.sum(LessonProgress.time_spent_minutes)).filter(
+            LessonProgress.user_id == user_id
+        ).scalar_subquery()
+        current_tier = db.query(func.max(Tier.tier_number)).join(
+            TierProgress, TierProgress.tier_id == Tier.id
+        ).filter(
+            TierProgress.user_id == user_id,
+            TierProgress.is_unlocked == True
+        ).scalar_subquery()
+
+        row = db.query(lessons, modules, challenges, challenge_points, minutes, current_tier).one()
+        values = dict(zip(SUMMARY_COUNTERS + ("current_tier",), (int(v or 0) for v in row)))
+        values["total_points"] = _total_points(
+            values["lessons_completed"], values["modules_completed"], values["challenge_points"]
+        )
+        return values
+
+    @staticmethod
+    def _apply(user_id: int, db: Session, values: Dict[Any, Any]) -> Dict[str, int]:
+        """
+        Apply a single UPDATE ... RETURNING to the user's summary row
+
+        The first write for a user seeds the row from the raw progress tables,
+        which already include the change being recorded. Does not commit.
+        """
+        columns = [getattr(UserProgressSummary, name) for name in SUMMARY_FIELDS]
+        stmt = update(UserProgressSummary).where(
+            UserProgressSummary.user_id == user_id
+        ).values(values).returning(*columns).execution_options(synchronize_session=False)
+
+        mark_progress_changed(db, [user_id])
+        row = db.execute(stmt).first()
+        if row is None:
+            db.flush()
+            summary = ProgressService.compute_counters(user_id, db)
+            try:
+                with db.begin_nested():
+                    db.add(UserProgressSummary(user_id=user_id, **summary))
+            except IntegrityError:
+                # Another request seeded the row first; apply our change on top of it
+                row = db.execute(stmt).first()
+
+        if row is not None:
+            summary = dict(zip(SUMMARY_FIELDS, row))
+        LeaderboardService.stage_scores(db, {user_id: summary["total_points"]})
+        return summary
+
+    @staticmethod
+    def _recount(name: str, user_id: int):
+        """Correlated subquery recounting one summary counter from the raw rows"""
+        if name == "lessons_completed":
+            return select(func.count(LessonProgress.id)).where(
+                LessonProgress.user_id == user_id,
+                LessonProgress.is_completed == True
+            ).scalar_subquery()
+        if name == "modules_completed":
+            return select(func.count(ModuleProgress.id)).where(
+                ModuleProgress.user_id == user_id,
+                ModuleProgress.is_completed == True
+            ).scalar_subquery()
+        if name == "total_time_minutes":
+            return select(func.coalesce(func.sum(LessonProgress.time_spent_minutes), 0)).where(
+                LessonProgress.user_id == user_id
+            ).scalar_subquery()
+        raise ValueError(f"Counter {name} cannot be recounted")
+
+    @staticmethod
+    def increment_counters(
+        user_id: int,
+        db: Session,
+        recount: Iterable[str] = (),
+        current_tier: Optional[int] = None,
+        **deltas: int
+    ) -> Dict[str, int]:
+        """
+        Atomically update a user's summary counters and return the new values
+
+        Everything happens in one UPDATE ... RETURNING: counters are bumped by
+        a delta or recounted from the raw rows, the current tier only ever
+        moves up, and total_points is derived from the new values. Does not commit.
+
+        Args:
+            user_id: ID of the user
+            db: Database session
+            recount: Counters to recount instead of bump (e.g. modules_completed)
+            current_tier: Newly unlocked tier number, if any
+            **deltas: Counter name to increment, e.g. lessons_completed=1
+
+        Returns:
+            Dict of summary field to current value
+        """
+        new_values = {
+            name: getattr(UserProgressSummary, name) + delta for name, delta in deltas.items()
+        }
+        for name in recount:
+            new_values[name] = ProgressService._recount(name, user_id)
+        if current_tier is not None:
+            new_values["current_tier"] = case(
+                (UserProgressSummary.current_tier < current_tier, current_tier),
+                else_=UserProgressSummary.current_tier
+            )
+
+        if new_values.keys() & {"lessons_completed", "modules_completed", "challenge_points"}:
+            new_values["total_points"] = _total_points(*(
+                new_values.get(name, getattr(UserProgressSummary, name))
+                for name in ("lessons_completed", "modules_completed", "challenge_points")
+            ))
+
+        return ProgressService._apply(user_id, db, {
+            getattr(UserProgressSummary, name): value for name, value in new_values.items()
+        })
+
+    @staticmethod
+    def get_summary(user_id: int, db: Session) -> UserProgressSummary:
+        """
+        Primary-key lookup of a user's progress summary
+
+        Read-only. A user without a row (no progress written since the table
+        was added) gets a transient summary computed from the raw tables;
+        the row itself is created by their first progress write or by
+        scripts/rebuild_progress_summary.py.
+        """
+        summary = db.get(UserProgressSummary, user_id)
+        if summary is not None:
+            return summary
+        return UserProgressSummary(user_id=user_id, **ProgressService.compute_counters(user_id, db))
+
+    @staticmethod
+    def rebuild_all(db: Session) -> int:
+        """
+        Recompute every user's summary from the raw progress tables
+
+        Used for backfill and drift repair. Runs one grouped query per source
+        table and writes all rows in a single transaction.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of summary rows that were created or corrected
+        """
+        fresh: Dict[int, Dict[str, int]] = {
+            user_id: {name: 0 for name in SUMMARY_FIELDS} for (user_id,) in db.query(User.id)
+        }
+
+        for user_id, completed, minutes in db.query(
+            LessonProgress.user_id,
+            func.count(case((LessonProgress.is_completed == True, LessonProgress.id))),
+            func.sum(LessonProgress.time_spent_minutes)
+        ).group_by(LessonProgress.user_id):
+            if user_id in fresh:
+                fresh[user_id]["lessons_completed"] = int(completed or 0)
+                fresh[user_id]["total_time_minutes"] = int(minutes or 0)
+
+        for user_id, completed in db.query(
+            ModuleProgress.user_id, func.count(ModuleProgress.id)
+        ).filter(ModuleProgress.is_completed == True).group_by(ModuleProgress.user_id):
+            if user_id in fresh:
+                fresh[user_id]["modules_completed"] = int(completed)
+
+        for user_id, solved in db.query(
+            ChallengeSubmission.user_id, func.count(func.distinct(ChallengeSubmission.challenge_id))
+        ).filter(ChallengeSubmission.is_correct == True).group_by(ChallengeSubmission.user_id):
+            if user_id in fresh:
+                fresh[user_id]["challenges_solved"] = int(solved)
+
+        for user_id, points in db.query(Leaderboard.user_id, Leaderboard.total_points):
+            if user_id in fresh:
+                fresh[user_id]["challenge_points"] = int(points or 0)
+
+        for user_id, tier_number in db.query(
+            TierProgress.user_id, func.max(Tier.tier_number)
+        ).join(Tier, Tier.id == TierProgress.tier_id).filter(
+            TierProgress.is_unlocked == True
+        ).group_by(TierProgress.user_id):
+            if user_id in fresh:
+                fresh[user_id]["current_tier"] = int(tier_number or 0)
+
+        existing = {s.user_id: s for s in db.query(UserProgressSummary).all()}
+        changed = 0
+        for user_id, values in fresh.items():
+            values["total_points"] = _total_points(
+                values["lessons_completed"], values["modules_completed"], values["challenge_points"]
+            )
+            summary = existing.get(user_id)
+            if summary is None:
+                db.add(UserProgressSummary(user_id=user_id, **values))
+                changed += 1
+            elif any(getattr(summary, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(summary, name, value)
+                changed += 1
+
+        db.commit()
+        logger.info(f"Rebuilt progress summaries for {len(fresh)} users ({changed} changed)")
+        LeaderboardService.rebuild(db)
+        return changed
+
+    @staticmethod
+    def get_module_breakdown(user_id: int, db: Session) -> List[Dict[str, Any]]:
+        """
+        Per-module progress for a user in a single joined query
+
+        Args:
+            user_id: ID of the user
+            db: Database session
+
+        Returns:
+            List of module progress dicts ordered by module id
+        """
+        # Lessons per module (curriculum shape, independent of the user)
+        lesson_totals = db.query(
+            Lesson.module_id.label("module_id"),
+            func.count(Lesson.id).label("total_lessons")
+        ).group_by(Lesson.module_id).subquery()
+
+        # The user's completed lessons and time, rolled up per module
+        user_lessons = db.query(
+            Lesson.module_id.label("module_id"),
+            func.count(case((LessonProgress.is_completed == True, LessonProgress.id))).label("lessons_completed"),
+            func.coalesce(func.sum(LessonProgress.time_spent_minutes), 0).label("time_spent_minutes")
+        ).join(
+            Lesson, Lesson.id == LessonProgress.lesson_id
+        ).filter(
+            LessonProgress.user_id == user_id
+        ).group_by(Lesson.module_id).subquery()
+
+        rows = db.query(
+            Module.id,
+            Module.title,
+            ModuleProgress.completion_percentage,
+            ModuleProgress.is_completed,
+            func.coalesce(lesson_totals.c.total_lessons, 0),
+            func.coalesce(user_lessons.c.lessons_completed, 0),
+            func.coalesce(user_lessons.c.time_spent_minutes, 0)
+        ).outerjoin(
+            ModuleProgress, and_(
+                ModuleProgress.module_id == Module.id,
+                ModuleProgress.user_id == user_id
+            )
+        ).outerjoin(
+            lesson_totals, lesson_totals.c.module_id == Module.id
+        ).outerjoin(
+            user_lessons, user_lessons.c.module_id == Module.id
+        ).order_by(Module.id).all()
+
+        modules: Dict[int, Dict[str, Any]] = {}
+        for module_id, title, percentage, is_completed, total, completed, minutes in rows:
+            # Duplicate progress rows would repeat a module; keep the first like .first() did
+            if module_id in modules:
+                continue
+            modules[module_id] = {
+                "module_id": module_id,
+                "title": title,
+                "completion_percent": percentage or 0.0,
+                "is_completed": bool(is_completed),
+                "lessons_completed": int(completed),
+                "total_lessons": int(total),
+                "time_spent_minutes": int(minutes)
+            }
+
+        return list(modules.values())
+
+    @staticmethod
+    def get_tier_listing(
+        user_id: int, db: Session, tier_number: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Every tier with the user's progress in a single outer-join query
+
+        Tiers without a progress row get the defaults (tier 0 always
+        unlocked) in the same pass, and the current tier is derived as the
+        highest unlocked tier.
+
+        Args:
+            user_id: ID of the user
+            db: Database session
+            tier_number: Restrict the listing to one tier
+
+        Returns:
+            Dict with the tier list ordered by tier_number and current_tier
+        """
+        query = db.query(
+            Tier.tier_number,
+            Tier.name,
+            func.coalesce(TierProgress.is_unlocked, Tier.tier_number == 0),
+            func.coalesce(TierProgress.is_completed, False),
+            func.coalesce(TierProgress.completion_percentage, 0.0),
+            TierProgress.started_at,
+            TierProgress.completed_at
+        ).outerjoin(
+            TierProgress, and_(
+                TierProgress.tier_id == Tier.id,
+                TierProgress.user_id == user_id
+            )
+        )
+        if tier_number is not None:
+            query = query.filter(Tier.tier_number == tier_number)
+
+        tiers: List[Dict[str, Any]] = []
+        current_tier = 0
+        for number, name, is_unlocked, is_completed, percentage, started_at, completed_at in \
+                query.order_by(Tier.tier_number).all():
+            if tiers and tiers[-1]["tier_number"] == number:
+                continue
+            if is_unlocked:
+                current_tier = max(current_tier, number)
+            tiers.append({
+                "tier_number": number,
+                "tier_name": name,
+                "is_unlocked": bool(is_unlocked),
+                "is_completed": bool(is_completed),
+                "completion_percentage": percentage,
+                "started_at": started_at,
+                "completed_at": completed_at
+            })
+
+        return {"tiers": tiers, "current_tier": current_tier}
+
+    @staticmethod
+    def get_earned_achievements(user_id: int, db: Session) -> List[Dict[str, Any]]:
+        """Achievements earned by a user, loaded with their definitions in one query"""
+        rows = db.query(UserAchievement.earned_at, Achievement).join(
+            Achievement, Achievement.id == UserAchievement.achievement_id
+        ).filter(
+            UserAchievement.user_id == user_id
+        ).all()
+
+        return [
+            {
+                "name": achievement.name,
+                "description": achievement.description,
+                "icon_url": achievement.icon_name,  # Mapping name to frontend icon logic
+                "earned_at": earned_at
+            }
+            for earned_at, achievement in rows
+        ]
+
+    @staticmethod
+    def get_dashboard(user_id: int, db: Session) -> Dict[str, Any]:
+        """
+        Build the full dashboard payload for GET /progress/me
+
+        Uses a constant number of queries regardless of curriculum size:
+        a primary-key lookup of the summary row for the overall stats, one
+        query for the module breakdown and one for earned achievements.
+
+        Args:
+            user_id: ID of the user
+            db: Database session
+
+        Returns:
+            Dict with overall stats, module breakdown and achievements
+        """
+        summary = ProgressService.get_summary(user_id, db)
+        modules_data = ProgressService.get_module_breakdown(user_id, db)
+        achievements_data = ProgressService.get_earned_achievements(user_id, db)
+
+        return {
+            "overall": {
+                "current_tier": summary.current_tier,
+                "modules_completed": summary.modules_completed,
+                "labs_completed": 0,  # Lab tracking not yet implemented
+                "challenges_solved": summary.challenges_solved,
+                "total_points": summary.total_points,
+                "total_achievements": len(achievements_data),
+                "total_time_minutes": summary.total_time_minutes
+            },
+            "modules": modules_data,
+            "achievements": achievements_data
+        }
@@ -0,0 +1,192 @@
+"""
+Quiz Engine
+Validates quiz content blocks, compiles them once per curriculum version and grades attempts
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.curriculum import ContentBlock, ContentType
+from models.progress import QuizAttempt
+from services.curriculum_cache import CurriculumCache
+
+logger = logging.getLogger(__name__)
+
+# One answer per question: an option index, a list of indices (multiple choice) or None (skipped)
+Answer = Union[int, List[int], None]
+
+
+class QuizDefinitionError(ValueError):
+    """quiz_data does not describe a valid quiz"""
+
+
+class QuizQuestionDefinition(BaseModel):
+    question: str = Field(..., min_length=1)
+    options: List[str] = Field(..., min_length=2)
+    correct_index: Optional[int] = None  # Single answer
+    correct_indices: Optional[List[int]] = None  # Several options must all be selected
+    explanation: Optional[str] = None
+    points: int = Field(1, ge=0)
+
+    @model_validator(mode="after")
+    def check_answer(self):
+        if (self.correct_index is None) == (self.correct_indices is None):
+            raise ValueError("set exactly one of correct_index or correct_indices")
+        indices = [self.correct_index] if self.correct_index is not None else self.correct_indices
+        if not indices or any(i < 0 or i >= len(self.options) for i in indices):
+            raise ValueError("correct answer is not one of the options")
+        return self
+
+
+class QuizDefinition(BaseModel):
+    """quiz_data: a list of questions, or an object with questions and a pass mark"""
+    questions: List[QuizQuestionDefinition] = Field(..., min_length=1)
+    pass_percentage: float = Field(default_factory=lambda: settings.QUIZ_PASS_PERCENTAGE, ge=0, le=100)
+
+
+class CompiledQuiz:
+    """A validated quiz with its answer key in a form that grades in one pass"""
+    __slots__ = ("block_id", "lesson_id", "questions", "answer_key", "points", "max_score", "pass_score")
+
+    def __init__(self, block_id: int, lesson_id: int, definition: QuizDefinition):
+        self.block_id = block_id
+        self.lesson_id = lesson_id
+        # Client view of the questions: no answers or explanations
+        self.questions = [
+            {"question": q.question, "options": q.options, "multiple": q.correct_indices is not None}
+            for q in definition.questions
+        ]
+        self.answer_key: Tuple[frozenset, ...] = tuple(
+            frozenset([q.correct_index] if q.correct_index is not None else q.correct_indices)
+            for q in definition.questions
+        )
+        self.points: Tuple[int, ...] = tuple(q.points for q in definition.questions)
+        self.max_score = sum(self.points)
+        self.pass_score = self.max_score * definition.pass_percentage / 100
+
+
+def _selected(answer: Answer) -> frozenset:
+    if answer is None:
+        return frozenset()
+    if isinstance(answer, int):
+        return frozenset([answer])
+    return frozenset(answer)
+
+
+# (curriculum version, quizzes by block id, quiz block ids by lesson id)
+_quizzes: Optional[Tuple[str, Dict[int, CompiledQuiz], Dict[int, List[int]]]] = None
+
+
+class QuizEngine:
+    """Compiled quizzes per worker, rebuilt when the curriculum version changes"""
+
+    @staticmethod
+    def parse(quiz_data: Optional[str]) -> QuizDefinition:
+        """Parse and validate a quiz block's quiz_data"""
+        try:
+            data = json.loads(quiz_data or "")
+            if isinstance(data, list):
+                data = {"questions": data}
+            return QuizDefinition.model_validate(data)
+        except (json.JSONDecodeError, ValidationError) as e:
+            raise QuizDefinitionError(str(e))
+
+    @staticmethod
+    def _load(db: Session) -> Tuple[Dict[int, CompiledQuiz], Dict[int, List[int]]]:
+        global _quizzes
+
+        version = CurriculumCache.version()
+        if _quizzes is not None and _quizzes[0] == version:
+            return _quizzes[1], _quizzes[2]
+
+        quizzes: Dict[int, CompiledQuiz] = {}
+        by_lesson: Dict[int, List[int]] = {}
+        for block_id, lesson_id, quiz_data in db.query(
+            ContentBlock.id, ContentBlock.lesson_id, ContentBlock.quiz_data
+        ).filter(ContentBlock.type == ContentType.QUIZ).order_by(ContentBlock.order, ContentBlock.id):
+            try:
+                quizzes[block_id] = CompiledQuiz(block_id, lesson_id, QuizEngine.parse(quiz_data))
+            except QuizDefinitionError as e:
+                logger.error(f"Quiz block {block_id} (lesson {lesson_id}) is invalid: {e}")
+                continue
+            by_lesson.setdefault(lesson_id, []).append(block_id)
+
+        _quizzes = (version, quizzes, by_lesson)
+        logger.info(f"Compiled {len(quizzes)} quizzes for curriculum v{version}")
+        return quizzes, by_lesson
+
+    @staticmethod
+    def get(block_id: int, db: Session) -> Optional[CompiledQuiz]:
+        return QuizEngine._load(db)[0].get(block_id)
+
+    @staticmethod
+    def grade(quiz: CompiledQuiz, answers: List[Answer]) -> Dict[str, Any]:
+        """
+        Grade a whole attempt in one pass; unanswered questions score zero
+
+        Raises:
+            QuizDefinitionError: more answers than questions
+        """
+        if len(answers) > len(quiz.answer_key):
+            raise QuizDefinitionError(f"Quiz has {len(quiz.answer_key)} questions, got {len(answers)} answers")
+
+        score = 0
+        correct = []
+        for i, key in enumerate(quiz.answer_key):
+            is_correct = i < len(answers) and _selected(answers[i]) == key
+            correct.append(is_correct)
+            if is_correct:
+                score += quiz.points[i]
+
+        return {
+            "score": score,
+            "max_score": quiz.max_score,
+            "percentage": round(score / quiz.max_score * 100, 1) if quiz.max_score else 100.0,
+            "passed": score >= quiz.pass_score,
+            "correct": correct
+        }
+
+    @staticmethod
+    def record(
+        db: Session,
+        attempts: Iterable[Tuple[int, CompiledQuiz, List[Answer], Dict[str, Any], Optional[datetime]]]
+    ) -> None:
+        """Insert graded attempts (user_id, quiz, answers, result, submitted_at) in one statement; does not commit"""
+        rows = [
+            {
+                "user_id": user_id,
+                "block_id": quiz.block_id,
+                "lesson_id": quiz.lesson_id,
+                "score": result["score"],
+                "max_score": result["max_score"],
+                "passed": result["passed"],
+                "answers": json.dumps(answers),
+                "submitted_at": submitted_at or datetime.now()
+            }
+            for user_id, quiz, answers, result, submitted_at in attempts
+        ]
+        if rows:
+            db.execute(insert(QuizAttempt), rows)
+
+    @staticmethod
+    def passed_lessons(user_id: int, lesson_ids: Iterable[int], db: Session) -> Set[int]:
+        """Lessons, among `lesson_ids`, where the user has passed every quiz"""
+        by_lesson = QuizEngine._load(db)[1]
+        block_ids = [b for lesson_id in set(lesson_ids) for b in by_lesson.get(lesson_id, [])]
+        if not block_ids:
+            return set()
+
+        passed = {block_id for (block_id,) in db.query(QuizAttempt.block_id).filter(
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.block_id.in_(block_ids),
+            QuizAttempt.passed == True
+        ).distinct()}
+        return {
+            lesson_id for lesson_id in set(lesson_ids)
+            if by_lesson.get(lesson_id) and all(b in passed for b in by_lesson[lesson_id])
+        }
@@ -0,0 +1,110 @@
+"""
+Rank Service
+Materializes every user's leaderboard rank into Leaderboard.rank with one statement
+"""
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import redis
+
+from config import settings
+from database.cache import get_redis, get_version, mark_redis_failed
+from database.connection import SessionLocal, dialect_insert
+from models.user import User
+from models.challenge import Leaderboard
+from models.progress import UserProgressSummary
+from services.leaderboard_service import SCORE_VERSION
+
+logger = logging.getLogger(__name__)
+
+RANK_LOCK_KEY = "rank:materializing"
+RANKED_VERSION_KEY = "rank:version"  # Shared score version ranks were last computed at
+
+# Score version this worker last ranked at, used when Redis is unavailable
+_ranked_version: Optional[str] = None
+
+
+class RankService:
+    """Writes ranks by total_points so a user's rank is a single-row lookup"""
+
+    @staticmethod
+    def materialize(db: Session) -> int:
+        """
+        Recompute Leaderboard.rank for all users and write back only what changed
+
+        One INSERT ... SELECT ranks every user with RANK() OVER total
+        points and upserts the result into the leaderboard (users without a
+        leaderboard row get one). Tied users share a rank (1, 2, 2, 4), as
+        on /leaderboard/global and /leaderboard/me. Only rows whose rank
+        moved are written; previous_rank keeps the rank they moved from, so
+        the change can be shown until the next move. Commits.
+
+        Returns:
+            Number of leaderboard rows inserted or updated
+        """
+        points = func.coalesce(UserProgressSummary.total_points, 0)
+        ranked = select(
+            User.id,
+            func.rank().over(order_by=points.desc())
+        ).outerjoin(
+            UserProgressSummary, User.id == UserProgressSummary.user_id
+        ).where(User.id.isnot(None))  # SQLite needs a WHERE before ON CONFLICT in INSERT ... SELECT
+
+        stmt = dialect_insert(db, Leaderboard).from_select(["user_id", "rank"], ranked)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"rank": stmt.excluded.rank, "previous_rank": Leaderboard.rank},
+            where=Leaderboard.rank.is_distinct_from(stmt.excluded.rank)
+        )
+        changed = db.execute(stmt).rowcount
+        db.commit()
+
+        logger.info(f"Materialized leaderboard ranks ({changed} rows changed)")
+        return changed
+
+    @staticmethod
+    def _claim_run() -> bool:
+        """Whether this worker should rank now: scores changed and no other worker took the run"""
+        global _ranked_version
+
+        version = get_version(SCORE_VERSION)
+        client = get_redis()
+        if client is not None:
+            try:
+                # The shared half of the version is the same in every worker
+                shared = version.split(".", 1)[0]
+                if client.get(RANKED_VERSION_KEY) == shared:
+                    return False
+                if not client.set(RANK_LOCK_KEY, 1, nx=True, ex=settings.RANK_REFRESH_SECONDS):
+                    return False
+                # Recorded before ranking, so scores committed during the run trigger the next one
+                client.set(RANKED_VERSION_KEY, shared)
+                return True
+            except redis.RedisError as e:
+                mark_redis_failed(e)
+
+        if version == _ranked_version:
+            return False
+        _ranked_version = version
+        return True
+
+    @staticmethod
+    async def run_loop() -> None:
+        """Re-rank every RANK_REFRESH_SECONDS while scores keep changing, until cancelled"""
+        def materialize_once():
+            db = SessionLocal()
+            try:
+                RankService.materialize(db)
+            finally:
+                db.close()
+
+        while True:
+            await asyncio.sleep(settings.RANK_REFRESH_SECONDS)
+            try:
+                if RankService._claim_run():
+                    await asyncio.to_thread(materialize_once)
+            except Exception as e:
+                logger.error(f"Rank materialization failed: {str(e)}")
@@ -0,0 +1,183 @@
+"""
+Score Buckets
+Per-user daily point totals, written as points are awarded and rolled up into
+daily, weekly, monthly and season leaderboards
+"""
+import calendar
+import enum
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from database.connection import dialect_insert
+from models.user import User
+from models.progress import LessonProgress, ModuleProgress, UserDailyPoints
+from models.challenge import ChallengeSubmission
+from services.progress_service import LESSON_POINTS, MODULE_POINTS
+
+logger = logging.getLogger(__name__)
+
+# Point sources kept per bucket; total_points is their sum
+POINT_SOURCES = ("challenge_points", "lesson_points", "module_points")
+BACKFILL_BATCH_SIZE = 1000
+
+
+class ScorePeriod(str, enum.Enum):
+    """Leaderboard windows"""
+    DAILY = "daily"
+    WEEKLY = "weekly"    # Monday to Sunday
+    MONTHLY = "monthly"
+    SEASON = "season"    # Custom start and end dates
+
+
+# One award: (user_id, day, source, points)
+Award = Tuple[int, date, str, int]
+
+
+def _as_date(value: Any) -> date:
+    """Day of a timestamp, or of a DATE() result (a string on SQLite)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class ScoreBuckets:
+    """Maintains user_daily_points and serves leaderboards for any date range"""
+
+    @staticmethod
+    def add(db: Session, awards: Iterable[Award]) -> None:
+        """
+        Add awarded points to their day buckets with a single upsert
+
+        Counters are incremented in place, so concurrent awards for the
+        same user and day add up. Does not commit.
+        """
+        buckets: Dict[Tuple[int, date], Dict[str, int]] = defaultdict(lambda: dict.fromkeys(POINT_SOURCES, 0))
+        for user_id, day, source, points in awards:
+            if points:
+                buckets[(user_id, _as_date(day))][source] += points
+        if not buckets:
+            return
+
+        rows = [
+            {"user_id": user_id, "day": day, **points, "total_points": sum(points.values())}
+            for (user_id, day), points in sorted(buckets.items())
+        ]
+        stmt = dialect_insert(db, UserDailyPoints).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={
+                name: getattr(UserDailyPoints, name) + getattr(stmt.excluded, name)
+                for name in POINT_SOURCES + ("total_points",)
+            }
+        ))
+
+    @staticmethod
+    def window(period: ScorePeriod, on: date) -> Tuple[date, date]:
+        """First and last day of the daily, weekly or monthly window containing `on`"""
+        if period == ScorePeriod.DAILY:
+            return on, on
+        if period == ScorePeriod.WEEKLY:
+            start = on - timedelta(days=on.weekday())
+            return start, start + timedelta(days=6)
+        if period == ScorePeriod.MONTHLY:
+            return on.replace(day=1), on.replace(day=calendar.monthrange(on.year, on.month)[1])
+        raise ValueError(f"{period.value} windows need explicit start and end dates")
+
+    @staticmethod
+    def leaderboard(db: Session, start: date, end: date, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Users ranked by points earned between start and end (inclusive)
+
+        Reads only the day buckets in the range: one grouped query for the
+        page, plus one count for the first rank when offset > 0. Users with
+        no points in the window are not listed; ties share a rank.
+        """
+        total = func.sum(UserDailyPoints.total_points)
+        in_window = (UserDailyPoints.day >= start, UserDailyPoints.day <= end)
+        rows = db.query(
+            UserDailyPoints.user_id,
+            User.username,
+            total.label("total_points"),
+            *(func.sum(getattr(UserDailyPoints, name)).label(name) for name in POINT_SOURCES)
+        ).join(
+            User, User.id == UserDailyPoints.user_id
+        ).filter(*in_window).group_by(
+            UserDailyPoints.user_id, User.username
+        ).having(total > 0).order_by(
+            total.desc(), UserDailyPoints.user_id
+        ).offset(offset).limit(limit).all()
+        if not rows:
+            return []
+
+        rank = 1
+        if offset:
+            above = db.query(UserDailyPoints.user_id).filter(*in_window).group_by(
+                UserDailyPoints.user_id
+            ).having(total > rows[0].total_points).subquery()
+            rank = db.query(func.count()).select_from(above).scalar() + 1
+
+        entries = []
+        for position, row in enumerate(rows, start=offset):
+            if entries and row.total_points != entries[-1]["total_points"]:
+                rank = position + 1
+            entries.append({
+                "rank": rank,
+                "user_id": row.user_id,
+                "username": row.username,
+                "total_points": int(row.total_points),
+                **{name: int(getattr(row, name)) for name in POINT_SOURCES}
+            })
+        return entries
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recompute every bucket from challenge submissions and lesson/module completions
+
+        Used for backfill and drift repair. Runs one grouped query per source
+        and replaces the table in a single transaction. Lessons are dated by
+        completed_at, which for an offline sync can be earlier than the day
+        the points were awarded.
+
+        Returns:
+            Number of (user, day) buckets written
+        """
+        buckets: Dict[Tuple[int, date], Dict[str, int]] = defaultdict(lambda: dict.fromkeys(POINT_SOURCES, 0))
+
+        for user_id, day, points in db.query(
+            ChallengeSubmission.user_id, func.date(ChallengeSubmission.submitted_at), func.sum(ChallengeSubmission.points_earned)
+        ).filter(ChallengeSubmission.is_correct == True).group_by(
+            ChallengeSubmission.user_id, func.date(ChallengeSubmission.submitted_at)
+        ):
+            if day is not None:
+                buckets[(user_id, _as_date(day))]["challenge_points"] += int(points or 0)
+
+        for model, source, points_each in (
+            (LessonProgress, "lesson_points", LESSON_POINTS),
+            (ModuleProgress, "module_points", MODULE_POINTS),
+        ):
+            day_expr = func.date(func.coalesce(model.completed_at, model.started_at))
+            for user_id, day, completed in db.query(
+                model.user_id, day_expr, func.count(model.id)
+            ).filter(model.is_completed == True).group_by(model.user_id, day_expr):
+                if day is not None:
+                    buckets[(user_id, _as_date(day))][source] += int(completed) * points_each
+
+        rows = [
+            {"user_id": user_id, "day": day, **points, "total_points": sum(points.values())}
+            for (user_id, day), points in sorted(buckets.items())
+            if any(points.values())
+        ]
+        db.query(UserDailyPoints).delete(synchronize_session=False)
+        for i in range(0, len(rows), BACKFILL_BATCH_SIZE):
+            db.execute(insert(UserDailyPoints), rows[i:i + BACKFILL_BATCH_SIZE])
+        db.commit()
+
+        logger.info(f"Rebuilt {len(rows)} daily score buckets")
+        return len(rows)
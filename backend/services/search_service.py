@@ -0,0 +1,369 @@
+"""
+Search Service
+In-process inverted index over lessons, challenges and labs with BM25 ranking
+"""
+import bisect
+import heapq
+import html
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from config import settings
+from models.curriculum import Lesson, ContentBlock
+from models.challenge import Challenge
+from models.labs import Lab
+from services.curriculum_cache import CurriculumCache
+
+logger = logging.getLogger(__name__)
+
+DOC_TYPES = ("lesson", "challenge", "lab")
+
+TITLE_WEIGHT = 3  # A title term counts as this many body occurrences
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_PREFIX_EXPANSIONS = 50
+SNIPPET_CHARS = 160
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "with",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MARKDOWN_RE = re.compile(r"```[^\n]*|`|[#*_>|]+|!?\[([^\]]*)\]\([^)]*\)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def plain_text(markdown_text: str) -> str:
+    """Markdown with syntax removed, for snippets"""
+    text = _MARKDOWN_RE.sub(lambda m: m.group(1) or " ", markdown_text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class SearchDocument:
+    """One searchable item and the data needed to rank and display it"""
+
+    __slots__ = ("key", "title", "text", "terms", "length", "fingerprint", "extra")
+
+    def __init__(self, key: Tuple[str, int], title: str, text: str, fingerprint: Any, extra: Dict[str, Any]):
+        self.key = key
+        self.title = title
+        self.text = text
+        self.fingerprint = fingerprint
+        self.extra = extra
+
+        self.terms: Counter = Counter(tokenize(text))
+        for term in tokenize(title):
+            self.terms[term] += TITLE_WEIGHT
+        self.length = sum(self.terms.values())
+
+
+class SearchIndex:
+    """Inverted index: term -> {doc key: weighted term frequency}"""
+
+    def __init__(self):
+        self.docs: Dict[Tuple[str, int], SearchDocument] = {}
+        self.postings: Dict[str, Dict[Tuple[str, int], int]] = defaultdict(dict)
+        self.total_length = 0
+        self._vocabulary: Optional[List[str]] = None
+        self._norm_cache: Optional[Dict[Tuple[str, int], float]] = None
+
+    def add(self, doc: SearchDocument) -> None:
+        self.remove(doc.key)
+        self.docs[doc.key] = doc
+        self.total_length += doc.length
+        for term, tf in doc.terms.items():
+            self.postings[term][doc.key] = tf
+        self._vocabulary = None
+        self._norm_cache = None
+
+    def remove(self, key: Tuple[str, int]) -> None:
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return
+        self.total_length -= doc.length
+        for term in doc.terms:
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+        self._vocabulary = None
+        self._norm_cache = None
+
+    def expand(self, term: str, prefix: bool) -> List[str]:
+        """Index terms matching a query term (and, for the last term, its completions)"""
+        if not prefix:
+            return [term] if term in self.postings else []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\uffff", start)
+        return self._vocabulary[start:min(end, start + MAX_PREFIX_EXPANSIONS)]
+
+    def _norms(self) -> Dict[Tuple[str, int], float]:
+        """BM25 length normalization per document, cached until the index changes"""
+        if self._norm_cache is None:
+            avg_length = self.total_length / len(self.docs)
+            self._norm_cache = {
+                key: BM25_K1 * (1 - BM25_B + BM25_B * doc.length / avg_length)
+                for key, doc in self.docs.items()
+            }
+        return self._norm_cache
+
+    def search(
+        self, query: str, limit: int, doc_types: Optional[List[str]] = None
+    ) -> Tuple[int, List[Tuple[float, SearchDocument]]]:
+        """
+        Documents matching every query term, best first
+
+        Terms are intersected rarest first, so common words only score the
+        few candidates left by the rarer ones.
+
+        Returns:
+            (total matches, top `limit` matches with scores)
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or not self.docs:
+            return 0, []
+
+        n_docs = len(self.docs)
+        norms = self._norms()
+
+        groups = []
+        for i, query_term in enumerate(query_terms):
+            last = i == len(query_terms) - 1
+            terms = self.expand(query_term, prefix=last and len(query_term) >= 2)
+            if not terms:
+                return 0, []
+            group = []
+            for term in terms:
+                postings = self.postings[term]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                group.append((postings, idf))
+            groups.append(group)
+        groups.sort(key=lambda group: sum(len(postings) for postings, _ in group))
+
+        def term_score(tf: int, idf: float, key) -> float:
+            return idf * tf * (BM25_K1 + 1) / (tf + norms[key])
+
+        # Rarest term: score every posting
+        scores: Dict[Tuple[str, int], float] = {}
+        for postings, idf in groups[0]:
+            for key, tf in postings.items():
+                if doc_types is not None and key[0] not in doc_types:
+                    continue
+                score = term_score(tf, idf, key)
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+
+        # Other terms: only look up the remaining candidates
+        for group in groups[1:]:
+            next_scores = {}
+            for key, total in scores.items():
+                best = 0.0
+                for postings, idf in group:
+                    tf = postings.get(key)
+                    if tf:
+                        best = max(best, term_score(tf, idf, key))
+                if best:
+                    next_scores[key] = total + best
+            scores = next_scores
+            if not scores:
+                return 0, []
+
+        top = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.docs[item[0]].title))
+        return len(scores), [(score, self.docs[key]) for key, score in top]
+
+
+def highlight(text: str, query: str) -> str:
+    """HTML-escaped snippet around the first query match with matches in <mark>"""
+    terms = tokenize(query)
+    if not terms:
+        return html.escape(text[:SNIPPET_CHARS])
+
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")", re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - SNIPPET_CHARS // 3) if match else 0
+    if start:
+        start = text.find(" ", start) + 1 or start
+    window = text[start:start + SNIPPET_CHARS]
+
+    parts = []
+    last = 0
+    for m in pattern.finditer(window):
+        parts.append(html.escape(window[last:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        last = m.end()
+    parts.append(html.escape(window[last:]))
+
+    prefix = "…" if start else ""
+    suffix = "…" if start + SNIPPET_CHARS < len(text) else ""
+    return prefix + "".join(parts) + suffix
+
+
+_index = SearchIndex()
+_curriculum_version: Optional[str] = None
+_refreshed_at: float = 0.0
+
+
+class SearchService:
+    """Keeps the per-worker index in sync with the database and answers queries"""
+
+    @staticmethod
+    def _fingerprints(db: Session) -> Dict[Tuple[str, int], Any]:
+        """Cheap change markers for every searchable row (no content is loaded)"""
+        fingerprints: Dict[Tuple[str, int], Any] = {}
+
+        blocks = {
+            lesson_id: (count, changed) for lesson_id, count, changed in db.query(
+                ContentBlock.lesson_id,
+                func.count(ContentBlock.id),
+                func.max(func.coalesce(ContentBlock.updated_at, ContentBlock.created_at))
+            ).group_by(ContentBlock.lesson_id)
+        }
+        for lesson_id, changed in db.query(
+            Lesson.id, func.coalesce(Lesson.updated_at, Lesson.created_at)
+        ).filter(Lesson.is_published == True):
+            fingerprints[("lesson", lesson_id)] = (changed, blocks.get(lesson_id))
+
+        for challenge_id, changed in db.query(
+            Challenge.id, func.coalesce(Challenge.updated_at, Challenge.created_at)
+        ).filter(Challenge.is_published == True):
+            fingerprints[("challenge", challenge_id)] = changed
+
+        return fingerprints
+
+    @staticmethod
+    def _load(db: Session, keys: List[Tuple[str, int]], fingerprints: Dict) -> List[SearchDocument]:
+        docs = []
+
+        lesson_ids = [doc_id for doc_type, doc_id in keys if doc_type == "lesson"]
+        for i in range(0, len(lesson_ids), 500):
+            for lesson in db.query(Lesson).options(selectinload(Lesson.content_blocks)).filter(
+                Lesson.id.in_(lesson_ids[i:i + 500])
+            ):
+                body = [lesson.description or "", lesson.content_markdown or ""]
+                for block in lesson.content_blocks:
+                    body.extend([block.text_content or "", block.code_content or ""])
+                docs.append(SearchDocument(
+                    ("lesson", lesson.id), lesson.title, plain_text(" ".join(body)),
+                    fingerprints[("lesson", lesson.id)], {"module_id": lesson.module_id}
+                ))
+
+        challenge_ids = [doc_id for doc_type, doc_id in keys if doc_type == "challenge"]
+        for i in range(0, len(challenge_ids), 500):
+            for challenge in db.query(Challenge).filter(Challenge.id.in_(challenge_ids[i:i + 500])):
+                body = [challenge.description or "", challenge.instructions or "", " ".join(challenge.tags or [])]
+                docs.append(SearchDocument(
+                    ("challenge", challenge.id), challenge.title, plain_text(" ".join(body)),
+                    fingerprints[("challenge", challenge.id)],
+                    {"category": challenge.category, "difficulty": challenge.difficulty}
+                ))
+
+        return docs
+
+    @staticmethod
+    def refresh(db: Session, force: bool = False) -> int:
+        """
+        Bring the index up to date, re-indexing only rows that changed
+
+        Runs when the curriculum version changes or SEARCH_REFRESH_SECONDS
+        have passed. Labs have no change timestamp and are few, so they are
+        always re-read and compared by content.
+
+        Returns:
+            Number of documents added, updated or removed
+        """
+        global _curriculum_version, _refreshed_at
+
+        version = CurriculumCache.version()
+        now = time.monotonic()
+        if not force and _refreshed_at and version == _curriculum_version \
+                and now - _refreshed_at < settings.SEARCH_REFRESH_SECONDS:
+            return 0
+        _curriculum_version, _refreshed_at = version, now
+
+        fingerprints = SearchService._fingerprints(db)
+        stale = [key for key in _index.docs if key[0] != "lab" and key not in fingerprints]
+        changed = [
+            key for key, fingerprint in fingerprints.items()
+            if key not in _index.docs or _index.docs[key].fingerprint != fingerprint
+        ]
+
+        for key in stale:
+            _index.remove(key)
+        for doc in SearchService._load(db, changed, fingerprints):
+            _index.add(doc)
+
+        # Labs: compare full content
+        labs = {}
+        for lab in db.query(Lab).filter(Lab.is_active == True):
+            body = plain_text(" ".join([lab.description or "", lab.content or "", lab.category or ""]))
+            labs[("lab", lab.id)] = (lab.title, body, {"difficulty": lab.difficulty, "category": lab.category})
+        lab_changes = 0
+        for key in [key for key in _index.docs if key[0] == "lab" and key not in labs]:
+            _index.remove(key)
+            lab_changes += 1
+        for key, (title, body, extra) in labs.items():
+            fingerprint = hash((title, body))
+            if key not in _index.docs or _index.docs[key].fingerprint != fingerprint:
+                _index.add(SearchDocument(key, title, body, fingerprint, extra))
+                lab_changes += 1
+
+        updates = len(stale) + len(changed) + lab_changes
+        if updates:
+            logger.info(f"Search index refreshed: {updates} documents changed, {len(_index.docs)} indexed")
+        return updates
+
+    @staticmethod
+    def search(
+        query: str,
+        db: Session,
+        doc_types: Optional[List[str]] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Ranked, paginated search with highlighted snippets
+
+        Args:
+            query: User query; every term must match, the last one as a prefix
+            db: Database session (used only to refresh the index)
+            doc_types: Restrict to these document types
+            page: 1-based page number
+            page_size: Results per page
+
+        Returns:
+            Dict with total, page, page_size and results
+        """
+        SearchService.refresh(db)
+
+        offset = (page - 1) * page_size
+        total, matches = _index.search(query, offset + page_size, doc_types)
+        return {
+            "query": query,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "results": [
+                {
+                    "type": doc.key[0],
+                    "id": doc.key[1],
+                    "title": doc.title,
+                    "snippet": highlight(doc.text, query),
+                    "score": round(score, 4),
+                    **doc.extra
+                }
+                for score, doc in matches[offset:offset + page_size]
+            ]
+        }
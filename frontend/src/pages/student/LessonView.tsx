@@ -9,7 +9,7 @@ import AITutor from '../../components/AITutor';
 interface ContentBlock {
     id: number;
     type: string;
-    quiz_data?: string;
+    quiz_data?: string; // JSON {questions: [{question, options, multiple}]}, no answers; grade via POST /api/quizzes/{id}/attempts
 }
 
 interface Lesson {